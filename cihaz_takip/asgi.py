@@ -12,5 +12,7 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'cihaz_takip.settings')
+# Dashboard async view'ları yalnızca ASGI altında kullanılır
+os.environ.setdefault('DASHBOARD_ASYNC_VIEWS', '1')
 
 application = get_asgi_application()
@@ -138,6 +138,43 @@ STATICFILES_DIRS = [
 MEDIA_URL = 'media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Cache: dashboard anlık görüntüleri, geçersizleşme işaretleri ve kilitleri tüm
+# worker süreçlerinde aynı cache'i görmelidir (süreç içi LocMemCache'te bir
+# worker'daki sinyal diğerlerini geçersizleştirmez). REDIS_URL verilirse Redis,
+# verilmezse aynı sunucudaki süreçlerin paylaştığı dosya cache'i kullanılır.
+if os.environ.get('REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ['REDIS_URL'],
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': BASE_DIR / 'data' / 'cache',
+        }
+    }
+
+# Device export cache (aynı filtrelerle tekrar edilen CSV/JSON export'ları)
+DEVICE_EXPORT_CACHE_DIR = BASE_DIR / 'export_cache'
+DEVICE_EXPORT_CACHE_MAX_BYTES = 512 * 1024 * 1024  # 512 MB, LRU ile temizlenir
+
+# IMEI TAC -> marka/model tablosu (compile_tac_database komutu ile üretilir)
+DEVICE_TAC_DATABASE = BASE_DIR / 'data' / 'tac.bin'
+
+# Cihaz listesi sayımları için süreç içi bitmap indeksi (devices/bitmaps.py)
+DEVICE_BITMAP_INDEX = False
+DEVICE_BITMAP_SNAPSHOT = BASE_DIR / 'data' / 'device_bitmaps.bin'
+
+# Dashboard istatistikler sayfası için async view; yalnızca ASGI altında açılır
+# (cihaz_takip/asgi.py ortam değişkenini ayarlar). WSGI'de async view her istekte
+# async_to_sync köprüsünden geçtiğinden senkron view kullanılır. Bağımsız
+# sorgular en fazla DASHBOARD_QUERY_WORKERS thread'de eşzamanlı çalışır
+DASHBOARD_ASYNC_VIEWS = os.environ.get('DASHBOARD_ASYNC_VIEWS') == '1'
+DASHBOARD_QUERY_WORKERS = 4
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
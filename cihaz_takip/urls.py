@@ -25,6 +25,7 @@ urlpatterns = [
     path('', include('dashboard.urls')),
     path('users/', include('users.urls')),
     path('devices/', include('devices.urls')),
+    path('api/', include('devices.api_urls')),
     # Ana sayfa için login redirect
     path('login/', lambda request: redirect('users:login'), name='login'),
 ]
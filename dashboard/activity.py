@@ -0,0 +1,68 @@
+"""Aktivite logu sayfasının dönem toplamları.
+
+Toplam, bugün, bu hafta ve bu ay sayıları tek bir koşullu aggregate ile
+(tablo üzerinde tek geçiş) hesaplanır ve kapsam + filtre kombinasyonu
+başına kısa süreliğine cache'lenir.
+"""
+import hashlib
+import json
+from datetime import date, datetime, time, timedelta
+from datetime import timezone as dt_timezone
+
+from django.core.cache import cache
+from django.db.models import Count, Q
+from django.utils import timezone
+
+# Dönem toplamlarının cache süresi (sn)
+TOTALS_SECONDS = 60
+
+
+def day_start(day):
+    """Yerel günün başlangıcı; created_at__date yerine indeks kullanabilen aralık filtreleri için.
+
+    Veritabanı için UTC'ye çevrilemeyen uç tarihlerde (0001-01-01 gibi) None döner.
+    """
+    value = timezone.make_aware(datetime.combine(day, time.min))
+    try:
+        value.astimezone(dt_timezone.utc)
+    except OverflowError:
+        return None
+    return value
+
+
+def created_between(start_date=None, end_date=None):
+    """created_at için yerel gün aralığı filtresi (Q); temsil edilemeyen uçlar sınırsız sayılır"""
+    condition = Q()
+    start = day_start(start_date) if start_date else None
+    if start is not None:
+        condition &= Q(created_at__gte=start)
+    end = day_start(end_date + timedelta(days=1)) if end_date and end_date < date.max else None
+    if end is not None:
+        condition &= Q(created_at__lt=end)
+    return condition
+
+
+def _totals_key(scope, filters, today):
+    payload = json.dumps([scope, filters, today.isoformat()], sort_keys=True, default=str)
+    return 'dashboard:activity_totals:' + hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def period_totals(logs, scope, filters):
+    """{'total_logs', 'today_logs', 'week_logs', 'month_logs'} (tek sorgu, cache'li).
+
+    scope yetki kapsamını (tüm loglar / kullanıcı id'si), filters sayfadaki
+    filtreleri tanımlar; ikisi birlikte cache anahtarını oluşturur.
+    """
+    today = timezone.localdate()
+    key = _totals_key(scope, filters, today)
+    totals = cache.get(key)
+    if totals is None:
+        week_start = today - timedelta(days=today.weekday())
+        totals = logs.order_by().aggregate(
+            total_logs=Count('id'),
+            today_logs=Count('id', filter=Q(created_at__gte=day_start(today))),
+            week_logs=Count('id', filter=Q(created_at__gte=day_start(week_start))),
+            month_logs=Count('id', filter=Q(created_at__gte=day_start(today.replace(day=1)))),
+        )
+        cache.set(key, totals, TOTALS_SECONDS)
+    return totals
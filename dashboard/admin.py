@@ -1,3 +1,18 @@
 from django.contrib import admin
 
-# Register your models here.
+from .models import DailyRollup, GlobalCounter
+
+
+@admin.register(DailyRollup)
+class DailyRollupAdmin(admin.ModelAdmin):
+    list_display = ('date', 'kind', 'dimension', 'count')
+    list_filter = ('kind', 'dimension')
+    date_hierarchy = 'date'
+    readonly_fields = ('date', 'kind', 'dimension', 'count')
+
+
+@admin.register(GlobalCounter)
+class GlobalCounterAdmin(admin.ModelAdmin):
+    list_display = ('name', 'value')
+    search_fields = ('name',)
+    readonly_fields = ('name', 'value')
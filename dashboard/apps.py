@@ -4,3 +4,15 @@ from django.apps import AppConfig
 class DashboardConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'dashboard'
+
+    def ready(self):
+        from . import signals  # noqa: F401
+        from devices import stats
+
+        from . import rollups
+        from .models import DailyRollup
+
+        # Cihaz istatistikleri grafiği günlük özet tablosundan okunur
+        stats.register_registration_source(
+            lambda start, end: rollups.daily_series(DailyRollup.KIND_DEVICE, start, end)
+        )
@@ -0,0 +1,63 @@
+"""Birbirinden bağımsız dashboard sorgularının eşzamanlı çalıştırılması.
+
+Django'nun async ORM'i sorguları tek bir iş parçacığında sırayla çalıştırır
+(veritabanı sürücüleri senkron). Gerçek eşzamanlılık için her sorgu sınırlı
+bir thread havuzunda kendi bağlantısıyla çalıştırılır ve asyncio.gather ile
+beklenir; sayfa süresi sorguların toplamına değil en yavaşına yaklaşır.
+"""
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections, connection
+
+DEFAULT_MAX_WORKERS = 4
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    """Süreç başına tek thread havuzu (settings.DASHBOARD_QUERY_WORKERS ile sınırlı)"""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=getattr(settings, 'DASHBOARD_QUERY_WORKERS', DEFAULT_MAX_WORKERS),
+                thread_name_prefix='dashboard-query'
+            )
+    return _executor
+
+
+def _run(query):
+    # Havuz thread'leri istek döngüsü dışında; bağlantılar istek gibi açılıp kapanır
+    close_old_connections()
+    try:
+        return query()
+    finally:
+        close_old_connections()
+
+
+def run_queries(queries):
+    """{ad: fonksiyon} sorgularını sırayla çalıştırır; {ad: sonuç} döndürür"""
+    return {name: query() for name, query in queries.items()}
+
+
+def _in_transaction():
+    return connection.in_atomic_block
+
+
+async def gather_queries(queries):
+    """{ad: fonksiyon} sorgularını thread havuzunda eşzamanlı çalıştırır; {ad: sonuç} döndürür.
+
+    Açık bir transaction varsa (ör. testler) diğer bağlantılar commit
+    edilmemiş veriyi göremeyeceğinden sorgular aynı bağlantıda sırayla çalışır.
+    """
+    if await sync_to_async(_in_transaction)():
+        return await sync_to_async(run_queries)(queries)
+    loop = asyncio.get_running_loop()
+    executor = get_executor()
+    results = await asyncio.gather(*(loop.run_in_executor(executor, _run, query) for query in queries.values()))
+    return dict(zip(queries, results))
@@ -0,0 +1,126 @@
+"""Genel sayaçlar: tablo boyutundan bağımsız O(1) başlık sayıları.
+
+Sayaç adları:
+    users:active, users:locked        aktif ve kilitli kullanıcılar
+    logs:total                        aktivite logları
+    devices:<cins>:active|inactive    cinse ve duruma göre cihazlar
+
+Değişiklikler dashboard/signals.py'deki sinyallerden, işlemi yapan
+transaction içinde F() ile uygulanır.
+"""
+from collections import Counter, defaultdict
+
+from django.contrib.auth import get_user_model
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Q
+
+from devices.models import Device
+from devices.stats import build_device_stats
+from users.models import UserLog
+
+from .models import GlobalCounter
+
+USERS_ACTIVE = 'users:active'
+USERS_LOCKED = 'users:locked'
+LOGS_TOTAL = 'logs:total'
+DEVICE_PREFIX = 'devices:'
+
+
+def device_counter(device_type, is_active):
+    return f"{DEVICE_PREFIX}{device_type}:{'active' if is_active else 'inactive'}"
+
+
+def user_counters(is_active, is_locked):
+    """Kullanıcının katkıda bulunduğu sayaçlar"""
+    return {USERS_ACTIVE: int(bool(is_active)), USERS_LOCKED: int(bool(is_locked))}
+
+
+def adjust(name, delta):
+    """Sayacı delta kadar değiştirir; satır yoksa oluşturur"""
+    if not delta:
+        return
+    rows = GlobalCounter.objects.filter(name=name)
+    if rows.update(value=F('value') + delta):
+        return
+    try:
+        with transaction.atomic():
+            GlobalCounter.objects.create(name=name, value=delta)
+    except IntegrityError:
+        # Eşzamanlı bir istek satırı önce oluşturdu
+        rows.update(value=F('value') + delta)
+
+
+def adjust_many(changes, sign=1):
+    """{ad: delta} değişikliklerini uygular (sign=-1 ile düşer)"""
+    for name, delta in changes.items():
+        adjust(name, sign * delta)
+
+
+def device_changes(queryset, new_active=None):
+    """Queryset'in {sayaç: adet} dağılımı (tek GROUP BY).
+
+    new_active verilirse (True, False veya 'toggle') durum değişikliğinin
+    sayaç farkları döndürülür.
+    """
+    rows = queryset.order_by().values_list('device_type', 'is_active').annotate(total=Count('pk'))
+    changes = Counter()
+    for device_type, is_active, total in rows:
+        if new_active is None:
+            changes[device_counter(device_type, is_active)] += total
+            continue
+        target = not is_active if new_active == 'toggle' else new_active
+        if target != is_active:
+            changes[device_counter(device_type, is_active)] -= total
+            changes[device_counter(device_type, target)] += total
+    return changes
+
+
+def read():
+    """Tüm sayaçlar {ad: değer} (tek sorgu)"""
+    return dict(GlobalCounter.objects.values_list('name', 'value'))
+
+
+def device_stats(values):
+    """read() sonucundan get_device_stats biçiminde cihaz istatistikleri"""
+    counts = defaultdict(lambda: {'count': 0, 'active': 0})
+    for name, value in values.items():
+        if not name.startswith(DEVICE_PREFIX) or not value:
+            continue
+        device_type, status = name[len(DEVICE_PREFIX):].rsplit(':', 1)
+        counts[device_type]['count'] += value
+        if status == 'active':
+            counts[device_type]['active'] += value
+    return build_device_stats(counts)
+
+
+def compute():
+    """Sayaçların tablolardan hesaplanan gerçek değerleri"""
+    users = get_user_model().objects.aggregate(
+        active=Count('pk', filter=Q(is_active=True)),
+        locked=Count('pk', filter=Q(is_locked=True)),
+    )
+    values = {
+        USERS_ACTIVE: users['active'],
+        USERS_LOCKED: users['locked'],
+        LOGS_TOTAL: UserLog.objects.count(),
+    }
+    values.update(device_changes(Device.objects.all()))
+    return values
+
+
+def reconcile():
+    """Sayaçları gerçek değerlerle karşılaştırıp düzeltir; düzeltilen sayaç sayısını döndürür.
+
+    Hesaplama ile yazma arasında gelen artışlar kaybolabileceğinden
+    trafiğin az olduğu saatlerde çalıştırılması önerilir.
+    """
+    expected = compute()
+    current = read()
+    changed = 0
+    with transaction.atomic():
+        for name in expected.keys() | current.keys():
+            value = expected.get(name, 0)
+            if current.get(name) != value:
+                GlobalCounter.objects.update_or_create(name=name, defaults={'value': value})
+                changed += 1
+    return changed
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from dashboard import rollups
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the daily device/user registration rollup table from scratch'
+
+    def handle(self, *args, **options):
+        rows = rollups.backfill()
+        self.stdout.write(self.style.SUCCESS(f'Daily rollups rebuilt: {rows} rows'))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from dashboard import counters
+
+
+class Command(BaseCommand):
+    help = 'Recompute the global headline counters (users, devices, logs) and fix any drift'
+
+    def handle(self, *args, **options):
+        changed = counters.reconcile()
+        self.stdout.write(self.style.SUCCESS(f'Global counters reconciled: {changed} counters updated'))
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.5 on 2026-10-17 03:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('device', 'Cihaz'), ('user', 'Kullanıcı')], max_length=10, verbose_name='Kayıt Türü')),
+                ('date', models.DateField(verbose_name='Tarih')),
+                ('dimension', models.CharField(max_length=20, verbose_name='Boyut')),
+                ('count', models.IntegerField(default=0, verbose_name='Adet')),
+            ],
+            options={
+                'verbose_name': 'Günlük Özet',
+                'verbose_name_plural': 'Günlük Özetler',
+                'db_table': 'gunluk_ozetler',
+                'ordering': ['kind', 'date', 'dimension'],
+                'constraints': [models.UniqueConstraint(fields=('kind', 'date', 'dimension'), name='gunluk_ozet_uniq')],
+            },
+        ),
+    ]
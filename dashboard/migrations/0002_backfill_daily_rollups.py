@@ -0,0 +1,40 @@
+from django.db import migrations
+from django.db.models import Count
+from django.db.models.functions import TruncDate
+
+
+def backfill_daily_rollups(apps, schema_editor):
+    DailyRollup = apps.get_model('dashboard', 'DailyRollup')
+    Device = apps.get_model('devices', 'Device')
+    CustomUser = apps.get_model('users', 'CustomUser')
+
+    sources = (
+        ('device', Device, 'created_at', 'device_type'),
+        ('user', CustomUser, 'date_joined', 'role'),
+    )
+    rows = []
+    for kind, model, date_field, dimension_field in sources:
+        counts = (
+            model.objects.order_by()
+            .annotate(day=TruncDate(date_field))
+            .values_list('day', dimension_field)
+            .annotate(total=Count('pk'))
+        )
+        rows.extend(
+            DailyRollup(kind=kind, date=day, dimension=dimension, count=total)
+            for day, dimension, total in counts
+        )
+    DailyRollup.objects.bulk_create(rows, batch_size=2000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0001_daily_rollup'),
+        ('devices', '0012_backfill_device_groups'),
+        ('users', '0007_backfill_user_device_counters'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_daily_rollups, migrations.RunPython.noop),
+    ]
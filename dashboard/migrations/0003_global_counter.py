@@ -0,0 +1,27 @@
+# Generated by Django 5.2.5 on 2026-10-17 03:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0002_backfill_daily_rollups'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GlobalCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=64, unique=True, verbose_name='Sayaç')),
+                ('value', models.BigIntegerField(default=0, verbose_name='Değer')),
+            ],
+            options={
+                'verbose_name': 'Genel Sayaç',
+                'verbose_name_plural': 'Genel Sayaçlar',
+                'db_table': 'genel_sayaclar',
+                'ordering': ['name'],
+            },
+        ),
+    ]
@@ -0,0 +1,38 @@
+from django.db import migrations
+from django.db.models import Count, Q
+
+
+def backfill_global_counters(apps, schema_editor):
+    GlobalCounter = apps.get_model('dashboard', 'GlobalCounter')
+    Device = apps.get_model('devices', 'Device')
+    CustomUser = apps.get_model('users', 'CustomUser')
+    UserLog = apps.get_model('users', 'UserLog')
+
+    users = CustomUser.objects.aggregate(
+        active=Count('pk', filter=Q(is_active=True)),
+        locked=Count('pk', filter=Q(is_locked=True)),
+    )
+    rows = [
+        GlobalCounter(name='users:active', value=users['active']),
+        GlobalCounter(name='users:locked', value=users['locked']),
+        GlobalCounter(name='logs:total', value=UserLog.objects.count()),
+    ]
+    devices = Device.objects.order_by().values_list('device_type', 'is_active').annotate(total=Count('pk'))
+    rows.extend(
+        GlobalCounter(name=f"devices:{device_type}:{'active' if is_active else 'inactive'}", value=total)
+        for device_type, is_active, total in devices
+    )
+    GlobalCounter.objects.bulk_create(rows)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0003_global_counter'),
+        ('devices', '0017_backfill_device_catalog'),
+        ('users', '0007_backfill_user_device_counters'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_global_counters, migrations.RunPython.noop),
+    ]
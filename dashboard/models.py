@@ -1,3 +1,80 @@
 from django.db import models
 
-# Create your models here.
+
+class DailyRollup(models.Model):
+    """Günlük yeni kayıt özeti: (gün, tür, boyut) başına adet.
+
+    Cihazlar için boyut cihaz cinsi, kullanıcılar için roldür. Satırlar
+    dashboard.rollups modülü tarafından F() ile artırılıp azaltılır; grafikler
+    tek bir tarih aralığı okumasıyla çizilir.
+    """
+    
+    KIND_DEVICE = 'device'
+    KIND_USER = 'user'
+    KIND_CHOICES = [
+        (KIND_DEVICE, 'Cihaz'),
+        (KIND_USER, 'Kullanıcı'),
+    ]
+    
+    kind = models.CharField(
+        max_length=10,
+        choices=KIND_CHOICES,
+        verbose_name='Kayıt Türü'
+    )
+    
+    date = models.DateField(
+        verbose_name='Tarih'
+    )
+    
+    # Cihaz cinsi veya kullanıcı rolü
+    dimension = models.CharField(
+        max_length=20,
+        verbose_name='Boyut'
+    )
+    
+    count = models.IntegerField(
+        default=0,
+        verbose_name='Adet'
+    )
+    
+    class Meta:
+        verbose_name = 'Günlük Özet'
+        verbose_name_plural = 'Günlük Özetler'
+        ordering = ['kind', 'date', 'dimension']
+        db_table = 'gunluk_ozetler'
+        constraints = [
+            # (kind, date) önekli aralık okumaları da bu indeksi kullanır
+            models.UniqueConstraint(fields=['kind', 'date', 'dimension'], name='gunluk_ozet_uniq'),
+        ]
+    
+    def __str__(self):
+        return f"{self.get_kind_display()} {self.date} {self.dimension}: {self.count}"
+
+
+class GlobalCounter(models.Model):
+    """Başlık sayıları (aktif kullanıcı, cinse/duruma göre cihaz, kilitli hesap, log).
+
+    Satırlar dashboard.counters modülü tarafından sinyallerle F() ile
+    artırılıp azaltılır; sayfalar tablo büyüdükçe yavaşlayan COUNT yerine
+    bu küçük tabloyu okur. reconcile_global_counters komutu sapmaları düzeltir.
+    """
+    
+    name = models.CharField(
+        max_length=64,
+        unique=True,
+        verbose_name='Sayaç'
+    )
+    
+    value = models.BigIntegerField(
+        default=0,
+        verbose_name='Değer'
+    )
+    
+    class Meta:
+        verbose_name = 'Genel Sayaç'
+        verbose_name_plural = 'Genel Sayaçlar'
+        ordering = ['name']
+        db_table = 'genel_sayaclar'
+    
+    def __str__(self):
+        return f"{self.name}: {self.value}"
@@ -0,0 +1,78 @@
+from collections import Counter
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from devices.models import Device
+
+from .models import DailyRollup
+
+
+def record(kind, day, dimension, delta):
+    """(gün, boyut) satırını delta kadar değiştirir; satır yoksa oluşturur"""
+    if not delta:
+        return
+    rows = DailyRollup.objects.filter(kind=kind, date=day, dimension=dimension)
+    if rows.update(count=F('count') + delta):
+        return
+    try:
+        with transaction.atomic():
+            DailyRollup.objects.create(kind=kind, date=day, dimension=dimension, count=delta)
+    except IntegrityError:
+        # Eşzamanlı bir istek satırı önce oluşturdu
+        rows.update(count=F('count') + delta)
+
+
+def record_counts(kind, counts, sign=1):
+    """{(gün, boyut): adet} sayımlarını özet tabloya ekler (sign=-1 ile düşer)"""
+    for (day, dimension), total in counts.items():
+        record(kind, day, dimension, sign * total)
+
+
+def device_counts(devices):
+    """Cihaz listesinin (gün, cihaz cinsi) dağılımı"""
+    return Counter((timezone.localdate(device.created_at), device.device_type) for device in devices)
+
+
+def queryset_counts(queryset, date_field, dimension_field):
+    """Queryset'in (gün, boyut) dağılımı (tek GROUP BY sorgusu)"""
+    rows = (
+        queryset.order_by()
+        .annotate(day=TruncDate(date_field))
+        .values_list('day', dimension_field)
+        .annotate(total=Count('pk'))
+    )
+    return Counter({(day, dimension): total for day, dimension, total in rows})
+
+
+def daily_series(kind, start, end, dimension=None):
+    """start..end (dahil) arası günlük yeni kayıt sayıları (tek aralık okuması)"""
+    rows = DailyRollup.objects.filter(kind=kind, date__range=(start, end))
+    if dimension is not None:
+        rows = rows.filter(dimension=dimension)
+    totals = dict(rows.order_by().values_list('date').annotate(total=Sum('count')))
+    return [
+        {'date': day, 'count': totals.get(day, 0)}
+        for day in (start + timedelta(days=offset) for offset in range((end - start).days + 1))
+    ]
+
+
+def backfill():
+    """Özet tabloyu cihaz ve kullanıcı tablolarından baştan oluşturur; satır sayısını döndürür"""
+    sources = (
+        (DailyRollup.KIND_DEVICE, queryset_counts(Device.objects.all(), 'created_at', 'device_type')),
+        (DailyRollup.KIND_USER, queryset_counts(get_user_model().objects.all(), 'date_joined', 'role')),
+    )
+    rows = [
+        DailyRollup(kind=kind, date=day, dimension=dimension, count=total)
+        for kind, counts in sources
+        for (day, dimension), total in counts.items()
+    ]
+    with transaction.atomic():
+        DailyRollup.objects.all().delete()
+        DailyRollup.objects.bulk_create(rows, batch_size=2000)
+    return len(rows)
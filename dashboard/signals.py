@@ -0,0 +1,165 @@
+from collections import Counter
+
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from devices.models import Device
+from devices.signals import (
+    device_toggled, devices_bulk_created, devices_bulk_deleting, devices_bulk_updating, is_bulk_delete,
+)
+from users.models import UserLog
+
+from . import counters, rollups, snapshots, widgets
+from .models import DailyRollup
+
+User = get_user_model()
+
+
+@receiver(post_save, sender=Device)
+def device_saved(sender, instance, created, **kwargs):
+    """Yeni cihazı günlük özete ekle; cinsi değiştiyse kaydı yeni cinse taşı"""
+    previous = instance.loaded_values
+    current = counters.device_counter(instance.device_type, instance.is_active)
+    if created:
+        counters.adjust(current, 1)
+    else:
+        before = counters.device_counter(
+            previous.get('device_type', instance.device_type), previous.get('is_active', instance.is_active)
+        )
+        if before != current:
+            counters.adjust(before, -1)
+            counters.adjust(current, 1)
+    
+    previous_type = previous.get('device_type', instance.device_type)
+    if not created and previous_type == instance.device_type:
+        return
+    day = timezone.localdate(instance.created_at)
+    if not created:
+        rollups.record(DailyRollup.KIND_DEVICE, day, previous_type, -1)
+    rollups.record(DailyRollup.KIND_DEVICE, day, instance.device_type, 1)
+
+
+@receiver(post_delete, sender=Device)
+def device_deleted(sender, instance, origin=None, **kwargs):
+    if is_bulk_delete(origin):
+        return
+    rollups.record(DailyRollup.KIND_DEVICE, timezone.localdate(instance.created_at), instance.device_type, -1)
+    counters.adjust(counters.device_counter(instance.device_type, instance.is_active), -1)
+
+
+@receiver(devices_bulk_created)
+def devices_bulk_created_handler(sender, devices, **kwargs):
+    rollups.record_counts(DailyRollup.KIND_DEVICE, rollups.device_counts(devices))
+    counters.adjust_many(Counter(counters.device_counter(device.device_type, device.is_active) for device in devices))
+
+
+@receiver(devices_bulk_deleting)
+def devices_bulk_deleting_handler(sender, queryset, **kwargs):
+    counts = rollups.queryset_counts(queryset, 'created_at', 'device_type')
+    rollups.record_counts(DailyRollup.KIND_DEVICE, counts, sign=-1)
+    counters.adjust_many(counters.device_changes(queryset), sign=-1)
+
+
+@receiver(devices_bulk_updating)
+def devices_bulk_updating_handler(sender, queryset, status=None, **kwargs):
+    """Toplu durum değişikliğini cihaz sayaçlarına uygula (UPDATE öncesi dağılımdan)"""
+    if status is not None:
+        counters.adjust_many(counters.device_changes(queryset, new_active=status))
+
+
+@receiver(device_toggled)
+def device_toggled_handler(sender, device, **kwargs):
+    counters.adjust(counters.device_counter(device.device_type, not device.is_active), -1)
+    counters.adjust(counters.device_counter(device.device_type, device.is_active), 1)
+
+
+# Kullanıcı kaydında önceki hali gereken alanlar (özet rolü, genel sayaçlar)
+USER_STATE_FIELDS = ('role', 'is_active', 'is_locked')
+
+
+@receiver(pre_save, sender=User)
+def user_pre_save(sender, instance, update_fields=None, **kwargs):
+    """Rol/durum değişimini görebilmek için kayıtlı değerleri oku (bu alanlar yazılmıyorsa sorgu yapılmaz)"""
+    instance._previous_state = None
+    if instance._state.adding or (update_fields is not None and not set(update_fields) & set(USER_STATE_FIELDS)):
+        return
+    instance._previous_state = User.objects.filter(pk=instance.pk).values(*USER_STATE_FIELDS).first()
+
+
+@receiver(post_save, sender=User)
+def user_saved(sender, instance, created, **kwargs):
+    day = timezone.localdate(instance.date_joined)
+    if created:
+        rollups.record(DailyRollup.KIND_USER, day, instance.role, 1)
+        counters.adjust_many(counters.user_counters(instance.is_active, instance.is_locked))
+        return
+    previous = getattr(instance, '_previous_state', None)
+    if previous is None:
+        return
+    if previous['role'] != instance.role:
+        rollups.record(DailyRollup.KIND_USER, day, previous['role'], -1)
+        rollups.record(DailyRollup.KIND_USER, day, instance.role, 1)
+    counters.adjust_many(counters.user_counters(previous['is_active'], previous['is_locked']), sign=-1)
+    counters.adjust_many(counters.user_counters(instance.is_active, instance.is_locked))
+
+
+@receiver(post_delete, sender=User)
+def user_deleted(sender, instance, **kwargs):
+    rollups.record(DailyRollup.KIND_USER, timezone.localdate(instance.date_joined), instance.role, -1)
+    counters.adjust_many(counters.user_counters(instance.is_active, instance.is_locked), sign=-1)
+
+
+@receiver(post_save, sender=UserLog)
+def log_saved(sender, instance, created, **kwargs):
+    if created:
+        counters.adjust(counters.LOGS_TOTAL, 1)
+
+
+@receiver(post_delete, sender=UserLog)
+def log_deleted(sender, instance, **kwargs):
+    counters.adjust(counters.LOGS_TOTAL, -1)
+
+
+def _invalidate_owners(user_ids):
+    snapshots.invalidate(snapshots.GLOBAL_SCOPE, *(snapshots.user_scope(user_id) for user_id in user_ids))
+
+
+@receiver(post_save, sender=Device)
+@receiver(post_delete, sender=Device)
+def device_changed(sender, instance, **kwargs):
+    """Yönetici ve cihaz sahibi (sahip değiştiyse eski sahip de) görüntülerini geçersiz say"""
+    if is_bulk_delete(kwargs.get('origin')):
+        return
+    _invalidate_owners({instance.user_id, instance.loaded_values.get('user_id', instance.user_id)})
+
+
+@receiver(devices_bulk_created)
+def devices_bulk_created_snapshots(sender, devices, **kwargs):
+    _invalidate_owners({device.user_id for device in devices})
+
+
+@receiver(devices_bulk_updating)
+@receiver(devices_bulk_deleting)
+def devices_bulk_changed_snapshots(sender, queryset, **kwargs):
+    _invalidate_owners(set(queryset.order_by().values_list('user_id', flat=True).distinct()))
+
+
+@receiver(device_toggled)
+def device_toggled_snapshots(sender, device, **kwargs):
+    _invalidate_owners({device.user_id})
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def user_changed(sender, instance, **kwargs):
+    _invalidate_owners({instance.pk})
+
+
+@receiver(post_save, sender=UserLog)
+@receiver(post_delete, sender=UserLog)
+def log_changed(sender, instance, **kwargs):
+    """Yalnızca aktivite widget'larını geçersiz say; sayaç ve grafikler loglardan etkilenmez"""
+    snapshots.invalidate(snapshots.GLOBAL_SCOPE, snapshots.user_scope(instance.user_id), names=widgets.LOG_WIDGETS)
+
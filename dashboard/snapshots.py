@@ -0,0 +1,121 @@
+"""Dashboard verilerinin Django cache'inde tutulan anlık görüntüleri.
+
+Her kapsam (yöneticilerin ortak görünümü, her standart kullanıcı) için
+hesaplanan context cache'e yazılır; yaygın durumda sayfa tek bir cache
+okuması (get_many) ile üretilir.
+
+Cihaz ve kullanıcı değişiklikleri kapsamın, log değişiklikleri yalnızca
+ilgili görüntülerin geçersizleşme zamanını günceller (dashboard/signals.py). Süresi dolan veya geçersizleşen görüntüyü
+yalnızca kilidi alan istek yeniden hesaplar; diğer istekler bu sırada eski
+görüntüyü sunar (stale-while-revalidate).
+
+Görüntüler yalnızca süreçler arası paylaşılan bir cache'te (Redis, dosya,
+veritabanı) tutulur; süreç içi cache'te (LocMem) bir worker'daki
+geçersizleşme diğerlerine ulaşmayacağından her istek yeniden hesaplar.
+"""
+import time
+
+from django.core.cache import cache, caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import transaction
+
+# Görüntünün taze sayıldığı süre (sn)
+FRESH_SECONDS = 300
+
+# Taze olmayan görüntünün yeniden hesaplanırken sunulabileceği ek süre (sn)
+STALE_SECONDS = 3600
+
+# Yeniden hesaplama kilidi; hesaplayan istek düşerse kilit kendiliğinden kalkar
+LOCK_SECONDS = 30
+
+GLOBAL_SCOPE = 'global'
+
+
+def is_shared_cache():
+    """Varsayılan cache tüm worker süreçlerinde ortak mı?"""
+    return not isinstance(caches['default'], (LocMemCache, DummyCache))
+
+
+def user_scope(user_id):
+    return f'user:{user_id}'
+
+
+def scope_for(user):
+    """Kullanıcının gördüğü dashboard kapsamı"""
+    return GLOBAL_SCOPE if user.can_view_all_devices else user_scope(user.pk)
+
+
+def _snapshot_key(scope, name):
+    return f'dashboard:snapshot:{scope}:{name}'
+
+
+def _invalidated_key(scope, name=None):
+    # name verilmezse kapsamın tüm görüntülerini kapsayan işaret
+    if name is None:
+        return f'dashboard:invalidated:{scope}'
+    return f'dashboard:invalidated:{scope}:{name}'
+
+
+def _lock_key(scope, name):
+    return f'dashboard:refreshing:{scope}:{name}'
+
+
+def _is_fresh(entry, invalidated_at):
+    return time.time() < entry['fresh_until'] and (invalidated_at or 0) < entry['computed_at']
+
+
+def _entry(data, computed_at):
+    return {'data': data, 'computed_at': computed_at, 'fresh_until': computed_at + FRESH_SECONDS}
+
+
+def get_snapshot(scope, name, compute):
+    """Kapsamın `name` görüntüsünü döndürür; gerekirse compute() ile yeniden hesaplar.
+
+    compute() cache'e yazılabilir (pickle edilebilir) bir değer döndürmelidir.
+    Görüntü hem kapsamın hem de kendi geçersizleşme işaretine bakar.
+    """
+    if not is_shared_cache():
+        return compute()
+    snapshot_key = _snapshot_key(scope, name)
+    markers = [_invalidated_key(scope), _invalidated_key(scope, name)]
+    cached = cache.get_many([snapshot_key, *markers])
+    entry = cached.get(snapshot_key)
+
+    locked = False
+    if entry is not None:
+        if _is_fresh(entry, max(cached.get(key, 0) for key in markers)):
+            return entry['data']
+        # Başka bir istek zaten yeniden hesaplıyorsa eski görüntü sunulur
+        locked = cache.add(_lock_key(scope, name), 1, LOCK_SECONDS)
+        if not locked:
+            return entry['data']
+
+    try:
+        # Hesaplama sırasında gelen değişiklikler görüntüyü geçersiz bırakır
+        computed_at = time.time()
+        data = compute()
+        cache.set(snapshot_key, _entry(data, computed_at), FRESH_SECONDS + STALE_SECONDS)
+    finally:
+        if locked:
+            cache.delete(_lock_key(scope, name))
+    return data
+
+
+def invalidate(*scopes, names=None):
+    """Kapsamların görüntülerini (names verilirse yalnızca o görüntüleri) geçersiz sayar.
+
+    İşaret hem hemen hem de transaction commit edildikten sonra konur;
+    commit'ten önce eski veriyle hesaplanan bir görüntü böylece taze kalmaz.
+    """
+    if names is None:
+        keys = {_invalidated_key(scope) for scope in scopes}
+    else:
+        keys = {_invalidated_key(scope, name) for scope in scopes for name in names}
+
+    def mark():
+        now = time.time()
+        cache.set_many(dict.fromkeys(keys, now), FRESH_SECONDS + STALE_SECONDS)
+
+    mark()
+    transaction.on_commit(mark)
@@ -0,0 +1,100 @@
+import math
+from datetime import date, timedelta
+
+from django.db.models import Count, DateField, Sum
+from django.db.models.functions import TruncDay, TruncMonth, TruncWeek
+
+from devices.models import Device
+from users.models import UserLog
+
+from .models import DailyRollup
+
+# Kova başlangıcına kesme fonksiyonları (haftalar pazartesi başlar)
+GRANULARITIES = {
+    'day': TruncDay,
+    'week': TruncWeek,
+    'month': TruncMonth,
+}
+
+SERIES = ('devices', 'users', 'activity')
+
+DEFAULT_MAX_POINTS = 120
+MAX_POINTS_LIMIT = 500
+
+# Tek istekte izin verilen en uzun tarih aralığı (gün)
+MAX_RANGE_DAYS = 3660
+
+
+def bucket_start(day, granularity):
+    """Tarihin ait olduğu kovanın ilk günü"""
+    if granularity == 'week':
+        return day - timedelta(days=day.weekday())
+    if granularity == 'month':
+        return day.replace(day=1)
+    return day
+
+
+def bucket_index(first, day, granularity):
+    """day'in ait olduğu kovanın, first kovasından itibaren sırası"""
+    day = bucket_start(day, granularity)
+    if granularity == 'week':
+        return (day - first).days // 7
+    if granularity == 'month':
+        return (day.year - first.year) * 12 + day.month - first.month
+    return (day - first).days
+
+
+def bucket_at(first, index, granularity):
+    """first kovasından itibaren index'inci kovanın ilk günü"""
+    if granularity == 'week':
+        return first + timedelta(days=7 * index)
+    if granularity == 'month':
+        months = first.month - 1 + index
+        return date(first.year + months // 12, months % 12 + 1, 1)
+    return first + timedelta(days=index)
+
+
+def _grouped(queryset, field, granularity, value):
+    """Kovaya göre tek GROUP BY sorgusu: {kova başlangıcı: değer}"""
+    bucket = GRANULARITIES[granularity](field, output_field=DateField())
+    return dict(queryset.order_by().annotate(bucket=bucket).values_list('bucket').annotate(total=value))
+
+
+def _source(name, user, start, end):
+    """Seri için (queryset, tarih alanı, toplanacak değer) üçlüsü"""
+    if name == 'activity':
+        logs = UserLog.objects.filter(created_at__date__range=(start, end))
+        if not user.can_view_all_devices:
+            logs = logs.filter(user=user)
+        return logs, 'created_at', Count('pk')
+    if name == 'devices' and not user.can_view_all_devices:
+        # Özet tablo kullanıcı bazında tutulmaz; kendi cihazları doğrudan sayılır
+        devices = Device.objects.filter(user=user, created_at__date__range=(start, end))
+        return devices, 'created_at', Count('pk')
+    kind = DailyRollup.KIND_DEVICE if name == 'devices' else DailyRollup.KIND_USER
+    rollup = DailyRollup.objects.filter(kind=kind, date__range=(start, end))
+    return rollup, 'date', Sum('count')
+
+
+def build_series(name, user, start, end, granularity='day', max_points=DEFAULT_MAX_POINTS):
+    """Kayıt/aktivite serisini kovalar, boşlukları 0 ile doldurur ve seyreltir.
+
+    Kova sayısı max_points'i aşarsa ardışık kovalar toplanarak birleştirilir.
+    Adım kova sayısından hesaplanır; kovalar tek tek üretilmez, maliyet
+    nokta ve veri satırı sayısıyla orantılıdır.
+    """
+    queryset, field, value = _source(name, user, start, end)
+    totals = _grouped(queryset, field, granularity, value)
+
+    first = bucket_start(start, granularity)
+    buckets = bucket_index(first, end, granularity) + 1
+    step = math.ceil(buckets / max_points)
+    counts = [0] * math.ceil(buckets / step)
+    for day, total in totals.items():
+        index = bucket_index(first, day, granularity)
+        if 0 <= index < buckets:
+            counts[index // step] += total or 0
+    return [
+        {'date': bucket_at(first, position * step, granularity), 'count': count}
+        for position, count in enumerate(counts)
+    ]
@@ -1,314 +1,187 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from django.core.paginator import Paginator
 from django.http import JsonResponse
 from django.views.decorators.http import require_http_methods
 from django.views.decorators.csrf import csrf_exempt
 from django.utils.decorators import method_decorator
 from django.views import View
+import hashlib
 import json
 import platform
 import django
 from datetime import datetime, timedelta
 from users.models import CustomUser, UserLog, QuickAction
 from devices.models import Device
+from devices.pagination import CursorPaginator
+from devices.stats import get_device_stats
 from django.db.models import Count, Q, Sum
 from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import quote_etag
+from asgiref.sync import sync_to_async
+from . import activity, concurrency, counters, timeseries, widgets
+
 
 @login_required
 def home_view(request):
-    """Ana dashboard view'ı"""
-    user = request.user
+    """Ana dashboard view'ı.
     
-    # Kullanıcının yetkisine göre veri getir
+    Yalnızca sayfa iskeletini render eder (sorgu çalıştırmaz); sayılar,
+    grafikler ve son aktiviteler tarayıcı tarafından widget_api'den paralel
+    olarak çekilir.
+    """
+    context = {
+        'is_admin': request.user.can_view_all_devices,
+        'widgets': [name for name in widgets.WIDGETS if widgets.is_allowed(name, request.user)],
+    }
+    return render(request, 'dashboard/home.html', context)
+
+
+@login_required
+@require_http_methods(["GET"])
+def widget_api(request, name):
+    """Ana sayfa widget verisi (her widget ayrı çekilir ve cache'lenir).
+
+    ETag ile doğrulanır: veri değişmediyse tarayıcı 304 alır.
+    """
+    if name not in widgets.WIDGETS:
+        return JsonResponse({'error': 'Bilinmeyen widget'}, status=404)
+    if not widgets.is_allowed(name, request.user):
+        return JsonResponse({'error': 'Yetkisiz erişim'}, status=403)
+    
+    response = JsonResponse(widgets.get_widget(name, request.user))
+    etag = quote_etag(hashlib.sha256(response.content).hexdigest()[:32])
+    response['ETag'] = etag
+    patch_cache_control(response, private=True, no_cache=True)
+    return get_conditional_response(request, etag=etag, response=response)
+
+
+def _statistics_queries(user):
+    """İstatistikler sayfasının birbirinden bağımsız sorguları {ad: fonksiyon}"""
+    queries = {'recent_activities': lambda: widgets.recent_activities(user, 5)}
     if user.can_view_all_devices:
-        # Admin için tüm veriler
-        total_users = CustomUser.objects.filter(is_active=True).count()
-        total_devices = Device.objects.count()
-        active_devices = Device.objects.filter(is_active=True).count()
-        inactive_devices = Device.objects.filter(is_active=False).count()
-        
-        # Son 7 günlük yeni kullanıcılar
-        last_7_days_users = []
-        for i in range(7):
-            date = timezone.now().date() - timedelta(days=i)
-            count = CustomUser.objects.filter(date_joined__date=date).count()
-            last_7_days_users.append({
-                'date': date.strftime('%d.%m'),
-                'count': count
-            })
-        last_7_days_users.reverse()
-        
-        # Son 7 günlük yeni cihazlar
-        last_7_days_devices = []
-        for i in range(7):
-            date = timezone.now().date() - timedelta(days=i)
-            count = Device.objects.filter(created_at__date=date).count()
-            last_7_days_devices.append({
-                'date': date.strftime('%d.%m'),
-                'count': count
-            })
-        last_7_days_devices.reverse()
-        
-        # Cihaz türüne göre dağılım
-        device_type_stats = {}
-        for device_type, display_name in Device.DEVICE_TYPE_CHOICES:
-            count = Device.objects.filter(device_type=device_type).count()
-            if count > 0:
-                device_type_stats[display_name] = count
-        
-        # Kullanıcı rolüne göre dağılım
-        user_role_stats = {}
-        for role, display_name in CustomUser.ROLE_CHOICES:
-            count = CustomUser.objects.filter(role=role, is_active=True).count()
-            if count > 0:
-                user_role_stats[display_name] = count
-        
-        # Son aktiviteler (son 10 log)
-        recent_activities = UserLog.objects.select_related('user').order_by('-created_at')[:10]
-        
-        # Kullanıcı başına cihaz ortalaması
-        avg_devices_per_user = total_devices / total_users if total_users > 0 else 0
-        
-        # Kilitli hesaplar
-        locked_accounts = CustomUser.objects.filter(is_locked=True).count()
-        
-        context = {
-            'total_users': total_users,
-            'total_devices': total_devices,
-            'active_devices': active_devices,
-            'inactive_devices': inactive_devices,
-            'avg_devices_per_user': round(avg_devices_per_user, 1),
-            'locked_accounts': locked_accounts,
-            'device_type_stats': device_type_stats,
-            'user_role_stats': user_role_stats,
-            'last_7_days_users': last_7_days_users,
-            'last_7_days_devices': last_7_days_devices,
-            'recent_activities': recent_activities,
+        queries['counters'] = counters.read
+        queries['user_role_stats'] = widgets.role_counts
+        # En çok cihaza sahip kullanıcılar
+        queries['top_users'] = lambda: list(
+            CustomUser.objects.filter(device_count__gt=0).order_by('-device_count')[:5]
+        )
+    else:
+        queries['device_stats'] = lambda: get_device_stats(Device.objects.filter(user=user))
+    return queries
+
+
+def _statistics_context(user, results):
+    """Sorgu sonuçlarından istatistikler context'i (Chart.js veri formatlarıyla)"""
+    if user.can_view_all_devices:
+        device_stats, context = widgets.admin_totals(results['counters'])
+        context.update({
+            'user_role_labels': list(results['user_role_stats']),
+            'user_role_data': list(results['user_role_stats'].values()),
+            'top_users': results['top_users'],
             'is_admin': True
-        }
-        
+        })
     else:
         # Standart kullanıcı için sadece kendi verileri
-        user_devices = Device.objects.filter(user=user)
-        total_devices = user_devices.count()
-        active_devices = user_devices.filter(is_active=True).count()
-        inactive_devices = user_devices.filter(is_active=False).count()
-        
-        # Son 7 günlük yeni cihazlar (kullanıcının kendi cihazları)
-        last_7_days_devices = []
-        for i in range(7):
-            date = timezone.now().date() - timedelta(days=i)
-            count = user_devices.filter(created_at__date=date).count()
-            last_7_days_devices.append({
-                'date': date.strftime('%d.%m'),
-                'count': count
-            })
-        last_7_days_devices.reverse()
-        
-        # Cihaz türüne göre dağılım (kullanıcının kendi cihazları)
-        device_type_stats = {}
-        for device_type, display_name in Device.DEVICE_TYPE_CHOICES:
-            count = user_devices.filter(device_type=device_type).count()
-            if count > 0:
-                device_type_stats[display_name] = count
-        
-        # Son aktiviteler (kullanıcının kendi logları)
-        recent_activities = UserLog.objects.filter(user=user).order_by('-created_at')[:10]
-        
+        device_stats = results['device_stats']
         context = {
-            'total_devices': total_devices,
-            'active_devices': active_devices,
-            'inactive_devices': inactive_devices,
-            'device_type_stats': device_type_stats,
-            'last_7_days_devices': last_7_days_devices,
-            'recent_activities': recent_activities,
+            'total_devices': device_stats['total'],
+            'active_devices': device_stats['active'],
+            'inactive_devices': device_stats['inactive'],
             'is_admin': False
         }
-    
-    return render(request, 'dashboard/home.html', context)
+    context.update({
+        'device_type_labels': [item['display_name'] for item in device_stats['type_stats']],
+        'device_type_data': [item['count'] for item in device_stats['type_stats']],
+        'recent_activities': results['recent_activities'],
+    })
+    return context
+
 
 @login_required
 def statistics_view(request):
     """İstatistikler view'ı"""
     user = request.user
-    
-    if user.can_view_all_devices:
-        # Admin için tüm veriler
-        total_users = CustomUser.objects.filter(is_active=True).count()
-        total_devices = Device.objects.count()
-        active_devices = Device.objects.filter(is_active=True).count()
-        inactive_devices = Device.objects.filter(is_active=False).count()
-        locked_accounts = CustomUser.objects.filter(is_locked=True).count()
-        
-        # Kullanıcı başına cihaz ortalaması
-        avg_devices_per_user = total_devices / total_users if total_users > 0 else 0
-        
-        # Son 7 günlük kullanıcı kayıtları
-        last_7_days_users = []
-        for i in range(7):
-            date = timezone.now().date() - timedelta(days=i)
-            count = CustomUser.objects.filter(date_joined__date=date).count()
-            last_7_days_users.append({'date': date.strftime('%d.%m'), 'count': count})
-        last_7_days_users.reverse()
-        
-        # Son 7 günlük cihaz kayıtları
-        last_7_days_devices = []
-        for i in range(7):
-            date = timezone.now().date() - timedelta(days=i)
-            count = Device.objects.filter(created_at__date=date).count()
-            last_7_days_devices.append({'date': date.strftime('%d.%m'), 'count': count})
-        last_7_days_devices.reverse()
-        
-        # Chart.js için veri formatları
-        user_role_labels = []
-        user_role_data = []
-        for role, display_name in CustomUser.ROLE_CHOICES:
-            count = CustomUser.objects.filter(role=role, is_active=True).count()
-            if count > 0:
-                user_role_labels.append(display_name)
-                user_role_data.append(count)
-        
-        device_type_labels = []
-        device_type_data = []
-        for device_type, display_name in Device.DEVICE_TYPE_CHOICES:
-            count = Device.objects.filter(device_type=device_type).count()
-            if count > 0:
-                device_type_labels.append(display_name)
-                device_type_data.append(count)
-        
-        # En çok cihaza sahip kullanıcılar
-        top_users = CustomUser.objects.annotate(
-            device_count=Count('devices')
-        ).filter(device_count__gt=0).order_by('-device_count')[:5]
-        
-        # Son aktiviteler
-        recent_activities = UserLog.objects.select_related('user').order_by('-created_at')[:5]
-        
-        context = {
-            'total_users': total_users,
-            'total_devices': total_devices,
-            'active_devices': active_devices,
-            'inactive_devices': inactive_devices,
-            'locked_accounts': locked_accounts,
-            'avg_devices_per_user': round(avg_devices_per_user, 1),
-            'user_role_labels': user_role_labels,
-            'user_role_data': user_role_data,
-            'device_type_labels': device_type_labels,
-            'device_type_data': device_type_data,
-            'weekly_user_labels': [item['date'] for item in last_7_days_users],
-            'weekly_user_data': [item['count'] for item in last_7_days_users],
-            'weekly_device_labels': [item['date'] for item in last_7_days_devices],
-            'weekly_device_data': [item['count'] for item in last_7_days_devices],
-            'top_users': top_users,
-            'recent_activities': recent_activities,
-            'is_admin': True
-        }
-    else:
-        # Standart kullanıcı için sadece kendi verileri
-        user_devices = Device.objects.filter(user=user)
-        total_devices = user_devices.count()
-        active_devices = user_devices.filter(is_active=True).count()
-        inactive_devices = user_devices.filter(is_active=False).count()
-        
-        # Son 7 günlük cihaz kayıtları (kullanıcının kendi cihazları)
-        last_7_days_devices = []
-        for i in range(7):
-            date = timezone.now().date() - timedelta(days=i)
-            count = user_devices.filter(created_at__date=date).count()
-            last_7_days_devices.append({'date': date.strftime('%d.%m'), 'count': count})
-        last_7_days_devices.reverse()
-        
-        # Cihaz türüne göre dağılım (kullanıcının kendi cihazları)
-        device_type_labels = []
-        device_type_data = []
-        for device_type, display_name in Device.DEVICE_TYPE_CHOICES:
-            count = user_devices.filter(device_type=device_type).count()
-            if count > 0:
-                device_type_labels.append(display_name)
-                device_type_data.append(count)
-        
-        # Son aktiviteler (kullanıcının kendi aktiviteleri)
-        recent_activities = UserLog.objects.filter(user=user).order_by('-created_at')[:5]
-        
-        context = {
-            'total_devices': total_devices,
-            'active_devices': active_devices,
-            'inactive_devices': inactive_devices,
-            'device_type_labels': device_type_labels,
-            'device_type_data': device_type_data,
-            'weekly_device_labels': [item['date'] for item in last_7_days_devices],
-            'weekly_device_data': [item['count'] for item in last_7_days_devices],
-            'recent_activities': recent_activities,
-            'is_admin': False
-        }
-    
+    context = _statistics_context(user, concurrency.run_queries(_statistics_queries(user)))
     return render(request, 'dashboard/statistics.html', context)
 
+
+@login_required
+async def statistics_async_view(request):
+    """statistics_view'ın async karşılığı (ASGI); bağımsız sorgular eşzamanlı çalışır"""
+    user = await request.auser()
+    context = _statistics_context(user, await concurrency.gather_queries(_statistics_queries(user)))
+    return await sync_to_async(render)(request, 'dashboard/statistics.html', context)
+
 def activity_log_view(request):
-    """Aktivite logları view'ı"""
+    """Aktivite logları view'ı.
+    
+    Sayfalama (created_at, id) üzerinden cursor ile yapılır (COUNT ve OFFSET
+    yok); dönem toplamları tek aggregate ile hesaplanıp kısa süre cache'lenir.
+    """
     user = request.user
     
     # Kullanıcının yetkisine göre logları getir
     if hasattr(request, 'user') and request.user.is_authenticated:
         if user.can_view_all_devices:
-            logs = UserLog.objects.all().select_related('user').order_by('-created_at')
+            logs = UserLog.objects.all()
+            scope = 'all'
         else:
-            logs = UserLog.objects.filter(user=user).order_by('-created_at')
+            logs = UserLog.objects.filter(user=user)
+            scope = user.pk
     else:
         # Anonymous user için tüm logları göster
-        logs = UserLog.objects.all().select_related('user').order_by('-created_at')
+        logs = UserLog.objects.all()
+        scope = 'all'
     
     # Filtreleme
     log_type_filter = request.GET.get('log_type')
     user_filter = request.GET.get('user')
     start_date_filter = request.GET.get('start_date')
     end_date_filter = request.GET.get('end_date')
+    # Cache anahtarı için yalnızca uygulanan filtreler
+    applied_filters = {}
     
     if log_type_filter:
         logs = logs.filter(log_type=log_type_filter)
+        applied_filters['log_type'] = log_type_filter
     
     if user_filter:
         try:
             user_id = int(user_filter)
             logs = logs.filter(user_id=user_id)
+            applied_filters['user'] = user_id
         except ValueError:
             pass
     
+    # Tarih filtreleri gün sınırlarına çevrilir; created_at indeksi kullanılabilir
     if start_date_filter:
         try:
             start_date = datetime.strptime(start_date_filter, '%Y-%m-%d').date()
-            logs = logs.filter(created_at__date__gte=start_date)
+            logs = logs.filter(activity.created_between(start_date=start_date))
+            applied_filters['start_date'] = start_date
         except ValueError:
             pass
     
     if end_date_filter:
         try:
             end_date = datetime.strptime(end_date_filter, '%Y-%m-%d').date()
-            logs = logs.filter(created_at__date__lte=end_date)
+            logs = logs.filter(activity.created_between(end_date=end_date))
+            applied_filters['end_date'] = end_date
         except ValueError:
             pass
     
-    # Sayfalama
-    paginator = Paginator(logs, 50)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    # Sayfalama: cursor (keyset), sayfa maliyeti derinlikten bağımsız
+    paginator = CursorPaginator(logs.select_related('user'), '-created_at', per_page=50)
+    page_obj = paginator.get_page(request.GET.get('cursor'))
     
-    # İstatistikler
-    total_logs = logs.count()
+    # Sayfa linklerinde filtreleri korumak için sorgu dizesi
+    filter_params = request.GET.copy()
+    filter_params.pop('cursor', None)
     
-    # Bugün, bu hafta, bu ay istatistikleri
-    today = timezone.now().date()
-    week_start = today - timedelta(days=today.weekday())
-    month_start = today.replace(day=1)
-    
-    today_logs = logs.filter(created_at__date=today).count()
-    week_logs = logs.filter(created_at__date__gte=week_start).count()
-    month_logs = logs.filter(created_at__date__gte=month_start).count()
-    
-    # Kullanıcı listesi (filtre için)
-    users = CustomUser.objects.all().order_by('username')
+    # Toplam, bugün, bu hafta, bu ay istatistikleri (tek sorgu, cache'li)
+    totals = activity.period_totals(logs, scope, applied_filters)
     
     # Filtreler
     filters = {
@@ -320,12 +193,13 @@ def activity_log_view(request):
     
     context = {
         'page_obj': page_obj,
+        'is_paginated': page_obj.has_other_pages(),
+        'filter_query': filter_params.urlencode(),
         'is_admin': user.can_view_all_devices,
-        'total_logs': total_logs,
-        'today_logs': today_logs,
-        'week_logs': week_logs,
-        'month_logs': month_logs,
-        'users': users,
+        'total_logs': totals['total_logs'],
+        'today_logs': totals['today_logs'],
+        'week_logs': totals['week_logs'],
+        'month_logs': totals['month_logs'],
         'filters': filters
     }
     
@@ -350,10 +224,11 @@ def system_info_view(request):
         'disk_usage': 'N/A'  # psutil olmadan
     }
     
-    # Veritabanı istatistikleri
-    total_users = CustomUser.objects.filter(is_active=True).count()
-    total_devices = Device.objects.count()
-    total_logs = UserLog.objects.count()
+    # Veritabanı istatistikleri (genel sayaçlardan)
+    values = counters.read()
+    total_users = values.get(counters.USERS_ACTIVE, 0)
+    total_devices = counters.device_stats(values)['total']
+    total_logs = values.get(counters.LOGS_TOTAL, 0)
     total_quick_actions = QuickAction.objects.count()
     
     # Performans metrikleri (simüle edilmiş)
@@ -369,7 +244,7 @@ def system_info_view(request):
     total_disk = "512 GB" if platform.system() == "Darwin" else "256 GB"
     
     # Güvenlik bilgileri
-    locked_accounts = CustomUser.objects.filter(is_locked=True).count()
+    locked_accounts = values.get(counters.USERS_LOCKED, 0)
     failed_logins = CustomUser.objects.aggregate(
         total_failed=Sum('failed_login_attempts')
     )['total_failed'] or 0
@@ -435,10 +310,11 @@ def admin_panel_view(request):
         messages.error(request, 'Bu sayfaya erişim yetkiniz yok.')
         return redirect('dashboard:home')
     
-    # Sistem istatistikleri
-    total_users = CustomUser.objects.filter(is_active=True).count()
-    total_devices = Device.objects.count()
-    locked_accounts = CustomUser.objects.filter(is_locked=True).count()
+    # Sistem istatistikleri (genel sayaçlardan)
+    values = counters.read()
+    total_users = values.get(counters.USERS_ACTIVE, 0)
+    total_devices = counters.device_stats(values)['total']
+    locked_accounts = values.get(counters.USERS_LOCKED, 0)
     
     # Aktif oturum sayısı (yaklaşık)
     active_sessions = 1  # Şu anda giriş yapmış kullanıcı
@@ -485,6 +361,52 @@ def log_detail_api(request, log_id):
     except Exception as e:
         return JsonResponse({'error': str(e)}, status=500)
 
+@login_required
+@require_http_methods(["GET"])
+def timeseries_api(request):
+    """Kayıt/aktivite zaman serisi (grafikler sayfa yüklendikten sonra bunu çeker).
+
+    Parametreler: series (devices, users, activity), start/end (YYYY-MM-DD) veya
+    days, granularity (day, week, month), max_points.
+    """
+    series = request.GET.get('series', 'devices')
+    granularity = request.GET.get('granularity', 'day')
+    if series not in timeseries.SERIES:
+        return JsonResponse({'error': 'Geçersiz seri'}, status=400)
+    if granularity not in timeseries.GRANULARITIES:
+        return JsonResponse({'error': 'Geçersiz zaman aralığı birimi'}, status=400)
+    if series == 'users' and not request.user.can_view_all_devices:
+        return JsonResponse({'error': 'Yetkisiz erişim'}, status=403)
+    
+    try:
+        end = datetime.strptime(request.GET['end'], '%Y-%m-%d').date() if request.GET.get('end') else timezone.localdate()
+        if request.GET.get('start'):
+            start = datetime.strptime(request.GET['start'], '%Y-%m-%d').date()
+        else:
+            start = end - timedelta(days=int(request.GET.get('days', 7)) - 1)
+        max_points = int(request.GET.get('max_points', timeseries.DEFAULT_MAX_POINTS))
+    except (ValueError, OverflowError):
+        return JsonResponse({'error': 'Geçersiz tarih veya sayı'}, status=400)
+    if start > end:
+        return JsonResponse({'error': 'Başlangıç tarihi bitiş tarihinden sonra olamaz'}, status=400)
+    if (end - start).days >= timeseries.MAX_RANGE_DAYS:
+        return JsonResponse(
+            {'error': f'Tarih aralığı en fazla {timeseries.MAX_RANGE_DAYS} gün olabilir'}, status=400
+        )
+    max_points = min(max(max_points, 1), timeseries.MAX_POINTS_LIMIT)
+    
+    points = timeseries.build_series(series, request.user, start, end, granularity, max_points)
+    label_format = '%m.%Y' if granularity == 'month' else '%d.%m'
+    return JsonResponse({
+        'series': series,
+        'granularity': granularity,
+        'start': start.isoformat(),
+        'end': end.isoformat(),
+        'labels': [point['date'].strftime(label_format) for point in points],
+        'data': [point['count'] for point in points],
+        'total': sum(point['count'] for point in points),
+    })
+
 @login_required
 @require_http_methods(["POST"])
 def log_delete_api(request, log_id):
@@ -0,0 +1,142 @@
+"""Dashboard ana sayfasının widget verileri.
+
+Ana sayfa yalnızca iskeleti render eder; her widget tarayıcı tarafından
+kendi JSON endpoint'inden (views.widget_api) paralel olarak çekilir.
+Widget'lar kapsam başına ayrı ayrı cache'lenir (snapshots), böylece yavaş
+bir widget ne diğerlerini ne de sayfanın ilk çizimini bekletir.
+"""
+from datetime import timedelta
+
+from django.db.models import Count
+from django.utils import timezone
+
+from devices.models import Device
+from devices.stats import get_device_stats, type_counts_by_display
+from users.models import CustomUser, UserLog
+
+from . import counters, snapshots, timeseries
+
+# Haftalık kayıt grafiklerinin gün sayısı
+WEEKLY_DAYS = 7
+
+# Son aktiviteler widget'ındaki kayıt sayısı
+ACTIVITY_LIMIT = 10
+
+# Yalnızca log kayıtlarından hesaplanan widget'lar; log yazımları sadece bunları geçersizleştirir
+LOG_WIDGETS = ('activity',)
+
+
+def role_counts():
+    """Aktif kullanıcıların rol dağılımı {görünen ad: adet} (tek sorgu)"""
+    totals = dict(
+        CustomUser.objects.filter(is_active=True).order_by().values_list('role').annotate(count=Count('id'))
+    )
+    return {
+        display_name: totals[role]
+        for role, display_name in CustomUser.ROLE_CHOICES
+        if totals.get(role)
+    }
+
+
+def recent_activities(user, limit):
+    """Son aktiviteler; yönetici için tümü, standart kullanıcı için kendi logları"""
+    logs = UserLog.objects.select_related('user').order_by('-created_at')
+    if not user.can_view_all_devices:
+        logs = logs.filter(user=user)
+    return list(logs[:limit])
+
+
+def admin_totals(values):
+    """Genel sayaçlardan (cihaz istatistikleri, başlık sayıları) çifti"""
+    total_users = values.get(counters.USERS_ACTIVE, 0)
+    device_stats = counters.device_stats(values)
+    # Kullanıcı başına cihaz ortalaması
+    avg_devices_per_user = device_stats['total'] / total_users if total_users > 0 else 0
+    return device_stats, {
+        'total_users': total_users,
+        'total_devices': device_stats['total'],
+        'active_devices': device_stats['active'],
+        'inactive_devices': device_stats['inactive'],
+        'locked_accounts': values.get(counters.USERS_LOCKED, 0),
+        'avg_devices_per_user': round(avg_devices_per_user, 1),
+    }
+
+
+def _device_stats(user):
+    if user.can_view_all_devices:
+        return counters.device_stats(counters.read())
+    return get_device_stats(Device.objects.filter(user=user))
+
+
+def counts(user):
+    """Başlık sayıları; yönetici için genel sayaçlardan tek sorgu"""
+    if user.can_view_all_devices:
+        return admin_totals(counters.read())[1]
+    device_stats = _device_stats(user)
+    return {
+        'total_devices': device_stats['total'],
+        'active_devices': device_stats['active'],
+        'inactive_devices': device_stats['inactive'],
+    }
+
+
+def device_types(user):
+    """Cihaz türü dağılımı (Chart.js formatında)"""
+    type_stats = type_counts_by_display(_device_stats(user))
+    return {'labels': list(type_stats), 'data': list(type_stats.values())}
+
+
+def roles(user):
+    """Kullanıcı rolü dağılımı (yalnızca yöneticiler)"""
+    role_stats = role_counts()
+    return {'labels': list(role_stats), 'data': list(role_stats.values())}
+
+
+def weekly(user):
+    """Son 7 günlük cihaz (yönetici için kullanıcı da) kayıt serileri"""
+    end = timezone.localdate()
+    start = end - timedelta(days=WEEKLY_DAYS - 1)
+    names = ('devices', 'users') if user.can_view_all_devices else ('devices',)
+    result = {}
+    for name in names:
+        points = timeseries.build_series(name, user, start, end)
+        result[name] = {
+            'labels': [point['date'].strftime('%d.%m') for point in points],
+            'data': [point['count'] for point in points],
+        }
+    return result
+
+
+def activity(user):
+    """Son aktiviteler"""
+    return {
+        'activities': [
+            {
+                'user_name': log.user.get_full_name() or log.user.username,
+                'log_type': log.log_type,
+                'description': log.description or '',
+                'created_at': timezone.localtime(log.created_at).strftime('%d.%m.%Y %H:%M'),
+            }
+            for log in recent_activities(user, ACTIVITY_LIMIT)
+        ]
+    }
+
+
+# Widget adı -> (hesaplama fonksiyonu, yalnızca yöneticiler)
+WIDGETS = {
+    'counts': (counts, False),
+    'device_types': (device_types, False),
+    'roles': (roles, True),
+    'weekly': (weekly, False),
+    'activity': (activity, False),
+}
+
+
+def is_allowed(name, user):
+    return not WIDGETS[name][1] or user.can_view_all_devices
+
+
+def get_widget(name, user):
+    """Widget verisi; kullanıcının kapsamında widget başına cache'lenir"""
+    compute = WIDGETS[name][0]
+    return snapshots.get_snapshot(snapshots.scope_for(user), name, lambda: compute(user))
@@ -1,9 +1,23 @@
+from django import forms
 from django.contrib import admin
+from django.urls import reverse
+from django.utils.html import format_html, format_html_join
 from django.utils.translation import gettext_lazy as _
-from .models import Device
+from . import catalog
+from .models import Device, DeviceBrand, DeviceGroup, DeviceModel, DuplicateCluster, DuplicateScan
+
+
+class DeviceAdminForm(forms.ModelForm):
+    def clean(self):
+        cleaned_data = super().clean()
+        if not self.errors:
+            catalog.clean_catalog(self.instance, cleaned_data)
+        return cleaned_data
+
 
 @admin.register(Device)
 class DeviceAdmin(admin.ModelAdmin):
+    form = DeviceAdminForm
     list_display = ('device_name', 'device_type', 'gsm_number', 'device_email', 'user', 'is_active', 'created_at')
     list_filter = ('device_type', 'is_active', 'created_at', 'user__role')
     search_fields = ('device_name', 'gsm_number', 'device_email', 'user__username', 'user__tc_kimlik', 'user__first_name', 'user__last_name')
@@ -14,7 +28,10 @@ class DeviceAdmin(admin.ModelAdmin):
             'fields': ('device_name', 'device_type', 'gsm_number', 'device_email')
         }),
         (_('Teknik Detaylar'), {
-            'fields': ('brand', 'model', 'imei')
+            'fields': ('brand', 'model', 'catalog_brand', 'catalog_model', 'imei')
+        }),
+        (_('Grup'), {
+            'fields': ('group',)
         }),
         (_('Kullanıcı Bilgileri'), {
             'fields': ('user',)
@@ -28,7 +45,8 @@ class DeviceAdmin(admin.ModelAdmin):
         }),
     )
     
-    readonly_fields = ('created_at', 'updated_at')
+    # Katalog kayıtları marka/model metninden otomatik atanır
+    readonly_fields = ('catalog_brand', 'catalog_model', 'created_at', 'updated_at')
     
     def get_queryset(self, request):
         return super().get_queryset(request).select_related('user')
@@ -77,3 +95,76 @@ class DeviceAdmin(admin.ModelAdmin):
             if 'delete_selected' in actions:
                 del actions['delete_selected']
         return actions
+
+
+@admin.register(DeviceGroup)
+class DeviceGroupAdmin(admin.ModelAdmin):
+    list_display = ('name', 'parent', 'device_count', 'active_count', 'created_at')
+    search_fields = ('name',)
+    raw_id_fields = ('parent',)
+    readonly_fields = ('device_count', 'active_count', 'created_at')
+
+
+class DeviceModelInline(admin.TabularInline):
+    model = DeviceModel
+    fields = ('name',)
+    extra = 0
+
+
+@admin.register(DeviceBrand)
+class DeviceBrandAdmin(admin.ModelAdmin):
+    list_display = ('name', 'key')
+    search_fields = ('name', 'key')
+    inlines = [DeviceModelInline]
+
+
+@admin.register(DeviceModel)
+class DeviceModelAdmin(admin.ModelAdmin):
+    list_display = ('name', 'brand', 'key')
+    list_filter = ('brand',)
+    search_fields = ('name', 'key', 'brand__name')
+
+
+@admin.register(DuplicateCluster)
+class DuplicateClusterAdmin(admin.ModelAdmin):
+    """Mükerrer cihaz raporu (find_duplicate_devices komutu doldurur)"""
+    list_display = ('key_type', 'key', 'device_count', 'user_count', 'score', 'is_dismissed', 'updated_at')
+    list_filter = ('key_type', 'is_dismissed', 'user_count')
+    search_fields = ('key',)
+    ordering = ('-score', '-device_count')
+    readonly_fields = ('key_type', 'key', 'device_count', 'user_count', 'score', 'member_devices', 'created_at', 'updated_at')
+    exclude = ('devices',)
+    actions = ['mark_dismissed']
+    
+    @admin.display(description=_('Cihazlar'))
+    def member_devices(self, obj):
+        devices = obj.devices.select_related('user').order_by('id')
+        return format_html('<ul>{}</ul>', format_html_join(
+            '', '<li><a href="{}">{}</a> - {} / IMEI: {} ({})</li>',
+            (
+                (reverse('admin:devices_device_change', args=[device.pk]), device.device_name or device.pk,
+                 device.gsm_number, device.imei or '-', device.user.get_full_name())
+                for device in devices
+            )
+        ))
+    
+    @admin.action(description=_('Seçili kümeleri incelendi olarak işaretle'))
+    def mark_dismissed(self, request, queryset):
+        updated = queryset.update(is_dismissed=True)
+        self.message_user(request, f'{updated} küme incelendi olarak işaretlendi.')
+    
+    def has_add_permission(self, request):
+        return False
+
+
+@admin.register(DuplicateScan)
+class DuplicateScanAdmin(admin.ModelAdmin):
+    list_display = ('started_at', 'finished_at', 'incremental', 'scanned_devices', 'cluster_count')
+    list_filter = ('incremental',)
+    readonly_fields = ('started_at', 'finished_at', 'incremental', 'scanned_devices', 'cluster_count')
+    
+    def has_add_permission(self, request):
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        return False
@@ -0,0 +1,62 @@
+from rest_framework import serializers, viewsets
+from rest_framework.decorators import action
+from rest_framework.pagination import CursorPagination
+from rest_framework.response import Response
+
+from .catalog import FACETS, facet_counts
+from .filters import filter_devices, scope_devices
+from .serializers import DeviceSerializer
+
+
+class DeviceCursorPagination(CursorPagination):
+    """(created_at, id) indeksi üzerinden cursor sayfalama; OFFSET/COUNT yok"""
+    ordering = ('-created_at', '-id')
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 500
+
+
+class DeviceViewSet(viewsets.ReadOnlyModelViewSet):
+    """Cihazlar için salt okunur API.
+
+    Liste ile aynı yetki kapsamı ve filtreler (device_type, status, group,
+    brand, model, start_date, end_date, search) kullanılır. `?fields=id,gsm_number` ile
+    yalnızca istenen alanlar döner ve sorgu `.only()` ile daraltılır.
+    """
+    serializer_class = DeviceSerializer
+    pagination_class = DeviceCursorPagination
+
+    def get_fields(self):
+        if not hasattr(self, '_fields'):
+            self._fields = DeviceSerializer.parse_fields(self.request.query_params.get('fields'))
+        return self._fields
+
+    def get_queryset(self):
+        devices = scope_devices(self.request.user)
+        if self.action == 'list':
+            devices, _ = filter_devices(devices, self.request.query_params)
+
+        fields = self.get_fields()
+        if fields:
+            # Cursor konumu için sıralama kolonları her zaman okunur
+            columns = DeviceSerializer.columns_for(fields) | {'id', 'created_at'}
+            devices = devices.only(*columns)
+        return devices
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['fields'] = self.get_fields()
+        return context
+
+    @action(detail=False)
+    def facets(self, request):
+        """Filtrelenmiş cihazların marka veya model dağılımı (`?facet=brand|model`).
+
+        Her kayıt için toplam ve aktif cihaz sayısı döner; ör.
+        `?facet=model&brand=3&status=active`.
+        """
+        facet = request.query_params.get('facet', 'brand')
+        if facet not in FACETS:
+            raise serializers.ValidationError({'facet': f'Geçerli değerler: {", ".join(FACETS)}'})
+        devices, _ = filter_devices(scope_devices(request.user), request.query_params)
+        return Response({'facet': facet, 'results': facet_counts(devices, facet)})
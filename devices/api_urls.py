@@ -0,0 +1,10 @@
+from rest_framework.routers import DefaultRouter
+
+from . import api
+
+app_name = 'devices_api'
+
+router = DefaultRouter()
+router.register('devices', api.DeviceViewSet, basename='device')
+
+urlpatterns = router.urls
@@ -0,0 +1,460 @@
+"""Cihaz listesi sayımları için süreç içi bitmap indeksi (opsiyonel).
+
+Her cihaz türü, durum, grup ve oluşturulma günü için cihaz id'lerinin
+bitmap'i tutulur (Python int'i; bit numarası = cihaz id'si). Filtre
+kombinasyonları bitwise AND, sayımlar popcount (int.bit_count) ile
+hesaplanır; SQL yalnızca görünen sayfayı okur.
+
+İndeks sinyallerle güncel tutulur: her commit değişikliklerini cache'te
+yeni bir nesil olarak yayınlar (nesil numarası + değişiklik listesi).
+Süreçler indekslerini eksik nesillerin değişikliklerini uygulayarak
+günceller; istek başına yalnızca nesil numarası okunur, SQL çalışmaz.
+Değişiklikler cache'ten düşmüşse veya toplu bir işlem tam yeniden
+oluşturma istediyse, önce diskteki anlık görüntü denenir; tabloyu yalnızca
+kilidi alan istek yeniden okur, diğerleri bu sırada SQL sayımına düşer.
+
+Sinyal göndermeyen (uygulama dışı) yazmalardan sonra rebuild_device_bitmaps
+komutu çalıştırılmalıdır. Süreçler arası senkronizasyon, dashboard
+anlık görüntülerinde olduğu gibi ortak bir cache gerektirir.
+
+settings.DEVICE_BITMAP_INDEX = True ile etkinleşir.
+"""
+import bisect
+import os
+import json
+import struct
+import tempfile
+import threading
+import zlib
+from collections import defaultdict
+from datetime import date
+from pathlib import Path
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+from .groups import subtree_ids
+from .models import Device
+from .stats import build_device_stats
+
+FACETS = ('device_type', 'is_active', 'group_id')
+
+SNAPSHOT_MAGIC = b'DBMP'
+SNAPSHOT_HEADER = '>BI'  # biçim, JSON başlık uzunluğu
+SNAPSHOT_FORMAT = 3
+
+GENERATION_KEY = 'devices:bitmaps:generation'
+
+# Yayınlanan değişikliklerin cache'te tutulduğu süre (sn)
+CHANGES_SECONDS = 3600
+
+# Tek seferde uygulanabilecek en fazla nesil; fazlası yeniden oluşturulur
+MAX_CATCH_UP = 1000
+
+# Toplu işlemlerde değişiklik olarak yayınlanacak en fazla cihaz
+DELTA_LIMIT = 5000
+
+REBUILD_LOCK_KEY = 'devices:bitmaps:rebuilding'
+REBUILD_LOCK_SECONDS = 300
+
+
+def is_enabled():
+    return getattr(settings, 'DEVICE_BITMAP_INDEX', False)
+
+
+def get_snapshot_path():
+    return Path(getattr(settings, 'DEVICE_BITMAP_SNAPSHOT', settings.BASE_DIR / 'data' / 'device_bitmaps.bin'))
+
+
+def _bits(ids):
+    """id'lerden bitmap (bayt dizisi üzerinden, id başına tek işlem)"""
+    ids = list(ids)
+    if not ids:
+        return 0
+    buffer = bytearray(max(ids) // 8 + 1)
+    for pk in ids:
+        buffer[pk >> 3] |= 1 << (pk & 7)
+    return int.from_bytes(buffer, 'little')
+
+
+def _day(created_at):
+    # created_at__date filtresi gibi yerel saat dilimindeki gün
+    return timezone.localdate(created_at)
+
+
+class BitmapIndex:
+    """Özellik değeri -> cihaz id bitmap'i.
+
+    Gün bitmap'leri (taban id, bitmap) olarak tutulur; bir güne ait id'ler
+    birbirine yakın olduğundan her gün yalnızca kendi aralığı kadar yer kaplar.
+    """
+
+    def __init__(self):
+        self.all = 0
+        self.facets = {field: {} for field in FACETS}
+        self.days = {}
+        self.day_keys = []
+        self.generation = 0
+
+    @classmethod
+    def build(cls):
+        """Device tablosunu tek geçişte okuyarak indeksi oluşturur"""
+        index = cls()
+        all_ids = []
+        members = {field: defaultdict(list) for field in FACETS}
+        days = defaultdict(list)
+        rows = Device.objects.order_by().values_list('id', *FACETS, 'created_at')
+        for pk, *values, created_at in rows.iterator(chunk_size=5000):
+            all_ids.append(pk)
+            for field, value in zip(FACETS, values):
+                members[field][value].append(pk)
+            days[_day(created_at)].append(pk)
+
+        index.all = _bits(all_ids)
+        for field in FACETS:
+            index.facets[field] = {value: _bits(ids) for value, ids in members[field].items()}
+        for day, ids in days.items():
+            base = min(ids)
+            index.days[day] = (base, _bits(pk - base for pk in ids))
+        index.day_keys = sorted(index.days)
+        return index
+
+    def add(self, pk, values, day):
+        bit = 1 << pk
+        self.all |= bit
+        for field in FACETS:
+            facet = self.facets[field]
+            facet[values[field]] = facet.get(values[field], 0) | bit
+        if day not in self.days:
+            self.days[day] = (pk, 0)
+            bisect.insort(self.day_keys, day)
+        base, bits = self.days[day]
+        if pk < base:
+            base, bits = pk, bits << (base - pk)
+        self.days[day] = (base, bits | 1 << (pk - base))
+
+    def discard(self, pk, values, day):
+        mask = ~(1 << pk)
+        self.all &= mask
+        for field in FACETS:
+            facet = self.facets[field]
+            remaining = facet.get(values[field], 0) & mask
+            if remaining:
+                facet[values[field]] = remaining
+            else:
+                facet.pop(values[field], None)
+        if day in self.days:
+            base, bits = self.days[day]
+            if pk >= base:
+                bits &= ~(1 << (pk - base))
+            if bits:
+                self.days[day] = (base, bits)
+            else:
+                del self.days[day]
+                self.day_keys.remove(day)
+
+    def match(self, device_type=None, is_active=None, group_ids=None, start_date=None, end_date=None):
+        """Filtrelere uyan cihazların bitmap'i"""
+        bits = self.all
+        if device_type:
+            bits &= self.facets['device_type'].get(device_type, 0)
+        if is_active is not None:
+            bits &= self.facets['is_active'].get(is_active, 0)
+        if group_ids is not None:
+            groups = 0
+            for group_id in group_ids:
+                groups |= self.facets['group_id'].get(group_id, 0)
+            bits &= groups
+        if start_date or end_date:
+            low = bisect.bisect_left(self.day_keys, start_date) if start_date else 0
+            high = bisect.bisect_right(self.day_keys, end_date) if end_date else len(self.day_keys)
+            days = 0
+            for day in self.day_keys[low:high]:
+                base, day_bits = self.days[day]
+                days |= day_bits << base
+            bits &= days
+        return bits
+
+    def type_counts(self, bits):
+        """Bitmap'teki cihazların {tür: {'count', 'active'}} dağılımı"""
+        active = bits & self.facets['is_active'].get(True, 0)
+        return {
+            device_type: {'count': (bits & type_bits).bit_count(), 'active': (active & type_bits).bit_count()}
+            for device_type, type_bits in self.facets['device_type'].items()
+            if bits & type_bits
+        }
+
+    def dumps(self):
+        """Anlık görüntü: imza + (biçim, başlık uzunluğu) + JSON başlık + zlib ile sıkıştırılmış bitmap baytları.
+
+        Başlık bitmap'lerin sırasını ve bayt uzunluklarını tutar; pickle
+        kullanılmaz, dosya yalnızca veri olarak okunur.
+        """
+        blobs = []
+
+        def blob(bits):
+            data = bits.to_bytes((bits.bit_length() + 7) // 8, 'little')
+            blobs.append(data)
+            return len(data)
+
+        header = {
+            'generation': self.generation,
+            'all': blob(self.all),
+            'facets': {
+                field: [[value, blob(bits)] for value, bits in self.facets[field].items()]
+                for field in FACETS
+            },
+            'days': [[day.isoformat(), base, blob(bits)] for day, (base, bits) in self.days.items()],
+        }
+        header = json.dumps(header, separators=(',', ':')).encode('utf-8')
+        prefix = SNAPSHOT_MAGIC + struct.pack(SNAPSHOT_HEADER, SNAPSHOT_FORMAT, len(header))
+        return prefix + header + zlib.compress(b''.join(blobs))
+
+    @classmethod
+    def loads(cls, data):
+        prefix = len(SNAPSHOT_MAGIC) + struct.calcsize(SNAPSHOT_HEADER)
+        if data[:len(SNAPSHOT_MAGIC)] != SNAPSHOT_MAGIC:
+            raise ValueError('Bitmap anlık görüntüsü değil')
+        version, header_size = struct.unpack(SNAPSHOT_HEADER, data[len(SNAPSHOT_MAGIC):prefix])
+        if version != SNAPSHOT_FORMAT:
+            raise ValueError('Bilinmeyen bitmap anlık görüntü biçimi')
+        header = json.loads(data[prefix:prefix + header_size])
+        payload = memoryview(zlib.decompress(data[prefix + header_size:]))
+        offset = 0
+
+        def bits(size):
+            nonlocal offset
+            if size < 0 or offset + size > len(payload):
+                raise ValueError('Bitmap anlık görüntüsü eksik')
+            value = int.from_bytes(payload[offset:offset + size], 'little')
+            offset += size
+            return value
+
+        index = cls()
+        index.generation = int(header['generation'])
+        index.all = bits(header['all'])
+        for field in FACETS:
+            index.facets[field] = {value: bits(size) for value, size in header['facets'][field]}
+        index.days = {date.fromisoformat(day): (int(base), bits(size)) for day, base, size in header['days']}
+        index.day_keys = sorted(index.days)
+        return index
+
+
+def load_snapshot(path=None):
+    """Diskteki anlık görüntü; yoksa veya okunamıyorsa None"""
+    try:
+        return BitmapIndex.loads(Path(path or get_snapshot_path()).read_bytes())
+    except (OSError, ValueError, KeyError, TypeError, struct.error, zlib.error):
+        return None
+
+
+def save_snapshot(index, path=None):
+    """Anlık görüntüyü geçici dosyaya yazıp yerine taşır"""
+    path = Path(path or get_snapshot_path())
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=path.parent, prefix='.bitmaps-', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as handle:
+            handle.write(index.dumps())
+        os.replace(temp_path, path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+
+
+_index = None
+_lock = threading.Lock()
+
+
+def _current_generation():
+    return cache.get(GENERATION_KEY, 0)
+
+
+def _next_generation():
+    try:
+        return cache.incr(GENERATION_KEY)
+    except ValueError:
+        # Anahtar yok (ilk yazma veya cache temizlendi)
+        cache.add(GENERATION_KEY, 0, None)
+        return cache.incr(GENERATION_KEY)
+
+
+def _changes_key(generation):
+    return f'devices:bitmaps:changes:{generation}'
+
+
+def _apply(index, changes):
+    for add, pk, values, day in changes:
+        if add:
+            index.add(pk, values, day)
+        else:
+            index.discard(pk, values, day)
+
+
+def _catch_up(index, generation):
+    """İndeksi yayınlanmış değişikliklerle verilen nesle getirir (yerinde).
+
+    Değişikliklerden biri eksikse veya tam yeniden oluşturma istiyorsa
+    indekse dokunmadan False döner. Zaten uygulanmış bir değişikliğin
+    tekrar uygulanması sonucu değiştirmez.
+    """
+    if index.generation == generation:
+        return True
+    if index.generation > generation or generation - index.generation > MAX_CATCH_UP:
+        return False
+    keys = [_changes_key(number) for number in range(index.generation + 1, generation + 1)]
+    published = cache.get_many(keys)
+    if len(published) != len(keys) or any(published[key] is None for key in keys):
+        return False
+    for key in keys:
+        _apply(index, published[key])
+    index.generation = generation
+    return True
+
+
+def rebuild():
+    """İndeksi veritabanından yeniden oluşturur ve anlık görüntüyü yazar"""
+    global _index
+    # Okuma sırasında commit edilen değişiklikler sonraki nesillerden tekrar uygulanır
+    generation = _current_generation()
+    index = BitmapIndex.build()
+    index.generation = generation
+    save_snapshot(index)
+    with _lock:
+        _index = index
+    return index
+
+
+def get_index():
+    """Güncel nesildeki indeks; devre dışıysa veya başka bir istek yeniden oluşturuyorsa None"""
+    global _index
+    if not is_enabled():
+        return None
+    generation = _current_generation()
+    with _lock:
+        if _index is not None and _catch_up(_index, generation):
+            return _index
+        index = load_snapshot()
+        if index is not None and _catch_up(index, generation):
+            _index = index
+            return index
+    # Tabloyu tek bir istek okur; diğerleri bu sırada SQL sayımına düşer
+    if not cache.add(REBUILD_LOCK_KEY, 1, REBUILD_LOCK_SECONDS):
+        return None
+    try:
+        return rebuild()
+    finally:
+        cache.delete(REBUILD_LOCK_KEY)
+
+
+def _publish(changes):
+    """Değişiklikleri commit sonrası yeni bir nesil olarak yayınlar (None: tam yeniden oluşturma).
+
+    Transaction geri alınırsa hiçbir şey yayınlanmaz.
+    """
+    if not is_enabled():
+        return
+
+    def publish():
+        cache.set(_changes_key(_next_generation()), changes, CHANGES_SECONDS)
+
+    transaction.on_commit(publish)
+
+
+def invalidate():
+    """Tüm süreçlerin indeksini geçersiz sayar (uygulama dışı yazmalardan sonra)"""
+    _publish(None)
+
+
+def _values(device):
+    return {field: getattr(device, field) for field in FACETS}
+
+
+def device_saved(device, created):
+    day = _day(device.created_at)
+    changes = []
+    if not created:
+        previous = device.loaded_values
+        if all(field in previous for field in FACETS):
+            changes.append((False, device.pk, {field: previous[field] for field in FACETS}, day))
+    changes.append((True, device.pk, _values(device), day))
+    _publish(changes)
+
+
+def device_deleted(device):
+    _publish([(False, device.pk, _values(device), _day(device.created_at))])
+
+
+def device_toggled(device):
+    """Tek cihazın durumu çevrildi (device.is_active yeni durum)"""
+    after, day = _values(device), _day(device.created_at)
+    _publish([(False, device.pk, dict(after, is_active=not device.is_active), day), (True, device.pk, after, day)])
+
+
+def devices_added(devices):
+    _publish([(True, device.pk, _values(device), _day(device.created_at)) for device in devices])
+
+
+def _rows(queryset):
+    """(id, özellikler..., created_at) satırları; DELTA_LIMIT aşılırsa None"""
+    rows = list(queryset.order_by().values_list('pk', *FACETS, 'created_at')[:DELTA_LIMIT + 1])
+    return rows if len(rows) <= DELTA_LIMIT else None
+
+
+def devices_updating(queryset, status):
+    """Toplu durum değişikliği (UPDATE öncesi); başka alan değişiyorsa tam yeniden oluşturma"""
+    if not is_enabled():
+        return
+    rows = _rows(queryset) if status is not None else None
+    if rows is None:
+        _publish(None)
+        return
+    changes = []
+    for pk, *values, created_at in rows:
+        before, day = dict(zip(FACETS, values)), _day(created_at)
+        after = dict(before, is_active=not before['is_active'] if status == 'toggle' else status)
+        changes += [(False, pk, before, day), (True, pk, after, day)]
+    _publish(changes)
+
+
+def devices_deleting(queryset):
+    if not is_enabled():
+        return
+    rows = _rows(queryset)
+    if rows is None:
+        _publish(None)
+        return
+    _publish([(False, pk, dict(zip(FACETS, values)), _day(created_at)) for pk, *values, created_at in rows])
+
+
+def device_stats(user, filters):
+    """Liste istatistikleri (get_device_stats biçiminde) indeksten; yanıtlanamıyorsa None.
+
+    İndeks yetki kapsamı, arama ve marka/model filtrelerini içermez; bu
+    durumlarda SQL sayımı kullanılır.
+    """
+    # scope_devices ile aynı kapsam: yalnızca tüm cihazları gören kullanıcılar
+    if user.is_authenticated and not user.can_view_all_devices:
+        return None
+    if filters.get('search') or filters.get('brand') or filters.get('model'):
+        return None
+    index = get_index()
+    if index is None:
+        return None
+
+    status = filters.get('status')
+    start_date, end_date = filters.get('start_date'), filters.get('end_date')
+    group_ids = None
+    if filters.get('group'):
+        group_ids = list(subtree_ids(int(filters['group'])).values_list('descendant_id', flat=True))
+    bits = index.match(
+        device_type=filters.get('device_type') or None,
+        is_active={'active': True, 'inactive': False}.get(status),
+        group_ids=group_ids,
+        # Geçersiz tarih metinleri filter_devices'ta da yok sayılır
+        start_date=start_date if hasattr(start_date, 'year') else None,
+        end_date=end_date if hasattr(end_date, 'year') else None,
+    )
+    return build_device_stats(index.type_counts(bits))
@@ -0,0 +1,139 @@
+from django.db import connection, transaction
+from django.db.models import Count, Max, Q
+from django.utils import timezone
+
+from . import counters, groups, search
+from .models import Device
+from .signals import device_toggled, devices_bulk_deleting, devices_bulk_updating
+
+BULK_ACTION_CHOICES = [
+    ('activate', 'Aktif Yap'),
+    ('deactivate', 'Pasif Yap'),
+    ('regroup', 'Birliğini Değiştir'),
+    ('delete', 'Sil'),
+]
+
+# Tek toggle isteğinde kabul edilen en fazla cihaz sayısı
+TOGGLE_BATCH_LIMIT = 500
+
+# Toplu silmede tek delete() çağrısının işlediği cihaz sayısı
+DELETE_BATCH_SIZE = 500
+
+
+def _targets(queryset):
+    """Filtre/annotation içeren queryset'i sade bir id alt sorgusuna indirger"""
+    return Device.objects.filter(pk__in=queryset.order_by().values('pk'))
+
+
+def apply_bulk_action(queryset, action, group=None):
+    """İşlemi queryset'in tamamına tek bir UPDATE ile ya da batch'ler halinde siler.
+
+    Etkilenen cihaz sayısını döndürür. Satır başına save() çağrılmaz; arama
+    indeksi, grup ve kullanıcı sayaçları aynı transaction'da, etkilenen
+    grup/kullanıcı başına bir sorgu ile güncellenir. Hedef satırlar
+    dağılımlar okunmadan kilitlenir; eşzamanlı bir değişiklik sayaçları kaydıramaz.
+    """
+    if action not in dict(BULK_ACTION_CHOICES):
+        raise ValueError(f'Bilinmeyen toplu işlem: {action}')
+
+    targets = _targets(queryset)
+    now = timezone.now()
+
+    with transaction.atomic():
+        # Kilitler pk sırasıyla alınır; eşzamanlı toplu işlemler birbirini kilitlemez
+        ids = list(targets.select_for_update().order_by('pk').values_list('pk', flat=True))
+        totals = list(groups.group_totals(targets))
+        if action != 'delete':
+            status = {'activate': True, 'deactivate': False}.get(action)
+            devices_bulk_updating.send(sender=Device, queryset=targets, status=status)
+
+        if action in ('activate', 'deactivate'):
+            # (sayaç fonksiyonu, dağılım) çiftleri; aktif sayısı farkı uygulanır
+            for adjust, rows in ((groups.adjust_counters, totals),
+                                 (counters.adjust_user_counters, counters.user_totals(targets))):
+                for owner_id, total, active in rows:
+                    adjust(owner_id, active=total - active if action == 'activate' else -active)
+            # update() auto_now alanlarını doldurmaz; export önbelleği updated_at'e bakar
+            return targets.update(is_active=action == 'activate', updated_at=now)
+
+        for group_id, total, active in totals:
+            groups.adjust_counters(group_id, devices=-total, active=-active)
+
+        if action == 'regroup':
+            # Filtre gruba bağlı olabilir; sayımlar UPDATE'ten önce alınır
+            moved = targets.aggregate(active=Count('id', filter=Q(is_active=True)))
+            affected = targets.update(
+                group=group, device_group=group.name if group else None, updated_at=now
+            )
+            if group is not None:
+                groups.adjust_counters(group.pk, devices=affected, active=moved['active'])
+            return affected
+
+        # Son ekleme zamanı kalan cihazlardan hesaplanacağından sayaçlar silme sonrası uygulanır
+        user_totals = list(counters.user_totals(targets).annotate(last_added=Max('created_at')))
+        search.remove_devices(targets)
+        devices_bulk_deleting.send(sender=Device, queryset=targets)
+        # Bağlı satırları collector temizler; Device post_delete alıcıları
+        # queryset silmelerinde özetlere dokunmaz (yukarıda toplu düşüldü)
+        deleted = 0
+        for start in range(0, len(ids), DELETE_BATCH_SIZE):
+            batch = Device.objects.filter(pk__in=ids[start:start + DELETE_BATCH_SIZE])
+            deleted += batch.delete()[1].get(Device._meta.label, 0)
+        for user_id, total, active, last_added in user_totals:
+            counters.adjust_user_counters(user_id, devices=-total, active=-active, removed_at=last_added)
+        return deleted
+
+
+# Tek cihaz toggle'ında UPDATE ... RETURNING ile geri okunan kolonlar
+TOGGLE_RETURNING = ('id', 'user_id', 'group_id', 'device_type', 'device_name', 'is_active', 'created_at')
+
+
+def toggle_device(device_id, owner_id=None):
+    """Tek cihazın durumunu tek `UPDATE ... RETURNING` ile çevirir.
+
+    owner_id verilirse yalnızca o kullanıcının cihazı değişir. Güncellenen
+    cihazı (TOGGLE_RETURNING alanlarıyla) döndürür; satır yoksa None.
+    Grup ve kullanıcı sayaçları dönen satırdan F() ile düzeltilir; ek
+    okuma yapılmaz.
+    """
+    table = connection.ops.quote_name(Device._meta.db_table)
+    sql = f'UPDATE {table} SET is_active = NOT is_active, updated_at = %s WHERE id = %s'
+    params = [connection.ops.adapt_datetimefield_value(timezone.now()), device_id]
+    if owner_id is not None:
+        sql += ' AND user_id = %s'
+        params.append(owner_id)
+    sql += f' RETURNING {", ".join(TOGGLE_RETURNING)}'
+
+    with transaction.atomic():
+        device = next(iter(Device.objects.raw(sql, params)), None)
+        if device is None:
+            return None
+        delta = 1 if device.is_active else -1
+        groups.adjust_counters(device.group_id, active=delta)
+        counters.adjust_user_counters(device.user_id, active=delta)
+        device_toggled.send(sender=Device, device=device)
+    return device
+
+
+def toggle_status(queryset):
+    """Cihazların durumunu tek `SET is_active = NOT is_active` UPDATE'i ile çevirir.
+
+    {id: yeni durum} döndürür. UPDATE satırları transaction sonuna kadar
+    kilitlediğinden geri okunan durumlar ve sayaç farkları eşzamanlı
+    tıklamalarla çakışmaz; yalnızca is_active ve updated_at yazılır.
+    """
+    # Filtre is_active'e bağlı olabilir; hedefler UPDATE'ten önce sabitlenir
+    ids = list(queryset.order_by().values_list('pk', flat=True))
+    if not ids:
+        return {}
+    targets = Device.objects.filter(pk__in=ids)
+
+    with transaction.atomic():
+        devices_bulk_updating.send(sender=Device, queryset=targets, status='toggle')
+        targets.update(is_active=Q(is_active=False), updated_at=timezone.now())
+        # Şimdi aktif olanlar +1, pasif olanlar -1: fark = 2 * aktif - toplam
+        for adjust, rows in ((groups.adjust_counters, groups.group_totals(targets)),
+                             (counters.adjust_user_counters, counters.user_totals(targets))):
+            for owner_id, total, active in rows:
+                adjust(owner_id, active=2 * active - total)
+        return dict(targets.values_list('pk', 'is_active'))
@@ -0,0 +1,151 @@
+from collections import Counter, defaultdict
+
+from django.db.models import Count, Q
+
+from .models import Device, DeviceBrand, DeviceModel
+
+FACETS = ('brand', 'model')
+
+
+def normalize_catalog_name(name):
+    """Baştaki/sondaki ve tekrarlanan boşlukları temizler"""
+    return ' '.join((name or '').split())
+
+
+def catalog_key(name):
+    """Aynı marka/modelin farklı yazımlarını (boşluk, büyük/küçük harf) birleştiren anahtar"""
+    return normalize_catalog_name(name).casefold()
+
+
+def _get_brand(name):
+    brand, _ = DeviceBrand.objects.get_or_create(
+        key=catalog_key(name), defaults={'name': normalize_catalog_name(name)}
+    )
+    return brand
+
+
+def _get_model(brand, name):
+    model, _ = DeviceModel.objects.get_or_create(
+        brand=brand, key=catalog_key(name), defaults={'name': normalize_catalog_name(name)}
+    )
+    return model
+
+
+def assign_catalog(device):
+    """Cihazın marka/model metnini katalog kayıtlarına bağlar (olmayanları oluşturur).
+
+    Metinler katalogdaki yazımla değiştirilir. Markasız model katalogda
+    tutulmaz; yalnızca metin olarak kalır.
+    """
+    if not normalize_catalog_name(device.brand):
+        device.catalog_brand = device.catalog_model = None
+        return
+    brand = _get_brand(device.brand)
+    device.catalog_brand, device.brand = brand, brand.name
+    if normalize_catalog_name(device.model):
+        model = _get_model(brand, device.model)
+        device.catalog_model, device.model = model, model.name
+    else:
+        device.catalog_model = None
+
+
+def _catalog_outdated(device):
+    """Marka/model metni değişti mi veya katalog kaydı eksik mi?"""
+    loaded = device.loaded_values
+    if (device.brand, device.model) != (loaded.get('brand'), loaded.get('model')):
+        return True
+    return bool(device.brand and not device.catalog_brand_id) or bool(device.model and not device.catalog_model_id)
+
+
+def clean_catalog(device, cleaned_data):
+    """Form clean() adımı: normalize edilmiş marka/model metnini katalog kayıtlarına bağlar.
+
+    Katalog yazımı cleaned_data'ya geri yazılır. Metin değişmediyse ve
+    kayıtlar atanmışsa sorgu yapılmaz.
+    """
+    device.brand, device.model = cleaned_data.get('brand'), cleaned_data.get('model')
+    if _catalog_outdated(device):
+        assign_catalog(device)
+    cleaned_data['brand'], cleaned_data['model'] = device.brand, device.model
+
+
+def assign_catalogs(devices):
+    """Toplu eklenecek cihazlar için assign_catalog; sorgular batch başına yapılır"""
+    brand_names = {catalog_key(device.brand): device.brand for device in devices if normalize_catalog_name(device.brand)}
+    brands = {brand.key: brand for brand in DeviceBrand.objects.filter(key__in=brand_names)}
+    for key, name in brand_names.items():
+        if key not in brands:
+            brands[key] = _get_brand(name)
+
+    model_names = {
+        (brands[catalog_key(device.brand)].pk, catalog_key(device.model)): device.model
+        for device in devices
+        if normalize_catalog_name(device.brand) and normalize_catalog_name(device.model)
+    }
+    models = {
+        (model.brand_id, model.key): model
+        for model in DeviceModel.objects.filter(
+            brand_id__in={brand_id for brand_id, _ in model_names},
+            key__in={key for _, key in model_names},
+        )
+    }
+    brands_by_id = {brand.pk: brand for brand in brands.values()}
+    for (brand_id, key), name in model_names.items():
+        if (brand_id, key) not in models:
+            models[brand_id, key] = _get_model(brands_by_id[brand_id], name)
+
+    for device in devices:
+        if not normalize_catalog_name(device.brand):
+            device.catalog_brand = device.catalog_model = None
+            continue
+        brand = brands[catalog_key(device.brand)]
+        device.catalog_brand, device.brand = brand, brand.name
+        model = models.get((brand.pk, catalog_key(device.model)))
+        device.catalog_model = model
+        if model is not None:
+            device.model = model.name
+
+
+def facet_counts(queryset, facet):
+    """Queryset'in marka veya model dağılımı: [{id, name, count, active}].
+
+    Sayım (katalog, is_active) indeksi üzerinden GROUP BY ile yapılır;
+    adlar küçük katalog tablosundan ayrıca okunur.
+    """
+    field = f'catalog_{facet}_id'
+    rows = list(
+        queryset.order_by().exclude(**{field: None})
+        .values_list(field)
+        .annotate(total=Count('id'), active=Count('id', filter=Q(is_active=True)))
+    )
+    catalog = DeviceBrand if facet == 'brand' else DeviceModel
+    entries = catalog.objects.in_bulk([row[0] for row in rows])
+    results = []
+    for catalog_id, total, active in rows:
+        entry = entries[catalog_id]
+        result = {'id': catalog_id, 'name': entry.name, 'count': total, 'active': active}
+        if facet == 'model':
+            result['brand'] = entry.brand_id
+        results.append(result)
+    return sorted(results, key=lambda result: (-result['count'], result['name']))
+
+
+def merge_spellings(pairs):
+    """(marka, model, adet) satırlarından katalog yazımlarını seçer.
+
+    Aynı anahtara düşen yazımlardan en sık kullanılanı katalog adı olur.
+    {marka anahtarı: ad}, {(marka anahtarı, model anahtarı): ad} döndürür.
+    """
+    brand_spellings = defaultdict(Counter)
+    model_spellings = defaultdict(Counter)
+    for brand, model, count in pairs:
+        if not normalize_catalog_name(brand):
+            continue
+        brand_key = catalog_key(brand)
+        brand_spellings[brand_key][normalize_catalog_name(brand)] += count
+        if normalize_catalog_name(model):
+            model_spellings[brand_key, catalog_key(model)][normalize_catalog_name(model)] += count
+    return (
+        {key: spellings.most_common(1)[0][0] for key, spellings in brand_spellings.items()},
+        {key: spellings.most_common(1)[0][0] for key, spellings in model_spellings.items()},
+    )
@@ -0,0 +1,99 @@
+import hashlib
+import json
+import time
+
+from django.contrib.messages import get_messages
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Max
+from django.utils import timezone
+from django.views.decorators.http import condition
+
+
+# Sayfalarda gösterilen ilişkili kayıtların (grup, kullanıcı, katalog adları)
+# sürümü; bu tablolardaki her değişiklikte artırılır (devices/signals.py)
+RELATED_VERSION_KEY = 'devices:conditional:related_version'
+
+
+def _seed_related_version():
+    """Anahtar yoksa (ilk kullanım veya cache temizlendi) zaman tabanlı başlangıç değeri.
+
+    Sayaç sıfırdan başlasaydı temizlikten önceki bir sürüm tekrar üretilip
+    diskteki eski export dosyalarıyla eşleşebilirdi.
+    """
+    cache.add(RELATED_VERSION_KEY, time.time_ns() // 1000, None)
+
+
+def related_version():
+    version = cache.get(RELATED_VERSION_KEY)
+    if version is None:
+        _seed_related_version()
+        version = cache.get(RELATED_VERSION_KEY, 0)
+    return version
+
+
+def bump_related_version():
+    """İlişkili kayıt değişti; commit sonrası tüm doğrulayıcıları geçersiz kılar"""
+    def bump():
+        try:
+            cache.incr(RELATED_VERSION_KEY)
+        except ValueError:
+            _seed_related_version()
+            cache.incr(RELATED_VERSION_KEY)
+
+    transaction.on_commit(bump)
+
+
+def latest_update(queryset):
+    """(en son updated_at, satır sayısı) — updated_at indeksi ile tek sorgu"""
+    result = queryset.order_by().aggregate(last_update=Max('updated_at'), row_count=Count('id'))
+    return result['last_update'], result['row_count']
+
+
+def _etag(request, name, get_queryset, args, kwargs):
+    """View için ETag hesaplar; istek başına bir kez"""
+    if hasattr(request, '_device_etag'):
+        return request._device_etag
+
+    etag = None
+    queryset = get_queryset(request, *args, **kwargs)
+    # Bekleyen flash mesajı varsa sayfa her zaman yeniden üretilir
+    if queryset is not None and not len(get_messages(request)):
+        last_update, row_count = latest_update(queryset)
+        if row_count:
+            payload = json.dumps([
+                name,
+                request.user.pk,
+                sorted((key, sorted(values)) for key, values in request.GET.lists()),
+                kwargs,
+                # Sayfadaki formların CSRF token'ı girişte oturum anahtarıyla birlikte yenilenir
+                request.session.session_key,
+                related_version(),
+                # Format/sıkıştırma seçimi başlıklara bağlı olabilir (NDJSON, gzip)
+                request.headers.get('Accept', ''),
+                request.headers.get('Accept-Encoding', ''),
+                last_update.isoformat(),
+                row_count,
+                # Son 30 gün gibi tarihe bağlı içerik gün değişince yenilenir
+                timezone.localdate().isoformat(),
+            ], sort_keys=True)
+            etag = hashlib.sha256(payload.encode('utf-8')).hexdigest()[:32]
+
+    request._device_etag = etag
+    return etag
+
+
+def device_condition(name, get_queryset):
+    """Cihaz verisine bağlı sayfalar için koşullu GET (ETag).
+
+    get_queryset(request, *args, **kwargs) sayfanın gösterdiği, yetki
+    kapsamına göre daraltılmış cihazları döndürür (None: doğrulama yok).
+    Veri değişmediyse view çalışmadan 304 döner. ETag cihazların yanında
+    oturumu/CSRF token'ını ve ilişkili kayıtların (grup, kullanıcı, katalog)
+    sürümünü de kapsar. Last-Modified gönderilmez: MAX(updated_at) silmeleri
+    ve gün değişimini yansıtmaz, bunları yalnızca ETag (satır sayısı, tarih) yakalar.
+    """
+    def etag_func(request, *args, **kwargs):
+        return _etag(request, name, get_queryset, args, kwargs)
+
+    return condition(etag_func=etag_func)
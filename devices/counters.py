@@ -0,0 +1,74 @@
+from collections import Counter
+
+from django.contrib.auth import get_user_model
+from django.db.models import Case, Count, F, Max, OuterRef, Q, Subquery, When
+
+from .models import Device
+
+
+def adjust_user_counters(user_id, devices=0, active=0, added_at=None, removed_at=None):
+    """Kullanıcının cihaz sayaçlarını tek UPDATE ile değiştirir.
+
+    removed_at silinen cihazların en yeni created_at'idir (silme sonrası
+    çağrılır): son ekleme zamanı bu cihazlardan geliyorsa kalan cihazlardan
+    aynı UPDATE içinde yeniden hesaplanır.
+    """
+    if not user_id or not (devices or active or added_at or removed_at):
+        return
+    changes = {
+        'device_count': F('device_count') + devices,
+        'active_device_count': F('active_device_count') + active,
+    }
+    if added_at is not None:
+        changes['last_device_added_at'] = added_at
+    elif removed_at is not None:
+        latest = Device.objects.filter(user_id=OuterRef('pk')).order_by('-created_at').values('created_at')[:1]
+        changes['last_device_added_at'] = Case(
+            When(last_device_added_at__lte=removed_at, then=Subquery(latest)),
+            default=F('last_device_added_at'),
+        )
+    get_user_model().objects.filter(pk=user_id).update(**changes)
+
+
+def user_totals(queryset):
+    """Queryset'teki cihazların kullanıcıya göre (user_id, toplam, aktif) dağılımı"""
+    return (
+        queryset.order_by()
+        .values_list('user_id')
+        .annotate(total=Count('id'), active=Count('id', filter=Q(is_active=True)))
+    )
+
+
+def count_new_devices(devices):
+    """Toplu eklenen (sinyal göndermeyen) cihazları sahiplerinin sayaçlarına ekler"""
+    totals = Counter()
+    actives = Counter()
+    added = {}
+    for device in devices:
+        totals[device.user_id] += 1
+        actives[device.user_id] += int(device.is_active)
+        added[device.user_id] = max(added.get(device.user_id, device.created_at), device.created_at)
+    for user_id, total in totals.items():
+        adjust_user_counters(user_id, devices=total, active=actives[user_id], added_at=added[user_id])
+
+
+def rebuild_user_counters():
+    """Sayaçları cihaz tablosundan yeniden hesaplar; düzeltilen kullanıcı sayısını döndürür"""
+    actual = {
+        user_id: (total, active, last_added)
+        for user_id, total, active, last_added in user_totals(Device.objects.all()).annotate(
+            last_added=Max('created_at')
+        )
+    }
+
+    changed = []
+    users = get_user_model().objects.only('id', 'device_count', 'active_device_count', 'last_device_added_at')
+    for user in users.iterator(chunk_size=2000):
+        values = actual.get(user.pk, (0, 0, None))
+        if (user.device_count, user.active_device_count, user.last_device_added_at) != values:
+            user.device_count, user.active_device_count, user.last_device_added_at = values
+            changed.append(user)
+    get_user_model().objects.bulk_update(
+        changed, ['device_count', 'active_device_count', 'last_device_added_at'], batch_size=1000
+    )
+    return len(changed)
@@ -0,0 +1,217 @@
+"""Mükerrer cihaz tespiti.
+
+Cihazlar ikili karşılaştırma yerine engelleme anahtarlarına göre gruplanır:
+her anahtar türü için veritabanı, anahtarı birden fazla cihazda geçen
+değerleri GROUP BY ... HAVING ile bulur ve üyeler anahtar sırasıyla tek
+geçişte okunur. Böylece maliyet satır sayısıyla (sıralama) orantılı kalır.
+"""
+from collections import defaultdict
+from itertools import groupby
+
+from django.db import transaction
+from django.db.models import Count, F, Q, Value
+from django.db.models.functions import Concat, Lower, Substr
+from django.utils import timezone
+
+from .models import Device, DuplicateCluster, DuplicateScan
+
+KEY_TYPES = ('imei', 'gsm', 'name')
+
+# Ad anahtarında kullanılan cihaz adı öneki uzunluğu
+NAME_PREFIX_LENGTH = 12
+
+# Anahtar türlerinin aynı cihaz olma ihtimaline katkısı
+KEY_WEIGHTS = {
+    'imei': 0.6,
+    'gsm': 0.5,
+    'name': 0.25,
+}
+
+# Tüm üyeler aynı kullanıcıya aitse skor bu oranla düşürülür
+SINGLE_USER_FACTOR = 0.8
+
+# Tek seferde kaydedilen küme sayısı
+CLUSTER_BATCH_SIZE = 1000
+
+
+def key_expressions():
+    """Anahtar türü -> cihaz satırından anahtarı üreten ifade"""
+    return {
+        'imei': F('imei_normalized'),
+        'gsm': F('gsm_normalized'),
+        'name': Lower(Concat(
+            'brand', Value('|'), 'model', Value('|'), Substr('device_name', 1, NAME_PREFIX_LENGTH)
+        )),
+    }
+
+
+def _keyed(queryset, key_type):
+    """Anahtarı boş olmayan cihazlar, `dup_key` annotation'ı ile"""
+    if key_type == 'name':
+        queryset = queryset.exclude(
+            Q(brand=None) | Q(brand='') | Q(model=None) | Q(model='') | Q(device_name=None) | Q(device_name='')
+        )
+    return queryset.annotate(dup_key=key_expressions()[key_type]).exclude(dup_key=None).exclude(dup_key='')
+
+
+def _duplicate_keys(key_type, keys=None):
+    """Birden fazla cihazda geçen anahtarlar (alt sorgu)"""
+    rows = _keyed(Device.objects.all(), key_type)
+    if keys is not None:
+        rows = rows.filter(dup_key__in=keys)
+    return rows.order_by().values('dup_key').annotate(n=Count('id')).filter(n__gt=1).values('dup_key')
+
+
+def score_cluster(members):
+    """Küme skorunu üyelerin anahtarlarından hesaplar (0-1).
+
+    Kümede tekrar eden her anahtar türü bağımsız bir kanıt sayılır:
+    skor = 1 - Π(1 - ağırlık).
+    """
+    score = 1.0
+    for key_type in KEY_TYPES:
+        values = [member[key_type] for member in members if member[key_type]]
+        if len(values) != len(set(values)):
+            score *= 1 - KEY_WEIGHTS[key_type]
+    score = 1 - score
+    if len({member['user_id'] for member in members}) == 1:
+        score *= SINGLE_USER_FACTOR
+    return round(score, 3)
+
+
+def _member_clusters(key_type, keys):
+    """Anahtar sırasıyla okunan üyelerden (anahtar, üyeler) kümeleri üretir"""
+    expressions = key_expressions()
+    rows = (
+        _keyed(Device.objects.all(), key_type)
+        .filter(dup_key__in=keys)
+        .annotate(**{f'{other}_key': expressions[other] for other in KEY_TYPES})
+        .order_by('dup_key', 'id')
+        .values_list('dup_key', 'id', 'user_id', *(f'{other}_key' for other in KEY_TYPES))
+    )
+    for key, group in groupby(rows.iterator(chunk_size=5000), key=lambda row: row[0]):
+        yield key, [
+            {'id': row[1], 'user_id': row[2], **dict(zip(KEY_TYPES, row[3:]))}
+            for row in group
+        ]
+
+
+def _save_clusters(key_type, clusters):
+    """Küme batch'ini kaydeder; kaydedilen küme id'lerini döndürür"""
+    Membership = DuplicateCluster.devices.through
+    existing = {
+        cluster.key: cluster
+        for cluster in DuplicateCluster.objects.filter(key_type=key_type, key__in=[key for key, _ in clusters])
+    }
+    current_members = defaultdict(set)
+    for cluster_id, device_id in Membership.objects.filter(
+        duplicatecluster_id__in=[cluster.pk for cluster in existing.values()]
+    ).values_list('duplicatecluster_id', 'device_id'):
+        current_members[cluster_id].add(device_id)
+
+    now = timezone.now()
+    new_clusters, changed, memberships = [], [], {}
+    for key, members in clusters:
+        device_ids = {member['id'] for member in members}
+        values = {
+            'device_count': len(device_ids),
+            'user_count': len({member['user_id'] for member in members}),
+            'score': score_cluster(members),
+        }
+        cluster = existing.get(key)
+        if cluster is None:
+            cluster = DuplicateCluster(key_type=key_type, key=key, **values)
+            new_clusters.append(cluster)
+            memberships[key] = device_ids
+            continue
+        members_changed = current_members[cluster.pk] != device_ids
+        if members_changed:
+            values['is_dismissed'] = False
+            memberships[key] = device_ids
+        if members_changed or any(getattr(cluster, field) != value for field, value in values.items()):
+            for field, value in values.items():
+                setattr(cluster, field, value)
+            cluster.updated_at = now
+            changed.append(cluster)
+
+    with transaction.atomic():
+        DuplicateCluster.objects.bulk_create(new_clusters)
+        DuplicateCluster.objects.bulk_update(
+            changed, ['device_count', 'user_count', 'score', 'is_dismissed', 'updated_at']
+        )
+        saved = {cluster.key: cluster.pk for cluster in [*existing.values(), *new_clusters]}
+        Membership.objects.filter(duplicatecluster_id__in=[saved[key] for key in memberships]).delete()
+        Membership.objects.bulk_create([
+            Membership(duplicatecluster_id=saved[key], device_id=device_id)
+            for key, device_ids in memberships.items()
+            for device_id in device_ids
+        ], batch_size=5000)
+    return list(saved.values())
+
+
+def _scan_key_type(key_type, keys=None):
+    """Anahtar türü için kümeleri bulup kaydeder; bulunan küme id'lerini döndürür"""
+    found = []
+    batch = []
+    for cluster in _member_clusters(key_type, _duplicate_keys(key_type, keys)):
+        batch.append(cluster)
+        if len(batch) >= CLUSTER_BATCH_SIZE:
+            found.extend(_save_clusters(key_type, batch))
+            batch = []
+    if batch:
+        found.extend(_save_clusters(key_type, batch))
+    return found
+
+
+def _delete_missing(clusters, found):
+    """Bu taramada bulunmayan kümeleri batch'ler halinde siler"""
+    found = set(found)
+    stale = [pk for pk in clusters.values_list('pk', flat=True).iterator() if pk not in found]
+    for start in range(0, len(stale), CLUSTER_BATCH_SIZE):
+        DuplicateCluster.objects.filter(pk__in=stale[start:start + CLUSTER_BATCH_SIZE]).delete()
+
+
+def _changed_keys(key_type, changed_devices):
+    """Değişen cihazların şimdiki anahtarları ve üyesi oldukları kümelerin anahtarları"""
+    keys = set(
+        _keyed(changed_devices, key_type).order_by().values_list('dup_key', flat=True).distinct()
+    )
+    keys.update(
+        DuplicateCluster.objects.filter(key_type=key_type, devices__in=changed_devices)
+        .values_list('key', flat=True)
+    )
+    return keys
+
+
+def find_duplicates(incremental=False):
+    """Mükerrer cihaz kümelerini günceller ve tarama kaydını döndürür.
+
+    Artımlı taramada yalnızca son taramanın başlangıcından beri değişen
+    (updated_at) cihazların anahtarları yeniden değerlendirilir. Önceki
+    tarama yoksa tam tarama yapılır.
+    """
+    last_scan = DuplicateScan.objects.exclude(finished_at=None).first() if incremental else None
+    scan = DuplicateScan.objects.create(started_at=timezone.now(), incremental=last_scan is not None)
+
+    if last_scan is None:
+        scan.scanned_devices = Device.objects.count()
+        for key_type in KEY_TYPES:
+            found = _scan_key_type(key_type)
+            _delete_missing(DuplicateCluster.objects.filter(key_type=key_type), found)
+    else:
+        changed_devices = Device.objects.filter(updated_at__gte=last_scan.started_at)
+        scan.scanned_devices = changed_devices.count()
+        for key_type in KEY_TYPES:
+            keys = list(_changed_keys(key_type, changed_devices))
+            for start in range(0, len(keys), CLUSTER_BATCH_SIZE):
+                chunk = keys[start:start + CLUSTER_BATCH_SIZE]
+                found = _scan_key_type(key_type, chunk)
+                _delete_missing(DuplicateCluster.objects.filter(key_type=key_type, key__in=chunk), found)
+
+    # Silinen cihazlar kümeleri tek üyeye düşürmüş olabilir
+    DuplicateCluster.objects.annotate(members=Count('devices')).filter(members__lt=2).delete()
+
+    scan.finished_at = timezone.now()
+    scan.cluster_count = DuplicateCluster.objects.count()
+    scan.save(update_fields=['scanned_devices', 'finished_at', 'cluster_count'])
+    return scan
@@ -0,0 +1,129 @@
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+
+from django.conf import settings
+from django.http import FileResponse, StreamingHttpResponse
+
+from .conditional import latest_update, related_version
+
+# Varsayılanlar; settings.py'de DEVICE_EXPORT_CACHE_* ile değiştirilebilir
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+
+def get_cache_dir():
+    return Path(getattr(settings, 'DEVICE_EXPORT_CACHE_DIR', settings.BASE_DIR / 'export_cache'))
+
+
+def get_max_bytes():
+    return getattr(settings, 'DEVICE_EXPORT_CACHE_MAX_BYTES', DEFAULT_MAX_BYTES)
+
+
+def data_version(queryset):
+    """Veri sürümü token'ı: en son updated_at + satır sayısı (indeksli, tek sorgu)
+    + ilişkili kayıt sürümü.
+
+    Ekleme ve güncellemeler updated_at'i, silmeler satır sayısını değiştirir.
+    Satırlardaki kullanıcı adları (user__first_name/last_name) cihaz tablosunda
+    olmadığından kullanıcı değişiklikleri ilişkili kayıt sürümünü artırır.
+    """
+    last_update, row_count = latest_update(queryset)
+    return f"{last_update.isoformat() if last_update else '-'}:{row_count}:{related_version()}"
+
+
+def export_scope(user):
+    """Export'un yetki kapsamı (admin'ler aynı dosyayı paylaşır)"""
+    return 'all' if user.can_view_all_devices else f'user:{user.pk}'
+
+
+def cache_key(variant, params, scope, version):
+    """Format, filtre parametreleri, kapsam ve veri sürümünden dosya anahtarı üretir"""
+    normalized = sorted((key, sorted(values)) for key, values in params.lists())
+    payload = json.dumps([variant, normalized, scope, version], sort_keys=True)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def get_cached_path(key, suffix):
+    """Önbellekteki dosyayı döndürür; LRU için erişim zamanını günceller"""
+    path = get_cache_dir() / f'{key}{suffix}'
+    try:
+        os.utime(path)
+    except FileNotFoundError:
+        return None
+    return path
+
+
+def evict(max_bytes=None):
+    """Toplam boyut sınırı aşılırsa en uzun süredir kullanılmayan dosyaları siler"""
+    max_bytes = get_max_bytes() if max_bytes is None else max_bytes
+    entries = []
+    total = 0
+    for path in get_cache_dir().iterdir():
+        if path.name.startswith('.'):
+            continue
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            continue
+        entries.append((stat.st_mtime, stat.st_size, path))
+        total += stat.st_size
+
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            pass
+        total -= size
+
+
+def tee_to_cache(key, suffix, chunks):
+    """Akan içeriği istemciye iletirken önbellek dosyasına da yazar.
+
+    Dosya, içerik tamamen üretildiğinde atomik olarak yerine taşınır; istemci
+    yarıda bırakırsa geçici dosya silinir.
+    """
+    cache_dir = get_cache_dir()
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=cache_dir, prefix='.tmp-')
+    completed = False
+    try:
+        with os.fdopen(fd, 'wb') as tmp_file:
+            for chunk in chunks:
+                data = chunk.encode('utf-8') if isinstance(chunk, str) else chunk
+                tmp_file.write(data)
+                yield data
+        os.replace(tmp_path, cache_dir / f'{key}{suffix}')
+        completed = True
+    finally:
+        if not completed:
+            try:
+                os.unlink(tmp_path)
+            except FileNotFoundError:
+                pass
+    evict()
+
+
+def cached_export_response(request, queryset, variant, build_stream, content_type,
+                           filename, suffix, as_attachment=False):
+    """Export'u önbellekten (FileResponse) veya üretip önbelleğe yazarak döndürür"""
+    key = cache_key(variant, request.GET, export_scope(request.user), data_version(queryset))
+
+    path = get_cached_path(key, suffix)
+    if path is not None:
+        try:
+            return FileResponse(
+                open(path, 'rb'), content_type=content_type,
+                as_attachment=as_attachment, filename=filename
+            )
+        except FileNotFoundError:
+            # Bu arada LRU ile silinmiş olabilir
+            pass
+
+    response = StreamingHttpResponse(tee_to_cache(key, suffix, build_stream()), content_type=content_type)
+    disposition = 'attachment' if as_attachment else 'inline'
+    response['Content-Disposition'] = f'{disposition}; filename="{filename}"'
+    return response
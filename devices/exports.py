@@ -0,0 +1,90 @@
+import csv
+import json
+
+from django.utils.text import compress_sequence
+
+from .models import Device
+
+# iterator() ile veritabanından tek seferde okunacak satır sayısı
+EXPORT_CHUNK_SIZE = 2000
+
+# Export'ta kullanılan kolonlar; geri kalan alanlar (notes vb.) okunmaz
+EXPORT_FIELDS = (
+    'id', 'device_name', 'device_type', 'gsm_number', 'device_email',
+    'is_active', 'created_at', 'user__first_name', 'user__last_name',
+)
+
+CSV_HEADER = ['Cihaz Adı', 'Tür', 'GSM Numarası', 'E-posta', 'Kullanıcı', 'Durum', 'Kayıt Tarihi']
+
+
+class Echo:
+    """csv.writer için yazılanı olduğu gibi döndüren sahte dosya nesnesi"""
+
+    def write(self, value):
+        return value
+
+
+def export_queryset(queryset):
+    """Export için kolon projeksiyonu yapılmış, kullanıcıyı join eden queryset"""
+    return queryset.select_related('user').only(*EXPORT_FIELDS)
+
+
+def iter_devices(queryset, chunk_size=EXPORT_CHUNK_SIZE):
+    """Cihazları bellekte biriktirmeden parça parça okur"""
+    return export_queryset(queryset).iterator(chunk_size=chunk_size)
+
+
+def device_csv_row(device):
+    return [
+        device.device_name or 'İsimsiz',
+        device.get_device_type_display(),
+        device.gsm_number or '',
+        device.device_email or '',
+        device.user.get_full_name(),
+        'Aktif' if device.is_active else 'Pasif',
+        device.created_at.strftime('%d.%m.%Y %H:%M')
+    ]
+
+
+def stream_csv(queryset):
+    """CSV satırlarını okundukça üreten generator"""
+    writer = csv.writer(Echo())
+    yield writer.writerow(CSV_HEADER)
+    for device in iter_devices(queryset):
+        yield writer.writerow(device_csv_row(device))
+
+
+def device_json_row(device):
+    return {
+        'id': device.id,
+        'device_name': device.device_name or 'İsimsiz',
+        'device_type': device.get_device_type_display(),
+        'gsm_number': device.gsm_number or '',
+        'device_email': device.device_email or '',
+        'user': device.user.get_full_name(),
+        'is_active': device.is_active,
+        'created_at': device.created_at.strftime('%d.%m.%Y %H:%M')
+    }
+
+
+def stream_json_array(queryset):
+    """Tek bir JSON dizisini satır satır üreten generator"""
+    yield '['
+    separator = ''
+    for device in iter_devices(queryset):
+        yield separator + json.dumps(device_json_row(device))
+        separator = ','
+    yield ']'
+
+
+def stream_ndjson(queryset):
+    """Her satırı ayrı bir JSON nesnesi olarak üreten generator (application/x-ndjson)"""
+    for device in iter_devices(queryset):
+        yield json.dumps(device_json_row(device)) + '\n'
+
+
+def gzip_stream(chunks):
+    """Akan içeriği gzip ile anında sıkıştırır"""
+    return compress_sequence(
+        chunk.encode('utf-8') if isinstance(chunk, str) else chunk for chunk in chunks
+    )
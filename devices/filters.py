@@ -0,0 +1,83 @@
+from datetime import datetime
+
+from .groups import filter_by_group
+from .models import Device
+from .search import search_devices
+
+
+def scope_devices(user):
+    """Kullanıcının yetkisine göre görebileceği cihazları döndürür"""
+    if user.is_authenticated and not user.can_view_all_devices:
+        return Device.objects.filter(user=user)
+    # Admin ve anonymous kullanıcılar için tüm cihazlar
+    return Device.objects.all()
+
+
+def filter_devices(queryset, params):
+    """Cihaz listesi filtrelerini (tür, durum, grup, marka/model, tarih aralığı, arama) uygular.
+
+    Liste, export ve API aynı GET parametrelerini kullanır.
+    (queryset, uygulanan filtreler) döndürür.
+    """
+    device_type_filter = params.get('device_type')
+    status_filter = params.get('status')
+    group_filter = params.get('group')
+    brand_filter = params.get('brand')
+    model_filter = params.get('model')
+    start_date = params.get('start_date')
+    end_date = params.get('end_date')
+    search_query = params.get('search')
+    
+    if device_type_filter:
+        queryset = queryset.filter(device_type=device_type_filter)
+    
+    if status_filter == 'active':
+        queryset = queryset.filter(is_active=True)
+    elif status_filter == 'inactive':
+        queryset = queryset.filter(is_active=False)
+    
+    # Grup filtresi alt grupları da kapsar
+    if group_filter and group_filter.isdigit():
+        queryset = filter_by_group(queryset, int(group_filter))
+    else:
+        group_filter = None
+    
+    # Marka/model filtreleri katalog id'leri ile
+    if brand_filter and brand_filter.isdigit():
+        queryset = queryset.filter(catalog_brand_id=int(brand_filter))
+    else:
+        brand_filter = None
+    
+    if model_filter and model_filter.isdigit():
+        queryset = queryset.filter(catalog_model_id=int(model_filter))
+    else:
+        model_filter = None
+    
+    if start_date:
+        try:
+            start_date = datetime.strptime(start_date, '%Y-%m-%d').date()
+            queryset = queryset.filter(created_at__date__gte=start_date)
+        except ValueError:
+            pass
+    
+    if end_date:
+        try:
+            end_date = datetime.strptime(end_date, '%Y-%m-%d').date()
+            queryset = queryset.filter(created_at__date__lte=end_date)
+        except ValueError:
+            pass
+    
+    if search_query:
+        queryset = search_devices(queryset, search_query)
+    
+    filters = {
+        'device_type': device_type_filter,
+        'status': status_filter,
+        'group': group_filter,
+        'brand': brand_filter,
+        'model': model_filter,
+        'start_date': start_date,
+        'end_date': end_date,
+        'search': search_query,
+    }
+    return queryset, filters
@@ -2,7 +2,16 @@ from django import forms
 from django.core.validators import RegexValidator
 from django.utils.translation import gettext_lazy as _
 import re
-from .models import Device
+from . import catalog
+from .bulk_actions import BULK_ACTION_CHOICES
+from .identifiers import normalize_gsm
+from .models import Device, DeviceGroup
+
+def validate_dahili_phone(phone):
+    """Dahili telefon formatı kontrolü (XXXX XXXX)"""
+    if phone and not re.match(r'^\d{4}\s\d{4}$', phone):
+        raise forms.ValidationError('Dahili telefon formatı: XXXX XXXX (örn: 3534 2255)')
+
 
 class DeviceForm(forms.ModelForm):
     """Cihaz ekleme/düzenleme formu"""
@@ -127,15 +136,23 @@ class DeviceForm(forms.ModelForm):
         help_text='Cihazın ait olduğu grup veya birim (örn: IT Departmanı)'
     )
     
+    group = forms.ModelChoiceField(
+        queryset=DeviceGroup.objects.all(),
+        required=False,
+        empty_label='Grup Seçiniz (Opsiyonel)',
+        widget=forms.Select(attrs={
+            'class': 'form-select'
+        }),
+        label='Cihaz Grubu'
+    )
+    
     class Meta:
         model = Device
-        fields = ['device_name', 'gsm_number', 'device_email', 'email_number', 'device_type', 'brand', 'model', 'imei', 'device_group', 'notes']
+        fields = ['device_name', 'gsm_number', 'device_email', 'email_number', 'device_type', 'brand', 'model', 'imei', 'device_group', 'group', 'notes']
     
     def clean_device_email(self):
         phone = self.cleaned_data.get('device_email')
-        # Dahili telefon formatı kontrolü (XXXX XXXX)
-        if phone and not re.match(r'^\d{4}\s\d{4}$', phone):
-            raise forms.ValidationError('Dahili telefon formatı: XXXX XXXX (örn: 3534 2255)')
+        validate_dahili_phone(phone)
         
         if self.instance.pk:  # Düzenleme
             if Device.objects.exclude(pk=self.instance.pk).filter(device_email=phone).exists():
@@ -147,12 +164,120 @@ class DeviceForm(forms.ModelForm):
     
     def clean_gsm_number(self):
         gsm = self.cleaned_data.get('gsm_number')
-        # GSM numarasını formatla
-        if gsm.startswith('0'):
-            gsm = '+90' + gsm[1:]
-        elif not gsm.startswith('+'):
-            gsm = '+90' + gsm
-        return gsm
+        # GSM numarasını E.164 biçimine getir (+90...)
+        return normalize_gsm(gsm) or gsm
+    
+    # Marka/model katalog kayıtları clean() içinde çözülür (Device.save() çözmez)
+    resolve_catalog = True
+    
+    def clean(self):
+        cleaned_data = super().clean()
+        if self.resolve_catalog and not self.errors:
+            catalog.clean_catalog(self.instance, cleaned_data)
+        return cleaned_data
+
+
+class DeviceImportRowForm(DeviceForm):
+    """Toplu import'ta tek bir satırı doğrulayan form
+
+    Benzersizlik kontrolleri satır başına sorgu yerine importer tarafından
+    batch başına toplu olarak yapılır. device_email model alanı olarak
+    listelenmez: model doğrulaması (EmailField, unique) çalışmaz, dahili
+    telefon formatı formda doğrulanıp clean() içinde instance'a yazılır.
+    (user, gsm_number) kontrolü de user formda olmadığından atlanır.
+    """
+    
+    device_type = forms.ChoiceField(
+        choices=Device.DEVICE_TYPE_CHOICES,
+        required=False,
+        label='Cihaz Cinsi'
+    )
+    
+    # Grup ve katalog kayıtları satır başına sorgu yerine importer'da batch halinde çözülür
+    group = None
+    resolve_catalog = False
+    
+    class Meta(DeviceForm.Meta):
+        fields = [field for field in DeviceForm.Meta.fields if field not in ('group', 'device_email')]
+    
+    def clean_device_type(self):
+        return self.cleaned_data.get('device_type') or 'phone'
+    
+    def clean_device_email(self):
+        phone = self.cleaned_data.get('device_email')
+        validate_dahili_phone(phone)
+        return phone
+    
+    def clean(self):
+        cleaned_data = super().clean()
+        if 'device_email' in cleaned_data:
+            self.instance.device_email = cleaned_data['device_email']
+        return cleaned_data
+
+
+class DeviceImportForm(forms.Form):
+    """Toplu cihaz import dosyası yükleme formu"""
+    
+    file = forms.FileField(
+        widget=forms.ClearableFileInput(attrs={
+            'class': 'form-input',
+            'accept': '.csv,.xlsx'
+        }),
+        label='Cihaz Dosyası',
+        help_text='CSV veya XLSX; ilk satır kolon başlıkları olmalıdır'
+    )
+    
+    def clean_file(self):
+        uploaded_file = self.cleaned_data.get('file')
+        if uploaded_file and not uploaded_file.name.lower().endswith(('.csv', '.xlsx')):
+            raise forms.ValidationError('Sadece CSV ve XLSX dosyaları desteklenir.')
+        return uploaded_file
+
+
+class DeviceIdListField(forms.Field):
+    """Seçili cihaz id'leri (checkbox listesi)"""
+    widget = forms.MultipleHiddenInput
+    
+    def to_python(self, value):
+        try:
+            return [int(device_id) for device_id in value or []]
+        except (TypeError, ValueError):
+            raise forms.ValidationError('Geçersiz cihaz seçimi.')
+
+
+class DeviceBulkActionForm(forms.Form):
+    """Cihaz listesindeki toplu işlem formu"""
+    
+    action = forms.ChoiceField(
+        choices=BULK_ACTION_CHOICES,
+        widget=forms.Select(attrs={
+            'class': 'form-select'
+        }),
+        label='Toplu İşlem'
+    )
+    
+    device_ids = DeviceIdListField(required=False)
+    
+    select_all = forms.BooleanField(
+        required=False,
+        label='Filtreye uyan tüm cihazlar'
+    )
+    
+    group = forms.ModelChoiceField(
+        queryset=DeviceGroup.objects.all(),
+        required=False,
+        empty_label='Grupsuz',
+        widget=forms.Select(attrs={
+            'class': 'form-select'
+        }),
+        label='Yeni Cihaz Grubu'
+    )
+    
+    def clean(self):
+        cleaned_data = super().clean()
+        if not cleaned_data.get('device_ids') and not cleaned_data.get('select_all'):
+            raise forms.ValidationError('İşlem için en az bir cihaz seçiniz.')
+        return cleaned_data
 
 
 class DeviceFilterForm(forms.Form):
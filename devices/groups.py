@@ -0,0 +1,184 @@
+from collections import Counter
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import Count, F, Q
+
+from .models import Device, DeviceGroup, DeviceGroupClosure
+
+
+def normalize_group_name(name):
+    """Baştaki/sondaki ve tekrarlanan boşlukları temizler"""
+    return ' '.join((name or '').split())
+
+
+def group_key(name):
+    """Aynı grubu işaret eden yazımları (büyük/küçük harf) birleştirmek için anahtar"""
+    return normalize_group_name(name).casefold()
+
+
+def subtree_ids(group_id):
+    """Grubun kendisi ve tüm alt gruplarının id'leri (alt sorgu)"""
+    return DeviceGroupClosure.objects.filter(ancestor_id=group_id).values('descendant_id')
+
+
+def filter_by_group(queryset, group_id):
+    """Cihazları grubun alt ağacına göre filtreler (closure tablosu ile tek join)"""
+    return queryset.filter(group_id__in=subtree_ids(group_id))
+
+
+def filter_choices(selected_id=None):
+    """Liste filtresindeki gruplar: kök gruplar ve (alt grupsa) seçili grup.
+
+    Kök grubun filtresi alt grupları da kapsadığından tüm gruplar listelenmez;
+    alt gruba ?group=<id> ile doğrudan filtrelenebilir.
+    """
+    condition = Q(parent=None)
+    if selected_id:
+        condition |= Q(pk=selected_id)
+    return DeviceGroup.objects.filter(condition).only('id', 'name', 'device_count')
+
+
+def add_to_hierarchy(group):
+    """Yeni grup için closure satırlarını ekler (kendisi + üst grubun ataları)"""
+    links = [DeviceGroupClosure(ancestor=group, descendant=group, depth=0)]
+    if group.parent_id:
+        links.extend(
+            DeviceGroupClosure(ancestor_id=ancestor_id, descendant=group, depth=depth + 1)
+            for ancestor_id, depth in DeviceGroupClosure.objects.filter(
+                descendant_id=group.parent_id
+            ).values_list('ancestor_id', 'depth')
+        )
+    DeviceGroupClosure.objects.bulk_create(links)
+
+
+def move_in_hierarchy(group):
+    """Üst grubu değişen grubun alt ağacını yeni konumuna taşır.
+
+    Eski atalarla olan bağlar silinir, yeni atalarla alt ağacın çapraz
+    çarpımı eklenir; sayaçlar eski atalardan düşülüp yenilerine eklenir.
+    """
+    subtree = dict(
+        DeviceGroupClosure.objects.filter(ancestor=group).values_list('descendant_id', 'depth')
+    )
+    if group.parent_id in subtree:
+        raise ValidationError('Bir grup kendi alt grubunun altına taşınamaz.')
+
+    counts = DeviceGroup.objects.filter(pk=group.pk).values('device_count', 'active_count').get()
+    old_ancestor_ids = list(
+        DeviceGroupClosure.objects.filter(descendant=group, depth__gt=0).values_list('ancestor_id', flat=True)
+    )
+    DeviceGroup.objects.filter(id__in=old_ancestor_ids).update(
+        device_count=F('device_count') - counts['device_count'],
+        active_count=F('active_count') - counts['active_count']
+    )
+    DeviceGroupClosure.objects.filter(
+        ancestor_id__in=old_ancestor_ids, descendant_id__in=list(subtree)
+    ).delete()
+
+    if group.parent_id:
+        new_ancestors = list(
+            DeviceGroupClosure.objects.filter(descendant_id=group.parent_id).values_list('ancestor_id', 'depth')
+        )
+        DeviceGroupClosure.objects.bulk_create([
+            DeviceGroupClosure(ancestor_id=ancestor_id, descendant_id=descendant_id, depth=depth + sub_depth + 1)
+            for ancestor_id, depth in new_ancestors
+            for descendant_id, sub_depth in subtree.items()
+        ])
+        DeviceGroup.objects.filter(id__in=[ancestor_id for ancestor_id, _ in new_ancestors]).update(
+            device_count=F('device_count') + counts['device_count'],
+            active_count=F('active_count') + counts['active_count']
+        )
+
+
+def adjust_counters(group_id, devices=0, active=0):
+    """Grubun ve tüm atalarının sayaçlarını tek UPDATE ile değiştirir"""
+    if not group_id or not (devices or active):
+        return
+    DeviceGroup.objects.filter(
+        id__in=DeviceGroupClosure.objects.filter(descendant_id=group_id).values('ancestor_id')
+    ).update(
+        device_count=F('device_count') + devices,
+        active_count=F('active_count') + active
+    )
+
+
+def group_totals(queryset):
+    """Queryset'teki cihazların gruba göre (group_id, toplam, aktif) dağılımı"""
+    return (
+        queryset.order_by()
+        .exclude(group_id=None)
+        .values_list('group_id')
+        .annotate(total=Count('id'), active=Count('id', filter=Q(is_active=True)))
+    )
+
+
+def count_new_devices(devices):
+    """Toplu eklenen (sinyal göndermeyen) cihazları sayaçlara ekler"""
+    totals = Counter()
+    actives = Counter()
+    for device in devices:
+        if device.group_id:
+            totals[device.group_id] += 1
+            actives[device.group_id] += int(device.is_active)
+    for group_id, total in totals.items():
+        adjust_counters(group_id, devices=total, active=actives[group_id])
+
+
+def resolve_group_names(names):
+    """Grup adlarını kök gruplara eşler; olmayanları oluşturur.
+
+    {ad: (group_id, grubun kayıtlı adı)} döndürür. Yazım farkları (boşluk,
+    büyük/küçük harf) aynı gruba eşlenir.
+    """
+    keys = {name: group_key(name) for name in names if normalize_group_name(name)}
+    if not keys:
+        return {}
+
+    existing = {}
+    for group_id, group_name in DeviceGroup.objects.filter(parent=None).values_list('id', 'name'):
+        existing.setdefault(group_key(group_name), (group_id, group_name))
+
+    for name, key in keys.items():
+        if key not in existing:
+            group = DeviceGroup.objects.create(name=normalize_group_name(name))
+            existing[key] = (group.pk, group.name)
+    return {name: existing[key] for name, key in keys.items()}
+
+
+def rebuild_hierarchy():
+    """Closure tablosunu parent alanlarından baştan oluşturur"""
+    parents = dict(DeviceGroup.objects.values_list('id', 'parent_id'))
+    links = []
+    for group_id in parents:
+        ancestor_id, depth = group_id, 0
+        while ancestor_id is not None:
+            links.append(DeviceGroupClosure(ancestor_id=ancestor_id, descendant_id=group_id, depth=depth))
+            ancestor_id, depth = parents[ancestor_id], depth + 1
+    with transaction.atomic():
+        DeviceGroupClosure.objects.all().delete()
+        DeviceGroupClosure.objects.bulk_create(links, batch_size=5000)
+    return len(links)
+
+
+def rebuild_counters():
+    """Sayaçları cihaz tablosundan yeniden hesaplar; düzeltilen grup sayısını döndürür"""
+    direct = {
+        group_id: (total, active)
+        for group_id, total, active in group_totals(Device.objects.all())
+    }
+    totals = Counter()
+    actives = Counter()
+    for ancestor_id, descendant_id in DeviceGroupClosure.objects.values_list('ancestor_id', 'descendant_id'):
+        total, active = direct.get(descendant_id, (0, 0))
+        totals[ancestor_id] += total
+        actives[ancestor_id] += active
+
+    changed = []
+    for group in DeviceGroup.objects.only('id', 'device_count', 'active_count'):
+        if (group.device_count, group.active_count) != (totals[group.pk], actives[group.pk]):
+            group.device_count = totals[group.pk]
+            group.active_count = actives[group.pk]
+            changed.append(group)
+    DeviceGroup.objects.bulk_update(changed, ['device_count', 'active_count'], batch_size=1000)
+    return len(changed)
@@ -0,0 +1,108 @@
+"""GSM, IMEI ve cihaz e-mail numaralarının aranabilir (normalize) biçimleri.
+
+Kayıtlı değerler farklı yazımlarla girilmiş olabilir (0555..., +90 555...,
+905..., boşluk/tire içeren IMEI). Normalize kolonlar tek biçimde tutulur;
+sorgular `icontains` yerine indeksli eşitlikle yapılır.
+"""
+import re
+
+from django.db.models import Q
+
+DEFAULT_COUNTRY_CODE = '90'
+
+# Tek aramada döndürülen en fazla cihaz (aynı numara birden fazla kullanıcıda olabilir)
+LOOKUP_LIMIT = 50
+
+# Normalize kolonlar ve kaynak alanları
+NORMALIZED_FIELDS = {
+    'gsm_normalized': 'gsm_number',
+    'imei_normalized': 'imei',
+    'email_number_normalized': 'email_number',
+}
+
+_NON_DIGITS = re.compile(r'\D')
+
+
+def normalize_digits(value):
+    """Yalnızca rakamları bırakır; rakam yoksa None"""
+    digits = _NON_DIGITS.sub('', value or '')
+    return digits or None
+
+
+def normalize_gsm(value):
+    """Telefon numarasını E.164 (+905551234567) biçimine çevirir.
+
+    Ülke kodu yazılmamış numaralar Türkiye numarası kabul edilir. 10 haneden
+    kısa veya 15 haneden uzun değerler için None döner.
+    """
+    value = (value or '').strip()
+    digits = normalize_digits(value)
+    if not digits:
+        return None
+    if value.startswith('+'):
+        number = digits
+    elif digits.startswith('00'):
+        number = digits[2:]
+    elif digits.startswith('0'):
+        number = DEFAULT_COUNTRY_CODE + digits[1:]
+    elif len(digits) == 10:
+        number = DEFAULT_COUNTRY_CODE + digits
+    else:
+        number = digits
+    if not 10 <= len(number) <= 15:
+        return None
+    return '+' + number
+
+
+def normalized_values(device):
+    """Cihazın normalize kolon değerleri"""
+    return {
+        'gsm_normalized': normalize_gsm(device.gsm_number),
+        'imei_normalized': normalize_digits(device.imei),
+        'email_number_normalized': normalize_digits(device.email_number),
+    }
+
+
+def identifier_query(value):
+    """Herhangi bir biçimde yazılmış tanımlayıcı için eşitlik koşulları (Q).
+
+    GSM, IMEI ve e-mail no kolonlarının her biri ayrı indekse sahiptir;
+    OR'lanan eşitlikler indeks taramasıyla çözülür. Eşleşme mümkün değilse None.
+    """
+    digits = normalize_digits(value)
+    if not digits:
+        return None
+    condition = Q(imei_normalized=digits) | Q(email_number_normalized=digits)
+    gsm = normalize_gsm(value)
+    if gsm:
+        condition |= Q(gsm_normalized=gsm)
+    return condition
+
+
+def lookup_devices(queryset, value):
+    """Tanımlayıcıya (GSM/IMEI/e-mail no) tam eşleşen cihazlar"""
+    condition = identifier_query(value)
+    if condition is None:
+        return queryset.none()
+    return queryset.filter(condition)
+
+
+def backfill_normalized(model, batch_size=2000):
+    """Normalize kolonları id sırasıyla batch'ler halinde doldurur; güncellenen satır sayısını döndürür"""
+    sources = ['id', *NORMALIZED_FIELDS.values(), *NORMALIZED_FIELDS]
+    last_id = 0
+    updated = 0
+    while True:
+        batch = list(model.objects.filter(id__gt=last_id).order_by('id').only(*sources)[:batch_size])
+        if not batch:
+            return updated
+        changed = []
+        for device in batch:
+            values = normalized_values(device)
+            if any(getattr(device, field) != value for field, value in values.items()):
+                for field, value in values.items():
+                    setattr(device, field, value)
+                changed.append(device)
+        model.objects.bulk_update(changed, list(NORMALIZED_FIELDS))
+        updated += len(changed)
+        last_id = batch[-1].id
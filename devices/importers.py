@@ -0,0 +1,257 @@
+import csv
+import io
+import os
+
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+
+from . import catalog, counters, groups, search, tac
+from .forms import DeviceImportRowForm
+from .identifiers import normalize_gsm
+from .models import Device
+from .signals import devices_bulk_created
+
+# Tek transaction'da doğrulanıp bulk_create ile eklenecek satır sayısı
+IMPORT_BATCH_SIZE = 1000
+
+# Eşzamanlı bir import ile çakışan batch'in en fazla deneme sayısı
+IMPORT_ATTEMPTS = 2
+
+# Sonuç ekranında gösterilecek en fazla hata sayısı
+MAX_REPORTED_ERRORS = 100
+
+IMPORT_FIELDS = list(DeviceImportRowForm.base_fields)
+
+# Dosya başlıkları: alan adları veya ekrandaki Türkçe etiketler
+HEADER_ALIASES = {
+    'cihaz adı': 'device_name',
+    'gsm numarası': 'gsm_number',
+    'dahili telefon': 'device_email',
+    'cihaz e-posta adresi': 'device_email',
+    'cihaz e-mail no': 'email_number',
+    'cihaz cinsi': 'device_type',
+    'marka': 'brand',
+    'model': 'model',
+    'imei numarası': 'imei',
+    'imei': 'imei',
+    'cihaz birliği': 'device_group',
+    'notlar': 'notes',
+}
+
+
+class DeviceImportError(Exception):
+    """Dosya bütünüyle okunamadığında (format, başlık vb.) fırlatılır"""
+
+
+class ImportResult:
+    """Import özet bilgileri"""
+
+    def __init__(self):
+        self.created = 0
+        self.skipped = 0
+        self.errors = []
+
+    @property
+    def total_rows(self):
+        return self.created + self.skipped
+
+    def add_error(self, row_number, message):
+        self.skipped += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({'row': row_number, 'message': message})
+
+
+def _normalize_header(header):
+    name = (header or '').strip()
+    if name in IMPORT_FIELDS:
+        return name
+    return HEADER_ALIASES.get(name.lower())
+
+
+def _clean_value(value):
+    if value is None:
+        return ''
+    return str(value).strip()
+
+
+def _iter_csv(uploaded_file):
+    text = io.TextIOWrapper(uploaded_file.file, encoding='utf-8-sig', newline='')
+    try:
+        sample = text.read(4096)
+        text.seek(0)
+        try:
+            dialect = csv.Sniffer().sniff(sample, delimiters=',;\t')
+        except csv.Error:
+            dialect = csv.excel
+        yield from csv.reader(text, dialect)
+    finally:
+        text.detach()
+
+
+def _iter_xlsx(uploaded_file):
+    try:
+        import openpyxl
+    except ImportError:
+        raise DeviceImportError('XLSX dosyaları için openpyxl paketi kurulu değil.')
+
+    workbook = openpyxl.load_workbook(uploaded_file, read_only=True, data_only=True)
+    try:
+        for row in workbook.active.iter_rows(values_only=True):
+            yield row
+    finally:
+        workbook.close()
+
+
+def iter_rows(uploaded_file):
+    """Yüklenen dosyayı satır satır okur; (satır no, {alan: değer}) üretir"""
+    extension = os.path.splitext(uploaded_file.name)[1].lower()
+    if extension == '.csv':
+        rows = _iter_csv(uploaded_file)
+    elif extension == '.xlsx':
+        rows = _iter_xlsx(uploaded_file)
+    else:
+        raise DeviceImportError('Sadece CSV ve XLSX dosyaları desteklenir.')
+
+    try:
+        header = next(rows)
+    except StopIteration:
+        raise DeviceImportError('Dosya boş.')
+
+    columns = [_normalize_header(_clean_value(name)) for name in header]
+    if 'gsm_number' not in columns or 'device_email' not in columns:
+        raise DeviceImportError('Dosyada GSM numarası ve dahili telefon kolonları bulunmalıdır.')
+
+    for row_number, row in enumerate(rows, start=2):
+        if not any(_clean_value(value) for value in row):
+            continue
+        data = {
+            column: _clean_value(value)
+            for column, value in zip(columns, row)
+            if column
+        }
+        yield row_number, data
+
+
+def _form_error_message(form):
+    return '; '.join(
+        f'{form.fields[field].label if field in form.fields else field}: {" ".join(errors)}'
+        for field, errors in form.errors.items()
+    )
+
+
+def _unique_rows(batch, owner, seen_emails, seen_gsm_numbers, result):
+    """Veritabanında veya dosyanın önceki satırlarında bulunan numaraları hata olarak ayırır.
+
+    Benzersizlik kontrolleri satır başına değil batch başına iki set sorgusu
+    ile yapılır: device_email (global) ve (user, normalize GSM). GSM'ler
+    normalize edilmiş halleriyle karşılaştırılır; farklı yazılmış aynı
+    numara (0555..., +90 555...) tekrar sayılır.
+    """
+    emails = {device.device_email for _, device in batch}
+    gsm_keys = {row_number: _gsm_key(device.gsm_number) for row_number, device in batch}
+    existing_emails = set(
+        Device.objects.filter(device_email__in=emails).order_by().values_list('device_email', flat=True)
+    )
+    # Normalize edilemeyen eski kayıtlar ham metinleriyle karşılaştırılır
+    keys = set(gsm_keys.values())
+    existing_gsm_numbers = {
+        normalized or raw
+        for normalized, raw in Device.objects.filter(
+            Q(gsm_normalized__in=keys) | Q(gsm_normalized=None, gsm_number__in=keys), user=owner
+        ).order_by().values_list('gsm_normalized', 'gsm_number')
+    }
+
+    rows = []
+    for row_number, device in batch:
+        gsm_key = gsm_keys[row_number]
+        if device.device_email in existing_emails or device.device_email in seen_emails:
+            result.add_error(row_number, 'Bu dahili telefon numarası zaten kullanılıyor.')
+            continue
+        if gsm_key in existing_gsm_numbers or gsm_key in seen_gsm_numbers:
+            result.add_error(row_number, 'Bu GSM numarası bu kullanıcıda zaten kayıtlı.')
+            continue
+        seen_emails.add(device.device_email)
+        seen_gsm_numbers.add(gsm_key)
+        rows.append((row_number, device))
+    return rows
+
+
+def _gsm_key(gsm_number):
+    """Tekrar kontrolü anahtarı: normalize GSM, normalize edilemiyorsa ham metin"""
+    return normalize_gsm(gsm_number) or gsm_number
+
+
+def _create_devices(new_devices):
+    """Doğrulanmış cihazları tek transaction'da ekler; oluşturulan cihazları döndürür"""
+    with transaction.atomic():
+        # device_group adları kök gruplara eşlenir (olmayanlar oluşturulur)
+        resolved = groups.resolve_group_names({device.device_group for device in new_devices if device.device_group})
+        for device in new_devices:
+            if device.device_group in resolved:
+                device.group_id, device.device_group = resolved[device.device_group]
+        # Markası boş satırlar IMEI'nin TAC'ından doldurulur
+        tac.autofill(new_devices)
+        catalog.assign_catalogs(new_devices)
+        for device in new_devices:
+            device.set_normalized_identifiers()
+        created = Device.objects.bulk_create(new_devices)
+        # bulk_create post_save sinyali göndermez
+        search.index_devices(created)
+        groups.count_new_devices(created)
+        counters.count_new_devices(created)
+        devices_bulk_created.send(sender=Device, devices=created)
+    return created
+
+
+def _import_batch(batch, owner, seen_emails, seen_gsm_numbers, result):
+    """Bir batch'i doğrular ve tek transaction'da ekler.
+
+    Eşzamanlı bir import aynı numaraları kontrol ile ekleme arasında
+    eklerse batch geri alınır; kontrol yeniden yapılıp çakışan satırlar
+    hata olarak raporlanır, kalanlar bir kez daha denenir.
+    """
+    pending = batch
+    for _ in range(IMPORT_ATTEMPTS):
+        rows = _unique_rows(pending, owner, seen_emails, seen_gsm_numbers, result)
+        if not rows:
+            return
+        try:
+            created = _create_devices([device for _, device in rows])
+        except IntegrityError:
+            # Satırlar eklenmedi; yeniden kontrolde dosya içi tekrar sayılmamaları için
+            for _, device in rows:
+                seen_emails.discard(device.device_email)
+                seen_gsm_numbers.discard(device.gsm_number)
+            pending = rows
+            continue
+        result.created += len(created)
+        return
+
+    for row_number, _ in pending:
+        result.add_error(row_number, 'Kayıt eşzamanlı bir işlemle çakıştı; satır eklenmedi.')
+
+
+def import_devices(uploaded_file, owner, batch_size=IMPORT_BATCH_SIZE):
+    """CSV/XLSX dosyasındaki cihazları owner adına toplu olarak ekler"""
+    result = ImportResult()
+    seen_emails = set()
+    seen_gsm_numbers = set()
+    batch = []
+
+    for row_number, data in iter_rows(uploaded_file):
+        form = DeviceImportRowForm(data=data)
+        if not form.is_valid():
+            result.add_error(row_number, _form_error_message(form))
+            continue
+        device = form.save(commit=False)
+        device.user = owner
+        batch.append((row_number, device))
+
+        if len(batch) >= batch_size:
+            _import_batch(batch, owner, seen_emails, seen_gsm_numbers, result)
+            batch = []
+
+    if batch:
+        _import_batch(batch, owner, seen_emails, seen_gsm_numbers, result)
+
+    return result
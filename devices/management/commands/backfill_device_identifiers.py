@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from devices.identifiers import backfill_normalized
+from devices.models import Device
+
+
+class Command(BaseCommand):
+    help = 'Fill the normalized GSM/IMEI/email number columns used by identifier lookups'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=2000,
+            help='Number of rows read and updated per batch'
+        )
+
+    def handle(self, *args, **options):
+        updated = backfill_normalized(Device, batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Normalized identifiers backfilled: {updated} devices updated'))
@@ -0,0 +1,61 @@
+import csv
+
+from django.core.management.base import BaseCommand, CommandError
+
+from devices import tac
+
+# Kaynak CSV başlıkları (küçük harfle) -> alan
+COLUMN_ALIASES = {
+    'tac': 'tac',
+    'brand': 'brand',
+    'marka': 'brand',
+    'manufacturer': 'brand',
+    'model': 'model',
+    'model name': 'model',
+    'marketing name': 'model',
+}
+
+
+class Command(BaseCommand):
+    help = 'Compile the sorted binary TAC table used for IMEI brand/model autofill from a CSV file'
+
+    def add_arguments(self, parser):
+        parser.add_argument('source', help='CSV file with tac, brand and model columns')
+        parser.add_argument(
+            '--output',
+            default=None,
+            help='Output path (defaults to the DEVICE_TAC_DATABASE setting)'
+        )
+
+    def _rows(self, reader, columns, skipped):
+        for row in reader:
+            values = dict(zip(columns, row))
+            digits = tac.normalize_digits(values.get('tac'))
+            brand = ' '.join((values.get('brand') or '').split())
+            if not digits or len(digits) != tac.TAC_LENGTH or not brand:
+                skipped.append(reader.line_num)
+                continue
+            yield digits, brand, ' '.join((values.get('model') or '').split())
+
+    def handle(self, *args, **options):
+        output = options['output'] or tac.get_database_path()
+        skipped = []
+        try:
+            with open(options['source'], encoding='utf-8-sig', newline='') as handle:
+                sample = handle.read(4096)
+                handle.seek(0)
+                try:
+                    dialect = csv.Sniffer().sniff(sample, delimiters=',;\t')
+                except csv.Error:
+                    dialect = csv.excel
+                reader = csv.reader(handle, dialect)
+                columns = [COLUMN_ALIASES.get(name.strip().lower()) for name in next(reader, [])]
+                if 'tac' not in columns or 'brand' not in columns:
+                    raise CommandError('The source file must have tac and brand columns')
+                count = tac.compile_database(self._rows(reader, columns, skipped), output)
+        except OSError as exc:
+            raise CommandError(f'Cannot compile TAC table: {exc}')
+
+        self.stdout.write(self.style.SUCCESS(f'TAC table written to {output}: {count} entries'))
+        if skipped:
+            self.stdout.write(self.style.WARNING(f'{len(skipped)} rows skipped (invalid TAC or empty brand)'))
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from devices import duplicates
+
+
+class Command(BaseCommand):
+    help = 'Group devices that may be the same physical device by IMEI, GSM and brand/model/name keys'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--incremental',
+            action='store_true',
+            help='Only re-evaluate keys of devices changed since the last finished scan'
+        )
+
+    def handle(self, *args, **options):
+        scan = duplicates.find_duplicates(incremental=options['incremental'])
+        mode = 'incremental' if scan.incremental else 'full'
+        elapsed = (scan.finished_at - scan.started_at).total_seconds()
+        self.stdout.write(self.style.SUCCESS(
+            f'Duplicate scan ({mode}) finished in {elapsed:.1f}s: '
+            f'{scan.scanned_devices} devices scanned, {scan.cluster_count} clusters'
+        ))
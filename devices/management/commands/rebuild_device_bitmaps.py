@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from devices import bitmaps
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the in-process device bitmap index and write its snapshot for fast worker startup'
+
+    def handle(self, *args, **options):
+        # Diğer süreçler indekslerini bu anlık görüntüden yeniden yükler
+        bitmaps.invalidate()
+        index = bitmaps.rebuild()
+        self.stdout.write(self.style.SUCCESS(
+            f'Bitmap index rebuilt: {index.all.bit_count()} devices, '
+            f'snapshot written to {bitmaps.get_snapshot_path()}'
+        ))
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from devices import groups
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the device group hierarchy (closure table) and device counters'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--counters-only',
+            action='store_true',
+            help='Only recompute device counters, keep the closure table'
+        )
+
+    def handle(self, *args, **options):
+        if not options['counters_only']:
+            links = groups.rebuild_hierarchy()
+            self.stdout.write(f'Group hierarchy rebuilt: {links} closure rows')
+
+        changed = groups.rebuild_counters()
+        self.stdout.write(self.style.SUCCESS(f'Group counters reconciled: {changed} groups updated'))
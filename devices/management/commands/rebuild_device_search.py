@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from devices import search
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the SQLite FTS5 search index for devices'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=5000,
+            help='Number of rows inserted per batch'
+        )
+
+    def handle(self, *args, **options):
+        if not search.is_available():
+            self.stdout.write(
+                self.style.WARNING('FTS5 search index is not available on this database, skipping.')
+            )
+            return
+
+        total = search.rebuild_index(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Search index rebuilt: {total} devices indexed'))
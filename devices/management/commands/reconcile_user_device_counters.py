@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from devices import counters
+
+
+class Command(BaseCommand):
+    help = 'Recompute per-user device counters from the device table'
+
+    def handle(self, *args, **options):
+        changed = counters.rebuild_user_counters()
+        self.stdout.write(self.style.SUCCESS(f'User device counters reconciled: {changed} users updated'))
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.5 on 2026-10-17 02:22
+
+import django.db.models.functions.comparison
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('devices', '0007_alter_device_email_number'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='device',
+            index=models.Index(fields=['created_at', 'id'], name='cihaz_created_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='device',
+            index=models.Index(fields=['device_type', 'id'], name='cihaz_type_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='device',
+            index=models.Index(django.db.models.functions.comparison.Coalesce('device_name', models.Value('')), models.F('id'), name='cihaz_name_id_idx'),
+        ),
+    ]
@@ -0,0 +1,54 @@
+from django.db import migrations
+from django.db.utils import DatabaseError
+
+FTS_TABLE = 'cihazlar_fts'
+FTS_COLUMNS = ('device_name', 'gsm_number', 'device_email', 'brand', 'model')
+
+
+def create_search_index(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor != 'sqlite':
+        return
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} "
+                f"USING fts5({', '.join(FTS_COLUMNS)}, tokenize='trigram')"
+            )
+    except DatabaseError:
+        # SQLite FTS5/trigram desteği yoksa arama icontains ile devam eder
+        return
+
+    Device = apps.get_model('devices', 'Device')
+    insert_sql = (
+        f"INSERT INTO {FTS_TABLE} (rowid, {', '.join(FTS_COLUMNS)}) "
+        f"VALUES (%s, {', '.join(['%s'] * len(FTS_COLUMNS))})"
+    )
+    batch = []
+    with connection.cursor() as cursor:
+        for row in Device.objects.order_by().values_list('id', *FTS_COLUMNS).iterator(chunk_size=5000):
+            batch.append([row[0], *(value or '' for value in row[1:])])
+            if len(batch) >= 5000:
+                cursor.executemany(insert_sql, batch)
+                batch = []
+        if batch:
+            cursor.executemany(insert_sql, batch)
+
+
+def drop_search_index(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f'DROP TABLE IF EXISTS {FTS_TABLE}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('devices', '0008_device_cursor_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
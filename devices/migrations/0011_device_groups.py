@@ -0,0 +1,64 @@
+# Generated by Django 5.2.5 on 2026-10-17 02:51
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('devices', '0010_device_updated_at_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DeviceGroup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, verbose_name='Grup Adı')),
+                ('device_count', models.PositiveIntegerField(default=0, verbose_name='Cihaz Sayısı')),
+                ('active_count', models.PositiveIntegerField(default=0, verbose_name='Aktif Cihaz Sayısı')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Oluşturulma Tarihi')),
+                ('parent', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='children', to='devices.devicegroup', verbose_name='Üst Grup')),
+            ],
+            options={
+                'verbose_name': 'Cihaz Grubu',
+                'verbose_name_plural': 'Cihaz Grupları',
+                'db_table': 'cihaz_gruplari',
+                'ordering': ['name'],
+            },
+        ),
+        migrations.AddField(
+            model_name='device',
+            name='group',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='devices', to='devices.devicegroup', verbose_name='Cihaz Grubu'),
+        ),
+        migrations.CreateModel(
+            name='DeviceGroupClosure',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('depth', models.PositiveIntegerField()),
+                ('ancestor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='descendant_links', to='devices.devicegroup')),
+                ('descendant', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='ancestor_links', to='devices.devicegroup')),
+            ],
+            options={
+                'db_table': 'cihaz_grup_hiyerarsi',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='devicegroup',
+            constraint=models.UniqueConstraint(fields=('parent', 'name'), name='cihaz_grup_parent_name_uniq'),
+        ),
+        migrations.AddConstraint(
+            model_name='devicegroup',
+            constraint=models.UniqueConstraint(condition=models.Q(('parent', None)), fields=('name',), name='cihaz_grup_root_name_uniq'),
+        ),
+        migrations.AddIndex(
+            model_name='devicegroupclosure',
+            index=models.Index(fields=['descendant', 'ancestor'], name='cihaz_grup_desc_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='devicegroupclosure',
+            constraint=models.UniqueConstraint(fields=('ancestor', 'descendant'), name='cihaz_grup_closure_uniq'),
+        ),
+    ]
@@ -0,0 +1,51 @@
+from collections import Counter, defaultdict
+
+from django.db import migrations
+from django.db.models import Count, Q
+
+
+def backfill_device_groups(apps, schema_editor):
+    """device_group metinlerinden kök gruplar oluşturur ve cihazları bağlar.
+
+    Boşluk ve büyük/küçük harf farkıyla yazılmış değerler tek grupta
+    birleştirilir; grup adı olarak en sık kullanılan yazım seçilir.
+    """
+    Device = apps.get_model('devices', 'Device')
+    DeviceGroup = apps.get_model('devices', 'DeviceGroup')
+    DeviceGroupClosure = apps.get_model('devices', 'DeviceGroupClosure')
+
+    spellings = defaultdict(Counter)
+    rows = Device.objects.order_by().exclude(device_group=None).values_list('device_group').annotate(n=Count('id'))
+    for value, count in rows:
+        name = ' '.join(value.split())
+        if name:
+            spellings[name.casefold()][value] += count
+
+    for variants in spellings.values():
+        name = ' '.join(variants.most_common(1)[0][0].split())
+        counts = Device.objects.filter(device_group__in=list(variants)).aggregate(
+            total=Count('id'), active=Count('id', filter=Q(is_active=True))
+        )
+        group = DeviceGroup.objects.create(
+            name=name, device_count=counts['total'], active_count=counts['active']
+        )
+        DeviceGroupClosure.objects.create(ancestor=group, descendant=group, depth=0)
+        Device.objects.filter(device_group__in=list(variants)).update(group=group, device_group=name)
+
+
+def clear_device_groups(apps, schema_editor):
+    Device = apps.get_model('devices', 'Device')
+    DeviceGroup = apps.get_model('devices', 'DeviceGroup')
+    Device.objects.update(group=None)
+    DeviceGroup.objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('devices', '0011_device_groups'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_device_groups, clear_device_groups),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 5.2.5 on 2026-10-17 03:20
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('devices', '0012_backfill_device_groups'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='device',
+            name='email_number_normalized',
+            field=models.CharField(blank=True, editable=False, max_length=20, null=True, verbose_name='Cihaz E-mail No (rakam)'),
+        ),
+        migrations.AddField(
+            model_name='device',
+            name='gsm_normalized',
+            field=models.CharField(blank=True, editable=False, max_length=16, null=True, verbose_name='GSM (E.164)'),
+        ),
+        migrations.AddField(
+            model_name='device',
+            name='imei_normalized',
+            field=models.CharField(blank=True, editable=False, max_length=20, null=True, verbose_name='IMEI (rakam)'),
+        ),
+        migrations.AddIndex(
+            model_name='device',
+            index=models.Index(fields=['gsm_normalized'], name='cihaz_gsm_norm_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='device',
+            index=models.Index(fields=['imei_normalized'], name='cihaz_imei_norm_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='device',
+            index=models.Index(fields=['email_number_normalized'], name='cihaz_email_no_norm_idx'),
+        ),
+    ]
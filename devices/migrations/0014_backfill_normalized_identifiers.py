@@ -0,0 +1,65 @@
+import re
+
+from django.db import migrations
+
+# Migration çalıştığı andaki normalize kuralları; devices.identifiers
+# sonradan değişse de bu backfill aynı sonucu üretir.
+BATCH_SIZE = 2000
+DEFAULT_COUNTRY_CODE = '90'
+NON_DIGITS = re.compile(r'\D')
+
+
+def normalize_digits(value):
+    digits = NON_DIGITS.sub('', value or '')
+    return digits or None
+
+
+def normalize_gsm(value):
+    value = (value or '').strip()
+    digits = normalize_digits(value)
+    if not digits:
+        return None
+    if value.startswith('+'):
+        number = digits
+    elif digits.startswith('00'):
+        number = digits[2:]
+    elif digits.startswith('0'):
+        number = DEFAULT_COUNTRY_CODE + digits[1:]
+    elif len(digits) == 10:
+        number = DEFAULT_COUNTRY_CODE + digits
+    else:
+        number = digits
+    if not 10 <= len(number) <= 15:
+        return None
+    return '+' + number
+
+
+def backfill_normalized_identifiers(apps, schema_editor):
+    """Normalize kolonları id sırasıyla batch'ler halinde doldurur"""
+    Device = apps.get_model('devices', 'Device')
+
+    last_id = 0
+    while True:
+        batch = list(
+            Device.objects.filter(id__gt=last_id).order_by('id')
+            .only('id', 'gsm_number', 'imei', 'email_number')[:BATCH_SIZE]
+        )
+        if not batch:
+            break
+        for device in batch:
+            device.gsm_normalized = normalize_gsm(device.gsm_number)
+            device.imei_normalized = normalize_digits(device.imei)
+            device.email_number_normalized = normalize_digits(device.email_number)
+        Device.objects.bulk_update(batch, ['gsm_normalized', 'imei_normalized', 'email_number_normalized'])
+        last_id = batch[-1].id
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('devices', '0013_device_normalized_identifiers'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_normalized_identifiers, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 5.2.5 on 2026-10-17 03:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('devices', '0014_backfill_normalized_identifiers'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DuplicateScan',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('started_at', models.DateTimeField(verbose_name='Başlangıç')),
+                ('finished_at', models.DateTimeField(blank=True, null=True, verbose_name='Bitiş')),
+                ('incremental', models.BooleanField(default=False, verbose_name='Artımlı')),
+                ('scanned_devices', models.PositiveIntegerField(default=0, verbose_name='Taranan Cihaz')),
+                ('cluster_count', models.PositiveIntegerField(default=0, verbose_name='Bulunan Küme')),
+            ],
+            options={
+                'verbose_name': 'Mükerrer Cihaz Taraması',
+                'verbose_name_plural': 'Mükerrer Cihaz Taramaları',
+                'db_table': 'cihaz_mukerrer_taramalari',
+                'ordering': ['-started_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='DuplicateCluster',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key_type', models.CharField(choices=[('imei', 'IMEI'), ('gsm', 'GSM Numarası'), ('name', 'Marka + Model + Ad')], max_length=10, verbose_name='Anahtar Türü')),
+                ('key', models.CharField(max_length=150, verbose_name='Anahtar')),
+                ('device_count', models.PositiveIntegerField(default=0, verbose_name='Cihaz Sayısı')),
+                ('user_count', models.PositiveIntegerField(default=0, verbose_name='Kullanıcı Sayısı')),
+                ('score', models.FloatField(default=0, verbose_name='Skor')),
+                ('is_dismissed', models.BooleanField(default=False, verbose_name='İncelendi')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Bulunma Tarihi')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Güncelleme Tarihi')),
+                ('devices', models.ManyToManyField(db_table='cihaz_mukerrer_kume_uyeleri', related_name='duplicate_clusters', to='devices.device', verbose_name='Cihazlar')),
+            ],
+            options={
+                'verbose_name': 'Mükerrer Cihaz Kümesi',
+                'verbose_name_plural': 'Mükerrer Cihaz Kümeleri',
+                'db_table': 'cihaz_mukerrer_kumeleri',
+                'ordering': ['-score', '-device_count'],
+                'indexes': [models.Index(fields=['-score'], name='cihaz_mukerrer_score_idx')],
+                'constraints': [models.UniqueConstraint(fields=('key_type', 'key'), name='cihaz_mukerrer_key_uniq')],
+            },
+        ),
+    ]
@@ -0,0 +1,67 @@
+# Generated by Django 5.2.5 on 2026-10-17 03:30
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('devices', '0015_duplicate_clusters'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DeviceBrand',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50, verbose_name='Marka')),
+                ('key', models.CharField(editable=False, max_length=50, unique=True)),
+            ],
+            options={
+                'verbose_name': 'Marka',
+                'verbose_name_plural': 'Markalar',
+                'db_table': 'cihaz_markalari',
+                'ordering': ['name'],
+            },
+        ),
+        migrations.AddField(
+            model_name='device',
+            name='catalog_brand',
+            field=models.ForeignKey(blank=True, db_index=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='devices', to='devices.devicebrand', verbose_name='Katalog Markası'),
+        ),
+        migrations.CreateModel(
+            name='DeviceModel',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50, verbose_name='Model')),
+                ('key', models.CharField(editable=False, max_length=50)),
+                ('brand', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='models', to='devices.devicebrand', verbose_name='Marka')),
+            ],
+            options={
+                'verbose_name': 'Model',
+                'verbose_name_plural': 'Modeller',
+                'db_table': 'cihaz_modelleri',
+                'ordering': ['brand__name', 'name'],
+            },
+        ),
+        migrations.AddField(
+            model_name='device',
+            name='catalog_model',
+            field=models.ForeignKey(blank=True, db_index=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='devices', to='devices.devicemodel', verbose_name='Katalog Modeli'),
+        ),
+        migrations.AddIndex(
+            model_name='device',
+            index=models.Index(fields=['catalog_brand', 'is_active'], name='cihaz_marka_aktif_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='device',
+            index=models.Index(fields=['catalog_model', 'is_active'], name='cihaz_model_aktif_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='devicemodel',
+            constraint=models.UniqueConstraint(fields=('brand', 'key'), name='cihaz_model_brand_key_uniq'),
+        ),
+    ]
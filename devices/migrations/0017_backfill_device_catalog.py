@@ -0,0 +1,136 @@
+from collections import Counter, defaultdict
+
+from django.db import migrations
+from django.db.models import Count
+from django.db.utils import DatabaseError
+
+BATCH_SIZE = 2000
+
+# 0009_device_search_index ile aynı arama tablosu
+FTS_TABLE = 'cihazlar_fts'
+FTS_COLUMNS = ('device_name', 'gsm_number', 'device_email', 'brand', 'model')
+
+
+# Migration çalıştığı andaki yazım birleştirme kuralları; devices.catalog
+# sonradan değişse de bu backfill aynı sonucu üretir.
+def normalize_catalog_name(name):
+    return ' '.join((name or '').split())
+
+
+def catalog_key(name):
+    return normalize_catalog_name(name).casefold()
+
+
+def merge_spellings(pairs):
+    """{marka anahtarı: ad}, {(marka anahtarı, model anahtarı): ad}; en sık yazım seçilir"""
+    brand_spellings = defaultdict(Counter)
+    model_spellings = defaultdict(Counter)
+    for brand, model, count in pairs:
+        if not normalize_catalog_name(brand):
+            continue
+        brand_key = catalog_key(brand)
+        brand_spellings[brand_key][normalize_catalog_name(brand)] += count
+        if normalize_catalog_name(model):
+            model_spellings[brand_key, catalog_key(model)][normalize_catalog_name(model)] += count
+    return (
+        {key: spellings.most_common(1)[0][0] for key, spellings in brand_spellings.items()},
+        {key: spellings.most_common(1)[0][0] for key, spellings in model_spellings.items()},
+    )
+
+
+def search_index_available(connection):
+    if connection.vendor != 'sqlite':
+        return False
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(f'SELECT 1 FROM {FTS_TABLE} LIMIT 0')
+    except DatabaseError:
+        return False
+    return True
+
+
+def refresh_search_rows(connection, devices):
+    """Marka/model yazımı değişen cihazların arama satırlarını yeniden yazar"""
+    insert_sql = (
+        f"INSERT INTO {FTS_TABLE} (rowid, {', '.join(FTS_COLUMNS)}) "
+        f"VALUES (%s, {', '.join(['%s'] * len(FTS_COLUMNS))})"
+    )
+    with connection.cursor() as cursor:
+        cursor.executemany(f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [[device.id] for device in devices])
+        cursor.executemany(insert_sql, [
+            [device.id, *(getattr(device, column) or '' for column in FTS_COLUMNS)] for device in devices
+        ])
+
+
+def backfill_device_catalog(apps, schema_editor):
+    """brand/model metinlerinden kataloğu oluşturur ve cihazları batch'ler halinde bağlar.
+
+    Boşluk ve büyük/küçük harf farkıyla yazılmış değerler tek kayıtta
+    birleştirilir; katalog adı olarak en sık kullanılan yazım seçilir.
+    Metni yeniden yazılan cihazların arama indeksi satırları da güncellenir.
+    """
+    Device = apps.get_model('devices', 'Device')
+    DeviceBrand = apps.get_model('devices', 'DeviceBrand')
+    DeviceModel = apps.get_model('devices', 'DeviceModel')
+
+    pairs = Device.objects.order_by().values_list('brand', 'model').annotate(n=Count('id'))
+    brand_names, model_names = merge_spellings(pairs)
+    brands = {
+        brand.key: brand
+        for brand in DeviceBrand.objects.bulk_create(
+            [DeviceBrand(key=key, name=name) for key, name in brand_names.items()]
+        )
+    }
+    models = {
+        (brand_key, model.key): model
+        for (brand_key, _), model in zip(model_names, DeviceModel.objects.bulk_create([
+            DeviceModel(brand=brands[brand_key], key=model_key, name=name)
+            for (brand_key, model_key), name in model_names.items()
+        ]))
+    }
+
+    update_search = search_index_available(schema_editor.connection)
+    last_id = 0
+    while True:
+        batch = list(
+            Device.objects.filter(id__gt=last_id).order_by('id')
+            .only('id', 'brand', 'model', *FTS_COLUMNS)[:BATCH_SIZE]
+        )
+        if not batch:
+            break
+        changed = []
+        rewritten = []
+        for device in batch:
+            if not normalize_catalog_name(device.brand):
+                continue
+            spelling = (device.brand, device.model)
+            brand = brands[catalog_key(device.brand)]
+            device.catalog_brand, device.brand = brand, brand.name
+            model = models.get((brand.key, catalog_key(device.model)))
+            if model is not None:
+                device.catalog_model, device.model = model, model.name
+            changed.append(device)
+            if (device.brand, device.model) != spelling:
+                rewritten.append(device)
+        Device.objects.bulk_update(changed, ['catalog_brand', 'catalog_model', 'brand', 'model'])
+        if update_search and rewritten:
+            refresh_search_rows(schema_editor.connection, rewritten)
+        last_id = batch[-1].id
+
+
+def clear_device_catalog(apps, schema_editor):
+    Device = apps.get_model('devices', 'Device')
+    DeviceBrand = apps.get_model('devices', 'DeviceBrand')
+    Device.objects.update(catalog_brand=None, catalog_model=None)
+    DeviceBrand.objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('devices', '0016_device_catalog'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_device_catalog, clear_device_catalog),
+    ]
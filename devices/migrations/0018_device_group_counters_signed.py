@@ -0,0 +1,23 @@
+# Generated by Django 5.2.5 on 2026-10-17 05:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('devices', '0017_backfill_device_catalog'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='devicegroup',
+            name='active_count',
+            field=models.IntegerField(default=0, verbose_name='Aktif Cihaz Sayısı'),
+        ),
+        migrations.AlterField(
+            model_name='devicegroup',
+            name='device_count',
+            field=models.IntegerField(default=0, verbose_name='Cihaz Sayısı'),
+        ),
+    ]
@@ -1,8 +1,19 @@
-from django.db import models
+from django.db import models, transaction
 from django.conf import settings
 from django.core.validators import RegexValidator
+from django.db.models import F, Q, Value
+from django.db.models.functions import Coalesce
 from django.utils.translation import gettext_lazy as _
 
+from .identifiers import NORMALIZED_FIELDS, normalized_values
+
+# save(update_fields=...) ile kaynak alanı yazılınca birlikte yazılan kolonlar
+DERIVED_FIELDS = {
+    **{normalized: (source,) for normalized, source in NORMALIZED_FIELDS.items()},
+    'catalog_brand': ('brand',),
+    'catalog_model': ('brand', 'model'),
+}
+
 class Device(models.Model):
     DEVICE_TYPE_CHOICES = [
         ('phone', 'Telefon'),
@@ -85,6 +96,29 @@ class Device(models.Model):
         verbose_name='Model'
     )
     
+    # Katalog kayıtları (brand/model metinleri görüntüleme ve uyumluluk için korunur);
+    # formların clean() adımında (catalog.clean_catalog) veya importer'da atanır
+    # Tek kolon indeksleri yerine aşağıdaki (katalog, is_active) indeksleri kullanılır
+    catalog_brand = models.ForeignKey(
+        'DeviceBrand',
+        on_delete=models.SET_NULL,
+        blank=True,
+        null=True,
+        db_index=False,
+        related_name='devices',
+        verbose_name='Katalog Markası'
+    )
+    
+    catalog_model = models.ForeignKey(
+        'DeviceModel',
+        on_delete=models.SET_NULL,
+        blank=True,
+        null=True,
+        db_index=False,
+        related_name='devices',
+        verbose_name='Katalog Modeli'
+    )
+    
     # IMEI Numarası (opsiyonel)
     imei = models.CharField(
         max_length=15,
@@ -129,12 +163,110 @@ class Device(models.Model):
         help_text='Cihazın ait olduğu grup veya birim'
     )
     
+    # Cihaz Grubu (hiyerarşik; device_group metni uyumluluk için korunur)
+    group = models.ForeignKey(
+        'DeviceGroup',
+        on_delete=models.SET_NULL,
+        blank=True,
+        null=True,
+        related_name='devices',
+        verbose_name='Cihaz Grubu'
+    )
+    
+    # Arama için normalize tanımlayıcılar (save() doldurur; bkz. devices.identifiers)
+    gsm_normalized = models.CharField(
+        max_length=16,
+        blank=True,
+        null=True,
+        editable=False,
+        verbose_name='GSM (E.164)'
+    )
+    
+    imei_normalized = models.CharField(
+        max_length=20,
+        blank=True,
+        null=True,
+        editable=False,
+        verbose_name='IMEI (rakam)'
+    )
+    
+    email_number_normalized = models.CharField(
+        max_length=20,
+        blank=True,
+        null=True,
+        editable=False,
+        verbose_name='Cihaz E-mail No (rakam)'
+    )
+    
     class Meta:
         verbose_name = 'Cihaz'
         verbose_name_plural = 'Cihazlar'
         ordering = ['-created_at']
         db_table = 'cihazlar'
         unique_together = ['user', 'gsm_number']  # Bir kullanıcının aynı GSM numarasına sahip birden fazla cihazı olamaz
+        indexes = [
+            # Cursor sayfalaması için (sıralama alanı, id) indeksleri
+            models.Index(fields=['created_at', 'id'], name='cihaz_created_id_idx'),
+            models.Index(fields=['device_type', 'id'], name='cihaz_type_id_idx'),
+            models.Index(Coalesce('device_name', Value('')), F('id'), name='cihaz_name_id_idx'),
+            # Export önbelleğinin veri sürümü (MAX(updated_at)) için
+            models.Index(fields=['updated_at'], name='cihaz_updated_idx'),
+            # Tanımlayıcıdan cihaz bulma (yardım masası sorguları) için tam eşleşme indeksleri
+            models.Index(fields=['gsm_normalized'], name='cihaz_gsm_norm_idx'),
+            models.Index(fields=['imei_normalized'], name='cihaz_imei_norm_idx'),
+            models.Index(fields=['email_number_normalized'], name='cihaz_email_no_norm_idx'),
+            # Marka/model faset sayımları ("kaç aktif Galaxy S23 var") indeksten okunur
+            models.Index(fields=['catalog_brand', 'is_active'], name='cihaz_marka_aktif_idx'),
+            models.Index(fields=['catalog_model', 'is_active'], name='cihaz_model_aktif_idx'),
+        ]
+    
+    # Sayaçlar ve özet tablolar için önceki değerleri izlenen alanlar
+    TRACKED_FIELDS = ('user_id', 'group_id', 'is_active', 'device_type', 'brand', 'model')
+    
+    def _remember_loaded_values(self, attnames=TRACKED_FIELDS):
+        loaded = self.__dict__.setdefault('_loaded_values', {})
+        for attname in attnames:
+            if attname in self.__dict__:
+                loaded[attname] = self.__dict__[attname]
+    
+    @property
+    def loaded_values(self):
+        """Veritabanından yüklendiği (veya son kaydedildiği) andaki izlenen değerler"""
+        return self.__dict__.get('_loaded_values', {})
+    
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._remember_loaded_values()
+        return instance
+    
+    def refresh_from_db(self, using=None, fields=None, from_queryset=None):
+        super().refresh_from_db(using=using, fields=fields, from_queryset=from_queryset)
+        if fields is None:
+            self._remember_loaded_values()
+        else:
+            self._remember_loaded_values([self._meta.get_field(name).attname for name in fields])
+    
+    def save(self, *args, **kwargs):
+        # Uyumluluk için metin alanı grup adıyla eşit tutulur
+        group_changed = self.group_id != self.loaded_values.get('group_id')
+        if self.group_id and (group_changed or not self.device_group):
+            self.device_group = self.group.name
+        self.set_normalized_identifiers()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            # Kaynak alanı yazılan türetilmiş kolonlar da yazılır
+            kwargs['update_fields'] = set(update_fields) | {
+                derived for derived, sources in DERIVED_FIELDS.items() if set(sources) & set(update_fields)
+            }
+        super().save(*args, **kwargs)
+        # Tüm post_save alıcıları önceki değerleri gördükten sonra güncellenir
+        self._remember_loaded_values()
+    
+    def set_normalized_identifiers(self):
+        """Normalize GSM/IMEI/e-mail no kolonlarını kaynak alanlardan doldurur"""
+        for field, value in normalized_values(self).items():
+            setattr(self, field, value)
     
     def __str__(self):
         device_name = self.device_name or f"{self.get_device_type_display()}"
@@ -171,3 +303,293 @@ class Device(models.Model):
     def get_user_tc(self):
         """Cihaz sahibinin TC kimlik numarasını döndürür"""
         return self.user.tc_kimlik
+
+
+class DeviceBrand(models.Model):
+    """Marka kataloğu; aynı markanın farklı yazımları `key` üzerinden tek kayıtta birleşir"""
+    
+    name = models.CharField(
+        max_length=50,
+        verbose_name='Marka'
+    )
+    
+    # Boşlukları sadeleştirilmiş, casefold edilmiş ad (bkz. devices.catalog.catalog_key)
+    key = models.CharField(
+        max_length=50,
+        unique=True,
+        editable=False
+    )
+    
+    class Meta:
+        verbose_name = 'Marka'
+        verbose_name_plural = 'Markalar'
+        ordering = ['name']
+        db_table = 'cihaz_markalari'
+    
+    def __str__(self):
+        return self.name
+
+
+class DeviceModel(models.Model):
+    """Model kataloğu; model adı markası içinde benzersizdir"""
+    
+    brand = models.ForeignKey(
+        DeviceBrand,
+        on_delete=models.CASCADE,
+        related_name='models',
+        verbose_name='Marka'
+    )
+    
+    name = models.CharField(
+        max_length=50,
+        verbose_name='Model'
+    )
+    
+    key = models.CharField(
+        max_length=50,
+        editable=False
+    )
+    
+    class Meta:
+        verbose_name = 'Model'
+        verbose_name_plural = 'Modeller'
+        ordering = ['brand__name', 'name']
+        db_table = 'cihaz_modelleri'
+        constraints = [
+            models.UniqueConstraint(fields=['brand', 'key'], name='cihaz_model_brand_key_uniq'),
+        ]
+    
+    def __str__(self):
+        return f"{self.brand.name} {self.name}"
+
+
+class DeviceGroup(models.Model):
+    """Hiyerarşik cihaz grubu (birim / alt birim).
+
+    Hiyerarşi DeviceGroupClosure tablosunda tutulur; alt ağaç sorguları tek
+    join'dir. device_count ve active_count alt gruplar dahil sayaçlardır ve
+    devices.groups modülü tarafından F() ile güncellenir.
+    """
+    
+    name = models.CharField(
+        max_length=100,
+        verbose_name='Grup Adı'
+    )
+    
+    parent = models.ForeignKey(
+        'self',
+        on_delete=models.CASCADE,
+        blank=True,
+        null=True,
+        related_name='children',
+        verbose_name='Üst Grup'
+    )
+    
+    # Alt gruplar dahil cihaz sayıları (denormalize). F() ile azaltılırken
+    # geçici olarak eksiye düşebilir (CHECK kısıtı olmaması için IntegerField);
+    # sapmalar rebuild_device_groups ile düzeltilir.
+    device_count = models.IntegerField(
+        default=0,
+        verbose_name='Cihaz Sayısı'
+    )
+    
+    active_count = models.IntegerField(
+        default=0,
+        verbose_name='Aktif Cihaz Sayısı'
+    )
+    
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name='Oluşturulma Tarihi'
+    )
+    
+    class Meta:
+        verbose_name = 'Cihaz Grubu'
+        verbose_name_plural = 'Cihaz Grupları'
+        ordering = ['name']
+        db_table = 'cihaz_gruplari'
+        constraints = [
+            models.UniqueConstraint(fields=['parent', 'name'], name='cihaz_grup_parent_name_uniq'),
+            # parent NULL olduğunda yukarıdaki kısıt işlemez
+            models.UniqueConstraint(fields=['name'], condition=Q(parent=None), name='cihaz_grup_root_name_uniq'),
+        ]
+    
+    def __str__(self):
+        return self.name
+    
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        if 'parent_id' in instance.__dict__:
+            instance._loaded_parent_id = instance.parent_id
+        return instance
+    
+    def save(self, *args, **kwargs):
+        from .groups import add_to_hierarchy, move_in_hierarchy
+        
+        is_new = self._state.adding
+        parent_changed = not is_new and self.parent_id != getattr(self, '_loaded_parent_id', self.parent_id)
+        if not is_new and kwargs.get('update_fields') is None:
+            # Sayaçlar yalnızca F() ile güncellenir; bellekteki eski değer yazılmaz
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in ('device_count', 'active_count')
+            ]
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if is_new:
+                add_to_hierarchy(self)
+            elif parent_changed:
+                move_in_hierarchy(self)
+        self._loaded_parent_id = self.parent_id
+    
+    @property
+    def inactive_count(self):
+        return self.device_count - self.active_count
+
+
+class DeviceGroupClosure(models.Model):
+    """Grup hiyerarşisinin closure tablosu: her (ata, torun) çifti için bir satır"""
+    
+    ancestor = models.ForeignKey(
+        DeviceGroup,
+        on_delete=models.CASCADE,
+        related_name='descendant_links'
+    )
+    
+    descendant = models.ForeignKey(
+        DeviceGroup,
+        on_delete=models.CASCADE,
+        related_name='ancestor_links'
+    )
+    
+    # 0: grubun kendisi, 1: doğrudan alt grup, ...
+    depth = models.PositiveIntegerField()
+    
+    class Meta:
+        db_table = 'cihaz_grup_hiyerarsi'
+        constraints = [
+            models.UniqueConstraint(fields=['ancestor', 'descendant'], name='cihaz_grup_closure_uniq'),
+        ]
+        indexes = [
+            models.Index(fields=['descendant', 'ancestor'], name='cihaz_grup_desc_idx'),
+        ]
+
+
+class DuplicateCluster(models.Model):
+    """Aynı fiziksel cihaz olabilecek kayıtlar kümesi (devices.duplicates üretir).
+
+    Küme bir engelleme anahtarı (normalize IMEI, normalize GSM veya
+    marka+model+ad öneki) etrafında oluşur; score diğer anahtarlardaki
+    ortaklıklara ve farklı kullanıcı sayısına göre hesaplanır.
+    """
+    
+    KEY_TYPE_CHOICES = [
+        ('imei', 'IMEI'),
+        ('gsm', 'GSM Numarası'),
+        ('name', 'Marka + Model + Ad'),
+    ]
+    
+    key_type = models.CharField(
+        max_length=10,
+        choices=KEY_TYPE_CHOICES,
+        verbose_name='Anahtar Türü'
+    )
+    
+    key = models.CharField(
+        max_length=150,
+        verbose_name='Anahtar'
+    )
+    
+    devices = models.ManyToManyField(
+        Device,
+        related_name='duplicate_clusters',
+        db_table='cihaz_mukerrer_kume_uyeleri',
+        verbose_name='Cihazlar'
+    )
+    
+    device_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Cihaz Sayısı'
+    )
+    
+    user_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Kullanıcı Sayısı'
+    )
+    
+    # 0-1 arası; yüksek değer aynı cihaz olma ihtimalinin yüksek olduğunu gösterir
+    score = models.FloatField(
+        default=0,
+        verbose_name='Skor'
+    )
+    
+    # İncelenip sorun olmadığı işaretlenen kümeler; üyeler değişirse sıfırlanır
+    is_dismissed = models.BooleanField(
+        default=False,
+        verbose_name='İncelendi'
+    )
+    
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name='Bulunma Tarihi'
+    )
+    
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        verbose_name='Güncelleme Tarihi'
+    )
+    
+    class Meta:
+        verbose_name = 'Mükerrer Cihaz Kümesi'
+        verbose_name_plural = 'Mükerrer Cihaz Kümeleri'
+        ordering = ['-score', '-device_count']
+        db_table = 'cihaz_mukerrer_kumeleri'
+        constraints = [
+            models.UniqueConstraint(fields=['key_type', 'key'], name='cihaz_mukerrer_key_uniq'),
+        ]
+        indexes = [
+            models.Index(fields=['-score'], name='cihaz_mukerrer_score_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.get_key_type_display()}: {self.key} ({self.device_count} cihaz)"
+
+
+class DuplicateScan(models.Model):
+    """Mükerrer cihaz taramalarının geçmişi; artımlı tarama son taramadan beri değişen satırlara bakar"""
+    
+    started_at = models.DateTimeField(
+        verbose_name='Başlangıç'
+    )
+    
+    finished_at = models.DateTimeField(
+        blank=True,
+        null=True,
+        verbose_name='Bitiş'
+    )
+    
+    incremental = models.BooleanField(
+        default=False,
+        verbose_name='Artımlı'
+    )
+    
+    # Artımlı taramada değişen, tam taramada taranan cihaz sayısı
+    scanned_devices = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Taranan Cihaz'
+    )
+    
+    cluster_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Bulunan Küme'
+    )
+    
+    class Meta:
+        verbose_name = 'Mükerrer Cihaz Taraması'
+        verbose_name_plural = 'Mükerrer Cihaz Taramaları'
+        ordering = ['-started_at']
+        db_table = 'cihaz_mukerrer_taramalari'
+    
+    def __str__(self):
+        return f"{self.started_at:%d.%m.%Y %H:%M} ({'artımlı' if self.incremental else 'tam'})"
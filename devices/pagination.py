@@ -0,0 +1,128 @@
+from django.core import signing
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import F, Q, Value
+from django.db.models.functions import Coalesce
+
+CURSOR_SALT = 'devices.pagination.cursor'
+
+
+class CursorPage:
+    """Cursor sayfalamasının tek bir sayfası"""
+
+    def __init__(self, object_list, next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class CursorPaginator:
+    """Keyset (cursor) sayfalama.
+
+    OFFSET ve COUNT(*) kullanmaz; her sayfa (sıralama alanı, id) üzerinden
+    bir önceki sayfanın son kaydından devam eder. Bu yüzden sayfa maliyeti
+    derinlikten bağımsızdır. Cursor token'ları imzalıdır ve sıralamaya bağlıdır.
+    """
+
+    def __init__(self, queryset, ordering, per_page=20, tiebreaker='id'):
+        self.descending = ordering.startswith('-')
+        self.ordering = ordering
+        self.field_name = ordering.lstrip('-')
+        self.tiebreaker = tiebreaker
+        self.per_page = per_page
+        try:
+            self.field = queryset.model._meta.get_field(self.field_name)
+        except FieldDoesNotExist:
+            # Annotation üzerinden sıralama (örn. arama skoru)
+            self.field = None
+
+        if self.field is None:
+            self.sort_key = self.field_name
+        elif self.field.null:
+            # NULL değerler < / > karşılaştırmasına girmez, boş string'e indir
+            self.sort_key = 'cursor_key'
+            queryset = queryset.annotate(cursor_key=Coalesce(F(self.field_name), Value('')))
+        else:
+            self.sort_key = self.field.attname
+        self.queryset = queryset
+
+    def _order_by(self, reverse):
+        prefix = '-' if self.descending != reverse else ''
+        return [prefix + self.sort_key, prefix + self.tiebreaker]
+
+    def _seek(self, queryset, value, pk, reverse):
+        lookup = 'lt' if self.descending != reverse else 'gt'
+        return queryset.filter(
+            Q(**{f'{self.sort_key}__{lookup}': value}) |
+            Q(**{self.sort_key: value, f'{self.tiebreaker}__{lookup}': pk})
+        )
+
+    def encode_cursor(self, obj, direction):
+        """Kaydın konumunu opak bir token'a çevirir"""
+        value = getattr(obj, self.sort_key)
+        if hasattr(value, 'isoformat'):
+            value = value.isoformat()
+        return signing.dumps({
+            'o': self.ordering,
+            'v': value,
+            'pk': getattr(obj, self.tiebreaker),
+            'd': direction,
+        }, salt=CURSOR_SALT, compress=True)
+
+    def decode_cursor(self, cursor):
+        """Token'ı çözer; geçersiz veya başka bir sıralamaya aitse None döner"""
+        if not cursor:
+            return None
+        try:
+            position = signing.loads(cursor, salt=CURSOR_SALT)
+        except signing.BadSignature:
+            return None
+        if not isinstance(position, dict) or position.get('o') != self.ordering:
+            return None
+        if position.get('d') not in ('n', 'p'):
+            return None
+        value = position.get('v')
+        if self.field is not None and self.sort_key != 'cursor_key':
+            value = self.field.to_python(value)
+        position['v'] = value
+        return position
+
+    def get_page(self, cursor=None):
+        """Cursor'dan itibaren bir sayfa getirir (tek sorgu, per_page + 1 satır)"""
+        position = self.decode_cursor(cursor)
+        reverse = position is not None and position['d'] == 'p'
+
+        queryset = self.queryset.order_by(*self._order_by(reverse))
+        if position is not None:
+            queryset = self._seek(queryset, position['v'], position['pk'], reverse)
+
+        rows = list(queryset[:self.per_page + 1])
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+
+        if reverse:
+            rows.reverse()
+            has_next, has_previous = True, has_more
+        else:
+            has_next, has_previous = has_more, position is not None
+
+        next_cursor = self.encode_cursor(rows[-1], 'n') if rows and has_next else None
+        previous_cursor = self.encode_cursor(rows[0], 'p') if rows and has_previous else None
+        return CursorPage(rows, next_cursor=next_cursor, previous_cursor=previous_cursor)
@@ -0,0 +1,157 @@
+from django.db import connection, transaction
+from django.db.models import F, FloatField, Func, Q, Value
+from django.db.models.expressions import RawSQL
+from django.db.utils import DatabaseError
+
+FTS_TABLE = 'cihazlar_fts'
+FTS_COLUMNS = ('device_name', 'gsm_number', 'device_email', 'brand', 'model')
+
+# trigram tokenizer en az 3 karakterlik sorgularla eşleşir
+MIN_QUERY_LENGTH = 3
+
+
+def is_available():
+    """FTS5 arama indeksi bu veritabanında kullanılabilir mi?
+
+    Sonuç açık bağlantı başına saklanır; bağlantı yenilendiğinde (ör. test
+    veritabanına geçişte) yeniden kontrol edilir.
+    """
+    if connection.vendor != 'sqlite':
+        return False
+    connection.ensure_connection()
+    checked = getattr(connection, '_device_fts_available', None)
+    if checked is not None and checked[0] is connection.connection:
+        return checked[1]
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(f'SELECT 1 FROM {FTS_TABLE} LIMIT 0')
+        available = True
+    except DatabaseError:
+        available = False
+    connection._device_fts_available = (connection.connection, available)
+    return available
+
+
+def _match_expression(query):
+    """Kullanıcı girdisini tek bir FTS5 ifadesine (alt dizi eşleşmesi) çevirir"""
+    return '"%s"' % query.replace('"', '""')
+
+
+class SearchRank(Func):
+    """Cihazın FTS5 bm25 skoru (küçük değer daha alakalı).
+
+    MATCH sorgusu satır başına değil sorgu başına bir kez çalışır: eşleşmeler
+    ve skorları alt sorguda bir kez üretilir (LIMIT -1 alt sorgunun dış
+    sorguya açılmasını engeller), her cihaz için otomatik indeksle okunur.
+    """
+    output_field = FloatField()
+
+    def __init__(self, query, pk='id'):
+        super().__init__(F(pk), Value(_match_expression(query)))
+
+    def as_sql(self, compiler, connection, **extra_context):
+        pk_sql, pk_params = compiler.compile(self.source_expressions[0])
+        match_sql, match_params = compiler.compile(self.source_expressions[1])
+        sql = (
+            f'(SELECT match_rank FROM (SELECT rowid AS match_id, bm25({FTS_TABLE}) AS match_rank '
+            f'FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH {match_sql} LIMIT -1) WHERE match_id = {pk_sql})'
+        )
+        return sql, (*match_params, *pk_params)
+
+
+def search_devices(queryset, query):
+    """Queryset'i arama sorgusuna göre filtreler ve `search_rank` ekler.
+
+    SQLite'ta FTS5 (trigram) indeksi kullanılır; indeks yoksa, başka bir
+    veritabanındaysak veya sorgu çok kısaysa icontains aramasına düşülür.
+    """
+    query = query.strip()
+    if len(query) >= MIN_QUERY_LENGTH and is_available():
+        matches = RawSQL(
+            f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s',
+            [_match_expression(query)]
+        )
+        return queryset.filter(id__in=matches).annotate(search_rank=SearchRank(query))
+
+    return queryset.filter(
+        Q(device_name__icontains=query) |
+        Q(gsm_number__icontains=query) |
+        Q(device_email__icontains=query) |
+        Q(brand__icontains=query) |
+        Q(model__icontains=query)
+    ).annotate(search_rank=Value(0.0, output_field=FloatField()))
+
+
+def _row_values(device):
+    return [getattr(device, column) or '' for column in FTS_COLUMNS]
+
+
+def index_device(device):
+    """Cihazın indeks satırını günceller"""
+    if not is_available():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [device.pk])
+        cursor.execute(
+            f'INSERT INTO {FTS_TABLE} (rowid, {", ".join(FTS_COLUMNS)}) '
+            f'VALUES (%s, {", ".join(["%s"] * len(FTS_COLUMNS))})',
+            [device.pk, *_row_values(device)]
+        )
+
+
+def index_devices(devices):
+    """Toplu eklenen cihazları indekse yazar (bulk_create sinyal göndermez)"""
+    if not is_available():
+        return
+    with connection.cursor() as cursor:
+        cursor.executemany(
+            f'INSERT INTO {FTS_TABLE} (rowid, {", ".join(FTS_COLUMNS)}) '
+            f'VALUES (%s, {", ".join(["%s"] * len(FTS_COLUMNS))})',
+            [[device.pk, *_row_values(device)] for device in devices]
+        )
+
+
+def remove_device(device_id):
+    """Cihazın indeks satırını siler"""
+    if not is_available():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [device_id])
+
+
+def remove_devices(queryset):
+    """Queryset'teki cihazların indeks satırlarını tek sorguda siler"""
+    if not is_available():
+        return
+    ids_sql, ids_params = queryset.values('id').query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {FTS_TABLE} WHERE rowid IN ({ids_sql})', ids_params)
+
+
+def rebuild_index(batch_size=5000):
+    """İndeksi Device tablosundan baştan oluşturur; indekslenen satır sayısını döndürür"""
+    from .models import Device
+
+    if not is_available():
+        return 0
+
+    insert_sql = (
+        f'INSERT INTO {FTS_TABLE} (rowid, {", ".join(FTS_COLUMNS)}) '
+        f'VALUES (%s, {", ".join(["%s"] * len(FTS_COLUMNS))})'
+    )
+    rows = Device.objects.order_by().values_list('id', *FTS_COLUMNS)
+    total = 0
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {FTS_TABLE}')
+        batch = []
+        for row in rows.iterator(chunk_size=batch_size):
+            batch.append([row[0], *(value or '' for value in row[1:])])
+            if len(batch) >= batch_size:
+                cursor.executemany(insert_sql, batch)
+                total += len(batch)
+                batch = []
+        if batch:
+            cursor.executemany(insert_sql, batch)
+            total += len(batch)
+        cursor.execute(f"INSERT INTO {FTS_TABLE} ({FTS_TABLE}) VALUES ('optimize')")
+    return total
@@ -0,0 +1,57 @@
+from rest_framework import serializers
+
+from .models import Device
+
+
+class SparseFieldsetSerializer(serializers.ModelSerializer):
+    """`fields` context'i ile yalnızca istenen alanları döndüren serializer"""
+
+    # Serializer alanı -> veritabanında okunması gereken kolonlar
+    # (listede olmayan alanlar aynı isimli model alanını kullanır)
+    field_columns = {}
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        requested = self.context.get('fields')
+        if requested:
+            for name in set(self.fields) - set(requested):
+                self.fields.pop(name)
+
+    @classmethod
+    def parse_fields(cls, value):
+        """`?fields=a,b` değerini doğrular; geçerli alan listesini döndürür"""
+        if not value:
+            return None
+        requested = [name.strip() for name in value.split(',') if name.strip()]
+        available = cls().fields
+        unknown = [name for name in requested if name not in available]
+        if unknown:
+            raise serializers.ValidationError({'fields': f'Bilinmeyen alan(lar): {", ".join(unknown)}'})
+        return requested
+
+    @classmethod
+    def columns_for(cls, fields):
+        """İstenen alanlar için `.only()` kolonlarını döndürür"""
+        columns = set()
+        for name in fields:
+            columns.update(cls.field_columns.get(name, (name,)))
+        return columns
+
+
+class DeviceSerializer(SparseFieldsetSerializer):
+    """Cihaz okuma API'si serializer'ı"""
+
+    device_type_display = serializers.CharField(source='get_device_type_display', read_only=True)
+
+    field_columns = {
+        'device_type_display': ('device_type',),
+    }
+
+    class Meta:
+        model = Device
+        fields = [
+            'id', 'user', 'device_name', 'gsm_number', 'device_email', 'email_number',
+            'device_type', 'device_type_display', 'brand', 'model', 'catalog_brand', 'catalog_model', 'imei',
+            'device_group', 'group', 'is_active', 'notes', 'created_at', 'updated_at',
+        ]
+        read_only_fields = fields
@@ -0,0 +1,137 @@
+from django.conf import settings
+from django.db.models import QuerySet
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from django.dispatch import Signal, receiver
+from django.utils import timezone
+
+from . import bitmaps, conditional, counters, groups, search
+from .models import Device, DeviceBrand, DeviceGroup, DeviceModel
+
+# Toplu işlemler (bulk_create, update, Device queryset'inin delete()'i) satır
+# başına özet güncellemez; bu sinyaller diğer uygulamaların kendi özetlerini
+# güncelleyebilmesi içindir.
+# devices_bulk_created: devices=[oluşturulan cihazlar]
+# devices_bulk_updating: queryset=güncellenecek cihazlar, status=True/False/'toggle'
+#     (durum değişmiyorsa None; UPDATE öncesi gönderilir)
+# devices_bulk_deleting: queryset=silinecek cihazlar (silme öncesi gönderilir)
+# device_toggled: device=durumu çevrilen cihaz (UPDATE ... RETURNING sonrası; is_active yeni durum)
+devices_bulk_created = Signal()
+device_toggled = Signal()
+devices_bulk_updating = Signal()
+devices_bulk_deleting = Signal()
+
+
+def is_bulk_delete(origin):
+    """post_delete `origin`'i bir Device queryset'i mi? (özetleri devices_bulk_deleting alıcıları günceller)"""
+    return isinstance(origin, QuerySet) and origin.model is Device
+
+
+@receiver(pre_save, sender=Device)
+def device_pre_save(sender, instance, **kwargs):
+    """Sayaçlar için önceki değerler bilinmiyorsa (ertelenmiş alan vb.) veritabanından oku"""
+    if instance._state.adding or set(Device.TRACKED_FIELDS) <= set(instance.loaded_values):
+        return
+    previous = Device.objects.filter(pk=instance.pk).values(*Device.TRACKED_FIELDS).first()
+    if previous:
+        instance.__dict__.setdefault('_loaded_values', {}).update(previous)
+
+
+def _move_counters(adjust, old_id, new_id, old_active, new_active):
+    """Sahip/grup değişiminde eskiden düş, yeniye ekle; değişmediyse aktif farkını uygula"""
+    if old_id != new_id:
+        adjust(old_id, devices=-1, active=-int(old_active))
+        adjust(new_id, devices=1, active=int(new_active))
+    elif old_active != new_active:
+        adjust(new_id, active=int(new_active) - int(old_active))
+
+
+@receiver(post_save, sender=Device)
+def device_saved(sender, instance, created, **kwargs):
+    """Cihaz kaydedildiğinde arama ve bitmap indekslerini, grup ve kullanıcı sayaçlarını güncelle"""
+    search.index_device(instance)
+    bitmaps.device_saved(instance, created)
+
+    if created:
+        groups.adjust_counters(instance.group_id, devices=1, active=int(instance.is_active))
+        counters.adjust_user_counters(
+            instance.user_id, devices=1, active=int(instance.is_active), added_at=instance.created_at
+        )
+    elif 'is_active' in instance.loaded_values:
+        previous = instance.loaded_values
+        _move_counters(
+            groups.adjust_counters, previous.get('group_id'), instance.group_id,
+            previous['is_active'], instance.is_active
+        )
+        _move_counters(
+            counters.adjust_user_counters, previous.get('user_id'), instance.user_id,
+            previous['is_active'], instance.is_active
+        )
+
+
+@receiver(post_delete, sender=Device)
+def device_deleted(sender, instance, origin=None, **kwargs):
+    """Cihaz silindiğinde arama ve bitmap indekslerinden çıkar ve sayaçları düş"""
+    if is_bulk_delete(origin):
+        return
+    search.remove_device(instance.pk)
+    bitmaps.device_deleted(instance)
+    groups.adjust_counters(instance.group_id, devices=-1, active=-int(instance.is_active))
+    counters.adjust_user_counters(
+        instance.user_id, devices=-1, active=-int(instance.is_active), removed_at=instance.created_at
+    )
+
+
+@receiver(devices_bulk_created)
+def devices_imported(sender, devices, **kwargs):
+    """Toplu eklenen cihazları bitmap indeksine ekle"""
+    bitmaps.devices_added(devices)
+
+
+@receiver(devices_bulk_updating)
+def devices_bulk_updating_bitmaps(sender, queryset, status=None, **kwargs):
+    bitmaps.devices_updating(queryset, status)
+
+
+@receiver(devices_bulk_deleting)
+def devices_bulk_deleting_bitmaps(sender, queryset, **kwargs):
+    bitmaps.devices_deleting(queryset)
+
+
+@receiver(device_toggled)
+def device_toggled_bitmaps(sender, device, **kwargs):
+    bitmaps.device_toggled(device)
+
+
+@receiver(pre_delete, sender=DeviceGroup)
+def device_group_deleting(sender, instance, **kwargs):
+    """Silinen grubun doğrudan cihazlarını üst grupların sayaçlarından düş.
+
+    Alt gruplar da ayrı ayrı bu sinyali aldığından her cihaz bir kez düşülür.
+    SET_NULL UPDATE'i post_save göndermediğinden grup adı metni burada
+    temizlenir ve değişiklik bitmap/dashboard özetlerine duyurulur.
+    """
+    devices = Device.objects.filter(group=instance)
+    for group_id, total, active in groups.group_totals(devices):
+        groups.adjust_counters(group_id, devices=-total, active=-active)
+    devices_bulk_updating.send(sender=Device, queryset=devices, status=None)
+    devices.update(device_group=None, updated_at=timezone.now())
+
+
+# İlişkili kayıtların cihaz sayfalarında ve export'larda gösterilen alanları
+RELATED_DISPLAY_FIELDS = {'name', 'username', 'first_name', 'last_name'}
+
+
+@receiver(post_save, sender=DeviceGroup)
+@receiver(post_delete, sender=DeviceGroup)
+@receiver(post_save, sender=DeviceBrand)
+@receiver(post_delete, sender=DeviceBrand)
+@receiver(post_save, sender=DeviceModel)
+@receiver(post_delete, sender=DeviceModel)
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+@receiver(post_delete, sender=settings.AUTH_USER_MODEL)
+def related_changed(sender, update_fields=None, **kwargs):
+    """Cihaz sayfalarında/export'larında adı gösterilen kayıt değişti; ETag'leri ve export önbelleğini geçersiz say"""
+    # Yalnızca görünmeyen alanlar yazıldıysa (ör. girişte last_login) sürüm değişmez
+    if update_fields is not None and not set(update_fields) & RELATED_DISPLAY_FIELDS:
+        return
+    conditional.bump_related_version()
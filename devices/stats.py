@@ -0,0 +1,90 @@
+from django.db.models import Count, Q
+
+from .models import Device
+
+
+def get_device_stats(queryset=None):
+    """Cihaz istatistiklerini tek sorguda hesaplar.
+
+    Verilen (yetkiye göre kapsamlanmış) queryset cihaz türüne göre gruplanır ve
+    her grup için toplam ve aktif sayısı koşullu aggregate ile alınır. Genel
+    toplam/aktif/pasif sayıları bu satırlardan Python tarafında türetilir.
+    """
+    if queryset is None:
+        queryset = Device.objects.all()
+
+    rows = queryset.order_by().values('device_type').annotate(
+        count=Count('id'),
+        active=Count('id', filter=Q(is_active=True)),
+    )
+    return build_device_stats({row['device_type']: row for row in rows})
+
+
+def build_device_stats(counts):
+    """{tür: {'count', 'active'}} sayımlarından get_device_stats sonucunu üretir"""
+    counts = dict(counts)
+
+    # Tür dağılımı DEVICE_TYPE_CHOICES sırasıyla, sadece kaydı olan türler
+    type_stats = []
+    for device_type, display_name in Device.DEVICE_TYPE_CHOICES:
+        row = counts.pop(device_type, None)
+        if row:
+            type_stats.append({
+                'device_type': device_type,
+                'display_name': display_name,
+                'count': row['count'],
+                'active': row['active'],
+            })
+    # Seçeneklerde olmayan eski değerler
+    for device_type, row in counts.items():
+        type_stats.append({
+            'device_type': device_type,
+            'display_name': device_type,
+            'count': row['count'],
+            'active': row['active'],
+        })
+
+    total = sum(item['count'] for item in type_stats)
+    active = sum(item['active'] for item in type_stats)
+
+    return {
+        'total': total,
+        'active': active,
+        'inactive': total - active,
+        'type_stats': type_stats,
+    }
+
+
+def type_counts_by_display(stats):
+    """Tür dağılımını {görünen ad: sayı} sözlüğü olarak döndürür"""
+    return {item['display_name']: item['count'] for item in stats['type_stats']}
+
+
+def type_stats_by_count(stats):
+    """Tür dağılımını sayıya göre azalan sırada döndürür"""
+    return sorted(
+        ({'device_type': item['device_type'], 'count': item['count']} for item in stats['type_stats']),
+        key=lambda item: -item['count']
+    )
+
+
+
+# Günlük kayıt serisinin kaynağı; devices dashboard'a bağımlı olmasın diye
+# dashboard uygulaması açılışta günlük özet tablosu okumasını kaydeder.
+_registration_source = None
+
+
+def register_registration_source(source):
+    """source(start, end) -> [{date, count}] (indeksli özet tablosu aralık okuması)"""
+    global _registration_source
+    _registration_source = source
+
+
+def daily_registrations(start, end):
+    """start..end (dahil) arası günlük yeni cihaz sayıları [{date, count}].
+
+    Cihaz tablosu taranmaz; kaynak kayıtlı değilse (dashboard kurulu değil) None döner.
+    """
+    if _registration_source is None:
+        return None
+    return _registration_source(start, end)
@@ -0,0 +1,196 @@
+"""IMEI TAC (ilk 8 hane) -> marka/model çözümleyici.
+
+Tablo sabit genişlikli, TAC'a göre sıralı bir ikili dosyadır ve mmap ile
+açılıp ikili arama ile okunur: sorgu birkaç sayfa okuması kadar sürer,
+dosya işletim sisteminin sayfa önbelleğinde süreçler arasında paylaşılır.
+
+Dosya düzeni:
+    başlık: MAGIC (4 bayt), kayıt sayısı, marka genişliği, model genişliği (uint32)
+    kayıt:  TAC (uint32, big-endian), marka, model (UTF-8, NUL ile doldurulmuş)
+
+Dosya compile_tac_database komutu ile CSV kaynağından üretilir.
+"""
+import logging
+import mmap
+import os
+import struct
+import tempfile
+from pathlib import Path
+
+from django.conf import settings
+
+from .identifiers import normalize_digits
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b'TAC1'
+HEADER = struct.Struct('>4sIII')
+
+TAC_LENGTH = 8
+
+# Marka/model alanlarının bayt genişliği; UTF-8 metin Device alanlarının
+# karakter sınırını aşabileceğinden autofill ayrıca max_length'e keser
+BRAND_WIDTH = 64
+MODEL_WIDTH = 64
+
+
+class TacDatabaseError(Exception):
+    """TAC dosyası okunamadığında veya biçimi hatalı olduğunda fırlatılır"""
+
+
+def get_database_path():
+    return Path(getattr(settings, 'DEVICE_TAC_DATABASE', settings.BASE_DIR / 'data' / 'tac.bin'))
+
+
+def tac_of(imei):
+    """IMEI'nin TAC'ı (int); en az 8 rakam yoksa None"""
+    digits = normalize_digits(imei)
+    if not digits or len(digits) < TAC_LENGTH:
+        return None
+    return int(digits[:TAC_LENGTH])
+
+
+def _encode(value, width):
+    """Metni genişliğe sığacak şekilde UTF-8 olarak keser (karakter ortasından bölmez)"""
+    return value.encode('utf-8')[:width].decode('utf-8', 'ignore').encode('utf-8')
+
+
+def _decode(value):
+    return value.rstrip(b'\0').decode('utf-8')
+
+
+class TacDatabase:
+    """mmap ile açılmış TAC tablosu"""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        with open(self.path, 'rb') as handle:
+            try:
+                self._map = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                raise TacDatabaseError(f'{self.path} boş')
+        if len(self._map) < HEADER.size:
+            raise TacDatabaseError(f'{self.path} geçerli bir TAC dosyası değil')
+        magic, self.count, brand_width, model_width = HEADER.unpack_from(self._map, 0)
+        self._record = struct.Struct(f'>I{brand_width}s{model_width}s')
+        if magic != MAGIC or len(self._map) != HEADER.size + self.count * self._record.size:
+            self._map.close()
+            raise TacDatabaseError(f'{self.path} geçerli bir TAC dosyası değil')
+
+    def __len__(self):
+        return self.count
+
+    def _tac_at(self, index):
+        return struct.unpack_from('>I', self._map, HEADER.size + index * self._record.size)[0]
+
+    def lookup(self, tac):
+        """TAC'ın (marka, model) ikilisi; bulunamazsa None"""
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            if self._tac_at(middle) < tac:
+                low = middle + 1
+            else:
+                high = middle
+        if low == self.count:
+            return None
+        found, brand, model = self._record.unpack_from(self._map, HEADER.size + low * self._record.size)
+        if found != tac:
+            return None
+        return _decode(brand), _decode(model)
+
+    def close(self):
+        self._map.close()
+
+
+# Süreç başına açık tablo; dosya yeniden derlendiğinde (inode/mtime) yeniden açılır.
+# Eski tablo kapatılmaz: başka bir thread o sırada okuyor olabilir, mmap
+# son referansla birlikte çöp toplayıcı tarafından serbest bırakılır.
+_database = None
+_database_stamp = None
+
+
+def get_database():
+    """Açık TAC tablosu; dosya yoksa veya okunamıyorsa None"""
+    global _database, _database_stamp
+    path = get_database_path()
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return None
+    stamp = (str(path), stat.st_ino, stat.st_mtime_ns, stat.st_size)
+    if stamp != _database_stamp:
+        try:
+            database = TacDatabase(path)
+        except (OSError, TacDatabaseError) as exc:
+            logger.warning('TAC veritabanı açılamadı: %s', exc)
+            return None
+        _database, _database_stamp = database, stamp
+    return _database
+
+
+def resolve(imei, database=None):
+    """IMEI'den {'tac', 'brand', 'model'}; TAC tabloda yoksa None.
+
+    database verilmezse açık tablo kullanılır (dosya her çağrıda kontrol edilir).
+    """
+    tac = tac_of(imei)
+    if tac is None:
+        return None
+    database = database or get_database()
+    if database is None:
+        return None
+    found = database.lookup(tac)
+    if found is None:
+        return None
+    return {'tac': f'{tac:0{TAC_LENGTH}d}', 'brand': found[0], 'model': found[1]}
+
+
+def autofill(devices):
+    """Markası boş cihazların marka/modelini IMEI'den doldurur; doldurulan sayıyı döndürür"""
+    from .models import Device
+
+    # Tablo toplu iş başına bir kez açılır/kontrol edilir
+    database = get_database()
+    if database is None:
+        return 0
+    brand_length = Device._meta.get_field('brand').max_length
+    model_length = Device._meta.get_field('model').max_length
+    filled = 0
+    for device in devices:
+        if device.brand or not device.imei:
+            continue
+        found = resolve(device.imei, database)
+        if found is None:
+            continue
+        device.brand = found['brand'][:brand_length]
+        device.model = device.model or found['model'][:model_length]
+        filled += 1
+    return filled
+
+
+def compile_database(rows, path):
+    """(tac, marka, model) satırlarından sıralı TAC dosyasını yazar.
+
+    Aynı TAC birden fazla kez geçerse son satır geçerlidir. Dosya geçici
+    bir dosyaya yazılıp yerine taşınır; açık mmap'ler eski dosyayı okumaya
+    devam eder. Yazılan kayıt sayısını döndürür.
+    """
+    entries = {}
+    for tac, brand, model in rows:
+        entries[int(tac)] = (_encode(brand, BRAND_WIDTH), _encode(model, MODEL_WIDTH))
+
+    record = struct.Struct(f'>I{BRAND_WIDTH}s{MODEL_WIDTH}s')
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=path.parent, prefix='.tac-', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as handle:
+            handle.write(HEADER.pack(MAGIC, len(entries), BRAND_WIDTH, MODEL_WIDTH))
+            for tac in sorted(entries):
+                handle.write(record.pack(tac, *entries[tac]))
+        os.replace(temp_path, path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+    return len(entries)
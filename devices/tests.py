@@ -1,9 +1,45 @@
 from django.test import TestCase, Client
 from django.urls import reverse
 from django.contrib.auth import get_user_model
-from .models import Device
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.core.management import call_command
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.forms import modelform_factory
+from django.http import FileResponse, QueryDict
+from django.db import connection
+from django.db.models import Count
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from io import StringIO
+from . import bitmaps, catalog, conditional, groups, importers, search, tac
+from .duplicates import find_duplicates, score_cluster
+from .identifiers import normalize_gsm
+from .models import Device, DeviceBrand, DeviceGroup, DeviceGroupClosure, DeviceModel, DuplicateCluster, DuplicateScan
+from .admin import DeviceAdminForm
 from .forms import DeviceForm
+from users.models import UserLog
+from . import export_cache
+from .bulk_actions import apply_bulk_action
+from .exports import stream_csv, stream_json_array
+from .filters import filter_devices, scope_devices
+from .groups import filter_by_group
+from .importers import DeviceImportError, import_devices
+from .pagination import CursorPaginator
+from .search import search_devices
+from users.templatetags.user_filters import active_devices_count, inactive_devices_count, total_devices_count
+from .stats import daily_registrations, get_device_stats, type_counts_by_display
+import csv
 import datetime
+import gzip
+import io
+import json
+import os
+import pickle
+import shutil
+import tempfile
+from pathlib import Path
+from unittest import mock
 
 User = get_user_model()
 
@@ -255,3 +291,1539 @@ class DeviceStatisticsTest(TestCase):
     def test_device_statistics_view_unauthenticated(self):
         response = self.client.get(reverse('devices:device_statistics'))
         self.assertEqual(response.status_code, 302)  # Redirect to login
+
+class DeviceCursorPaginationTest(TestCase):
+    def setUp(self):
+        self.client = Client()
+        self.user = User.objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpass123',
+            tc_kimlik='12345678901'
+        )
+        
+        for i in range(45):
+            Device.objects.create(
+                user=self.user,
+                gsm_number=f'+9055500000{i:02d}',
+                device_email=f'device{i}@example.com',
+                device_type='phone' if i % 2 else 'tablet',
+                device_name=f'Device {i:02d}' if i % 5 else None
+            )
+    
+    def _walk(self, ordering):
+        paginator = CursorPaginator(Device.objects.all(), ordering, per_page=20)
+        seen = []
+        page = paginator.get_page()
+        while True:
+            seen.extend(device.id for device in page)
+            if not page.has_next():
+                break
+            page = paginator.get_page(page.next_cursor)
+        return seen
+    
+    def test_cursor_walk_covers_all_rows_once(self):
+        for ordering in ['-created_at', 'created_at', 'device_name', '-device_type']:
+            seen = self._walk(ordering)
+            self.assertEqual(len(seen), 45)
+            self.assertEqual(len(set(seen)), 45)
+    
+    def test_cursor_walk_matches_order_by(self):
+        expected = list(Device.objects.order_by('device_type', 'id').values_list('id', flat=True))
+        self.assertEqual(self._walk('device_type'), expected)
+    
+    def test_previous_cursor_returns_previous_page(self):
+        paginator = CursorPaginator(Device.objects.all(), '-created_at', per_page=20)
+        first = paginator.get_page()
+        second = paginator.get_page(first.next_cursor)
+        self.assertTrue(second.has_previous())
+        back = paginator.get_page(second.previous_cursor)
+        self.assertEqual([d.id for d in back], [d.id for d in first])
+        self.assertTrue(back.has_next())
+    
+    def test_invalid_or_foreign_cursor_falls_back_to_first_page(self):
+        paginator = CursorPaginator(Device.objects.all(), '-created_at', per_page=20)
+        first = paginator.get_page()
+        self.assertEqual(len(paginator.get_page('bozuk-token')), 20)
+        
+        other = CursorPaginator(Device.objects.all(), 'device_name', per_page=20)
+        self.assertEqual(
+            [d.id for d in other.get_page(first.next_cursor)],
+            [d.id for d in other.get_page()]
+        )
+    
+    def test_device_list_cursor_mode_keeps_filters(self):
+        self.client.login(username='testuser', password='testpass123')
+        response = self.client.get(reverse('devices:device_list'), {'device_type': 'phone'})
+        self.assertEqual(response.context['pagination_mode'], 'cursor')
+        self.assertEqual(response.context['filter_query'], 'device_type=phone')
+        page = response.context['page_obj']
+        self.assertEqual(len(page), 20)
+        
+        response = self.client.get(reverse('devices:device_list'), {
+            'device_type': 'phone',
+            'cursor': page.next_cursor
+        })
+        self.assertEqual(len(response.context['page_obj']), 2)
+        self.assertFalse(response.context['page_obj'].has_next())
+    
+    def test_device_list_numbered_mode(self):
+        self.client.login(username='testuser', password='testpass123')
+        response = self.client.get(reverse('devices:device_list'), {'pagination': 'numbered', 'page': 3})
+        self.assertEqual(response.context['pagination_mode'], 'numbered')
+        self.assertEqual(response.context['page_obj'].number, 3)
+        self.assertEqual(len(response.context['page_obj']), 5)
+
+class DeviceStatsServiceTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpass123',
+            tc_kimlik='12345678901'
+        )
+        self.other = User.objects.create_user(
+            username='otheruser',
+            email='other@example.com',
+            password='testpass123',
+            tc_kimlik='12345678902'
+        )
+        
+        Device.objects.create(user=self.user, gsm_number='+905550000001', device_email='a@example.com', device_type='phone')
+        Device.objects.create(user=self.user, gsm_number='+905550000002', device_email='b@example.com', device_type='phone', is_active=False)
+        Device.objects.create(user=self.user, gsm_number='+905550000003', device_email='c@example.com', device_type='tablet')
+        Device.objects.create(user=self.other, gsm_number='+905550000004', device_email='d@example.com', device_type='iot')
+    
+    def test_stats_single_query(self):
+        with self.assertNumQueries(1):
+            stats = get_device_stats()
+        self.assertEqual(stats['total'], 4)
+        self.assertEqual(stats['active'], 3)
+        self.assertEqual(stats['inactive'], 1)
+        self.assertEqual(
+            [(item['device_type'], item['count'], item['active']) for item in stats['type_stats']],
+            [('phone', 2, 1), ('tablet', 1, 1), ('iot', 1, 1)]
+        )
+    
+    def test_stats_scoped_queryset(self):
+        stats = get_device_stats(Device.objects.filter(user=self.user).order_by('device_name'))
+        self.assertEqual(stats['total'], 3)
+        self.assertEqual(stats['inactive'], 1)
+        self.assertEqual(type_counts_by_display(stats), {'Telefon': 2, 'Tablet': 1})
+    
+    def test_stats_empty_queryset(self):
+        stats = get_device_stats(Device.objects.none())
+        self.assertEqual((stats['total'], stats['active'], stats['inactive']), (0, 0, 0))
+        self.assertEqual(stats['type_stats'], [])
+    
+    def test_daily_registrations_read_from_rollups(self):
+        today = timezone.localdate()
+        with CaptureQueriesContext(connection) as queries:
+            series = daily_registrations(today - datetime.timedelta(days=2), today)
+        self.assertEqual([item['count'] for item in series], [0, 0, 4])
+        self.assertEqual(series[0]['date'], today - datetime.timedelta(days=2))
+        # Tek özet tablosu okuması; cihaz tablosu taranmaz
+        self.assertEqual(len(queries), 1)
+        self.assertNotIn('"cihazlar"', queries[0]['sql'])
+
+class DeviceSearchIndexTest(TestCase):
+    def setUp(self):
+        self.client = Client()
+        self.user = User.objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpass123',
+            tc_kimlik='12345678901'
+        )
+        
+        self.galaxy = Device.objects.create(
+            user=self.user, gsm_number='+905551112233', device_email='galaxy@example.com',
+            device_name='Saha Telefonu', brand='Samsung', model='Galaxy S23'
+        )
+        self.ipad = Device.objects.create(
+            user=self.user, gsm_number='+905554445566', device_email='ipad@example.com',
+            device_type='tablet', device_name='Depo Tableti', brand='Apple', model='iPad Air'
+        )
+    
+    def _ids(self, query):
+        return set(search_devices(Device.objects.all(), query).values_list('id', flat=True))
+    
+    def test_index_available_on_sqlite(self):
+        self.assertTrue(search.is_available())
+    
+    def test_availability_checked_per_connection(self):
+        # Başka bir bağlantıda (ör. geliştirme veritabanı) kaydedilen sonuç kullanılmaz
+        connection._device_fts_available = (object(), False)
+        self.assertTrue(search.is_available())
+        with self.assertNumQueries(0):
+            self.assertTrue(search.is_available())
+    
+    def test_search_matches_substrings_case_insensitive(self):
+        self.assertEqual(self._ids('galaxy'), {self.galaxy.id})
+        self.assertEqual(self._ids('5544455'), {self.ipad.id})
+        self.assertEqual(self._ids('example.com'), {self.galaxy.id, self.ipad.id})
+    
+    def test_index_follows_save_and_delete(self):
+        self.galaxy.model = 'Galaxy S24'
+        self.galaxy.save()
+        self.assertEqual(self._ids('S24'), {self.galaxy.id})
+        self.assertEqual(self._ids('S23'), set())
+        
+        self.galaxy.delete()
+        self.assertEqual(self._ids('galaxy'), set())
+    
+    def test_short_query_falls_back_to_icontains(self):
+        self.assertEqual(self._ids('S2'), {self.galaxy.id})
+    
+    def test_results_are_ranked(self):
+        results = list(search_devices(Device.objects.all(), 'example').order_by('search_rank', 'id'))
+        self.assertEqual(len(results), 2)
+        self.assertTrue(all(device.search_rank is not None for device in results))
+        # Skor ile cursor sayfalaması (search_rank üzerinde filtre) çalışır
+        after = search_devices(Device.objects.all(), 'example').filter(search_rank__gte=results[0].search_rank)
+        self.assertEqual(after.count(), 2)
+    
+    def test_rebuild_command(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {search.FTS_TABLE}')
+        self.assertEqual(self._ids('galaxy'), set())
+        
+        out = StringIO()
+        call_command('rebuild_device_search', stdout=out)
+        self.assertIn('2 devices indexed', out.getvalue())
+        self.assertEqual(self._ids('galaxy'), {self.galaxy.id})
+    
+    def test_device_list_search_uses_rank_ordering(self):
+        self.client.login(username='testuser', password='testpass123')
+        response = self.client.get(reverse('devices:device_list'), {'search': 'ipad'})
+        self.assertEqual(response.context['current_filters']['sort'], 'search_rank')
+        self.assertEqual([d.id for d in response.context['page_obj']], [self.ipad.id])
+
+class DeviceExportTest(TestCase):
+    def setUp(self):
+        self.client = Client()
+        
+        # Export önbelleği geçici dizine yazılsın
+        cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, cache_dir, ignore_errors=True)
+        settings_override = self.settings(DEVICE_EXPORT_CACHE_DIR=Path(cache_dir))
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.cache_dir = Path(cache_dir)
+        
+        self.admin = User.objects.create_user(
+            username='adminuser',
+            email='admin@example.com',
+            password='testpass123',
+            tc_kimlik='12345678901',
+            role='admin'
+        )
+        self.owners = [
+            User.objects.create_user(
+                username=f'owner{i}',
+                email=f'owner{i}@example.com',
+                password='testpass123',
+                tc_kimlik=f'1000000000{i}',
+                first_name=f'Ad{i}',
+                last_name='Soyad'
+            )
+            for i in range(3)
+        ]
+        for i, owner in enumerate(self.owners):
+            Device.objects.create(
+                user=owner, gsm_number=f'+90555000000{i}', device_email=f'export{i}@example.com',
+                device_type='phone' if i else 'tablet', device_name=f'Export {i}', is_active=bool(i)
+            )
+    
+    def _csv_rows(self, response):
+        content = b''.join(response.streaming_content).decode('utf-8')
+        return list(csv.reader(StringIO(content)))
+    
+    def test_csv_export_streams_all_rows(self):
+        self.client.login(username='adminuser', password='testpass123')
+        response = self.client.get(reverse('devices:device_export_csv'))
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        rows = self._csv_rows(response)
+        self.assertEqual(rows[0][0], 'Cihaz Adı')
+        self.assertEqual(len(rows), 4)
+        self.assertIn('Ad1 Soyad', [row[4] for row in rows])
+    
+    def test_csv_export_honours_list_filters(self):
+        self.client.login(username='adminuser', password='testpass123')
+        response = self.client.get(reverse('devices:device_export_csv'), {'device_type': 'phone', 'status': 'active'})
+        rows = self._csv_rows(response)
+        self.assertEqual(sorted(row[0] for row in rows[1:]), ['Export 1', 'Export 2'])
+    
+    def test_csv_export_has_no_per_row_user_query(self):
+        with self.assertNumQueries(1):
+            rows = list(stream_csv(Device.objects.all()))
+        self.assertEqual(len(rows), 4)
+    
+    def test_csv_export_requires_admin(self):
+        self.client.login(username='owner0', password='testpass123')
+        response = self.client.get(reverse('devices:device_export_csv'))
+        self.assertEqual(response.status_code, 302)
+    
+    def test_json_export_streams_array(self):
+        self.client.login(username='adminuser', password='testpass123')
+        response = self.client.get(reverse('devices:device_export_json'))
+        self.assertEqual(response['Content-Type'], 'application/json')
+        data = json.loads(b''.join(response.streaming_content))
+        self.assertEqual(len(data), 3)
+        self.assertEqual(set(data[0]), {'id', 'device_name', 'device_type', 'gsm_number', 'device_email', 'user', 'is_active', 'created_at'})
+    
+    def test_json_export_empty_array(self):
+        Device.objects.all().delete()
+        self.assertEqual(''.join(stream_json_array(Device.objects.all())), '[]')
+    
+    def test_ndjson_export(self):
+        self.client.login(username='adminuser', password='testpass123')
+        response = self.client.get(reverse('devices:device_export_json'), {'format': 'ndjson', 'status': 'active'})
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        lines = b''.join(response.streaming_content).decode('utf-8').splitlines()
+        self.assertEqual(len(lines), 2)
+        self.assertTrue(all(json.loads(line)['is_active'] for line in lines))
+    
+    def test_json_export_gzip(self):
+        self.client.login(username='adminuser', password='testpass123')
+        response = self.client.get(
+            reverse('devices:device_export_json'), {'format': 'ndjson', 'gzip': '1'},
+            HTTP_ACCEPT_ENCODING='gzip'
+        )
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        lines = gzip.decompress(b''.join(response.streaming_content)).decode('utf-8').splitlines()
+        self.assertEqual(len(lines), 3)
+    
+    def test_export_served_from_cache_until_data_changes(self):
+        self.client.login(username='adminuser', password='testpass123')
+        url = reverse('devices:device_export_csv')
+        
+        first = self.client.get(url)
+        self.assertNotIsInstance(first, FileResponse)
+        first_rows = self._csv_rows(first)
+        self.assertEqual(len(list(self.cache_dir.glob('*.csv'))), 1)
+        
+        second = self.client.get(url)
+        self.assertIsInstance(second, FileResponse)
+        self.assertEqual(self._csv_rows(second), first_rows)
+        second.close()
+        
+        device = Device.objects.get(device_email='export0@example.com')
+        device.device_name = 'Yeni Ad'
+        device.save()
+        third = self.client.get(url)
+        self.assertNotIsInstance(third, FileResponse)
+        self.assertIn('Yeni Ad', [row[0] for row in self._csv_rows(third)])
+    
+    def test_export_cache_follows_owner_name_changes(self):
+        self.client.login(username='adminuser', password='testpass123')
+        url = reverse('devices:device_export_csv')
+        b''.join(self.client.get(url).streaming_content)
+        
+        # Girişte yalnızca last_login yazılır; önbellek geçerli kalır
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.login(username='owner0', password='testpass123')
+        self.client.login(username='adminuser', password='testpass123')
+        cached = self.client.get(url)
+        self.assertIsInstance(cached, FileResponse)
+        cached.close()
+        
+        with self.captureOnCommitCallbacks(execute=True):
+            self.owners[0].last_name = 'Yenisoyad'
+            self.owners[0].save()
+        response = self.client.get(url)
+        self.assertNotIsInstance(response, FileResponse)
+        self.assertIn('Yenisoyad', b''.join(response.streaming_content).decode('utf-8'))
+    
+    def test_related_version_survives_cache_clear(self):
+        version = conditional.related_version()
+        cache.clear()
+        self.assertGreater(conditional.related_version(), version)
+    
+    def test_export_cache_key_depends_on_filters(self):
+        self.client.login(username='adminuser', password='testpass123')
+        url = reverse('devices:device_export_json')
+        b''.join(self.client.get(url).streaming_content)
+        response = self.client.get(url, {'status': 'active'})
+        self.assertNotIsInstance(response, FileResponse)
+        self.assertEqual(len(json.loads(b''.join(response.streaming_content))), 2)
+        self.assertEqual(len(list(self.cache_dir.glob('*.json'))), 2)
+    
+    def test_export_cache_evicts_least_recently_used(self):
+        for index, name in enumerate(['old', 'mid', 'new']):
+            path = self.cache_dir / f'{name}.csv'
+            path.write_bytes(b'x' * 100)
+            os.utime(path, (1000 + index, 1000 + index))
+        export_cache.evict(max_bytes=250)
+        self.assertEqual(sorted(p.name for p in self.cache_dir.iterdir()), ['mid.csv', 'new.csv'])
+
+class DeviceImportTest(TestCase):
+    def setUp(self):
+        self.client = Client()
+        self.admin = User.objects.create_user(
+            username='adminuser',
+            email='admin@example.com',
+            password='testpass123',
+            tc_kimlik='12345678901',
+            role='admin'
+        )
+        Device.objects.create(
+            user=self.admin, gsm_number='+905550000000', device_email='1111 0000', device_type='phone'
+        )
+    
+    def _csv_file(self, rows, name='cihazlar.csv'):
+        buffer = StringIO()
+        csv.writer(buffer).writerows(rows)
+        return SimpleUploadedFile(name, buffer.getvalue().encode('utf-8'), content_type='text/csv')
+    
+    def test_import_creates_devices_and_normalizes_gsm(self):
+        upload = self._csv_file([
+            ['gsm_number', 'device_email', 'device_type', 'device_name'],
+            ['05551112233', '1111 0001', 'tablet', 'Tablet 1'],
+            ['5551112244', '1111 0002', '', 'Telefon 2'],
+        ])
+        result = import_devices(upload, owner=self.admin)
+        self.assertEqual((result.created, result.skipped), (2, 0))
+        tablet = Device.objects.get(device_email='1111 0001')
+        self.assertEqual(tablet.gsm_number, '+905551112233')
+        self.assertEqual(tablet.device_type, 'tablet')
+        self.assertEqual(tablet.user, self.admin)
+        self.assertEqual(Device.objects.get(device_email='1111 0002').device_type, 'phone')
+        self.assertEqual(set(search_devices(Device.objects.all(), 'Tablet 1')), {tablet})
+    
+    def test_import_uses_set_based_uniqueness_checks(self):
+        upload = self._csv_file(
+            [['GSM Numarası', 'Dahili Telefon']] +
+            [[f'+9055520000{i:02d}', f'2222 00{i:02d}'] for i in range(40)] +
+            [['+905550000000', '2222 9999'],   # kullanıcıda zaten kayıtlı GSM
+             ['+905552000099', '1111 0000'],   # kayıtlı dahili telefon
+             ['+905552000098', '2222 0001'],   # dosya içinde tekrar eden dahili telefon
+             ['abc', '2222 9998']]             # geçersiz GSM
+        )
+        # 2 batch x (2 benzersizlik sorgusu + savepoint + bulk_create + indeks
+        #            + kullanıcı sayacı + günlük özet + genel sayaç + savepoint bırakma)
+        with self.assertNumQueries(18):
+            result = import_devices(upload, owner=self.admin, batch_size=25)
+        self.assertEqual(result.created, 40)
+        self.assertEqual(result.skipped, 4)
+        self.assertEqual(sorted(error['row'] for error in result.errors), [42, 43, 44, 45])
+    
+    def test_import_gsm_duplicates_compare_normalized_numbers(self):
+        # Eski kayıt ham biçimde saklanmış; normalize kolonu aynı numarayı gösterir
+        Device.objects.create(user=self.admin, gsm_number='0555 777 0001', device_email='7777 1001')
+        upload = self._csv_file([
+            ['gsm_number', 'device_email'],
+            ['+905557770001', '7777 1002'],
+            ['05557770002', '7777 1003'],
+            ['+90 555 777 00 02', '7777 1004'],
+        ])
+        result = import_devices(upload, owner=self.admin)
+        self.assertEqual((result.created, result.skipped), (1, 2))
+        self.assertEqual(sorted(error['row'] for error in result.errors), [2, 4])
+    
+    def test_import_reports_rows_taken_by_concurrent_import(self):
+        upload = self._csv_file([
+            ['gsm_number', 'device_email'],
+            ['05556660001', '6666 0001'],
+            ['05556660002', '6666 0002'],
+        ])
+        check = importers._unique_rows
+        
+        def racing_check(*args):
+            rows = check(*args)
+            # Başka bir import kontrolden sonra, eklemeden önce aynı dahili telefonu ekler
+            if not Device.objects.filter(device_email='6666 0002').exists():
+                Device.objects.create(user=self.admin, gsm_number='+905559990000', device_email='6666 0002')
+            return rows
+        
+        with mock.patch.object(importers, '_unique_rows', racing_check):
+            result = import_devices(upload, owner=self.admin)
+        self.assertEqual((result.created, result.skipped), (1, 1))
+        self.assertEqual(result.errors, [{'row': 3, 'message': 'Bu dahili telefon numarası zaten kullanılıyor.'}])
+        self.assertTrue(Device.objects.filter(device_email='6666 0001', gsm_number='+905556660001').exists())
+    
+    def test_import_rejects_missing_columns(self):
+        upload = self._csv_file([['device_name'], ['Tek kolon']])
+        with self.assertRaises(DeviceImportError):
+            import_devices(upload, owner=self.admin)
+    
+    def test_import_xlsx(self):
+        try:
+            import openpyxl
+        except ImportError:
+            self.skipTest('openpyxl kurulu değil')
+        workbook = openpyxl.Workbook()
+        sheet = workbook.active
+        sheet.append(['gsm_number', 'device_email', 'imei'])
+        sheet.append(['05553334455', '3333 0001', '123456789012345'])
+        buffer = io.BytesIO()
+        workbook.save(buffer)
+        upload = SimpleUploadedFile('cihazlar.xlsx', buffer.getvalue())
+        result = import_devices(upload, owner=self.admin)
+        self.assertEqual(result.created, 1)
+        self.assertEqual(Device.objects.get(device_email='3333 0001').imei, '123456789012345')
+    
+    def test_import_view_writes_single_summary_log(self):
+        self.client.login(username='adminuser', password='testpass123')
+        upload = self._csv_file([
+            ['gsm_number', 'device_email'],
+            ['05554440001', '4444 0001'],
+            ['05554440002', '4444 0002'],
+            ['05554440003', '4444 0003'],
+        ])
+        response = self.client.post(reverse('devices:device_import'), {'file': upload})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['result'].created, 3)
+        logs = UserLog.objects.filter(user=self.admin)
+        self.assertEqual(logs.count(), 1)
+        self.assertEqual(logs.get().log_type, 'bulk_action')
+
+
+class DeviceBulkActionTest(TestCase):
+    def setUp(self):
+        self.client = Client()
+        self.user = User.objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpass123',
+            tc_kimlik='12345678901'
+        )
+        self.other_user = User.objects.create_user(
+            username='otheruser',
+            email='other@example.com',
+            password='testpass123',
+            tc_kimlik='12345678902'
+        )
+        self.devices = [
+            Device.objects.create(
+                user=self.user, gsm_number=f'+90555000{i:04d}', device_email=f'5555 {i:04d}',
+                device_type='tablet' if i % 2 else 'phone'
+            )
+            for i in range(6)
+        ]
+        self.foreign_device = Device.objects.create(
+            user=self.other_user, gsm_number='+905559999999', device_email='5555 9999'
+        )
+        self.client.login(username='testuser', password='testpass123')
+        self.url = reverse('devices:device_bulk_action')
+    
+    def test_deactivate_selected_devices(self):
+        selected = [device.id for device in self.devices[:4]]
+        response = self.client.post(
+            self.url, {'action': 'deactivate', 'device_ids': selected},
+            HTTP_X_REQUESTED_WITH='XMLHttpRequest'
+        )
+        self.assertEqual(response.json()['affected'], 4)
+        self.assertEqual(Device.objects.filter(is_active=False).count(), 4)
+        logs = UserLog.objects.filter(user=self.user, log_type='bulk_action')
+        self.assertEqual(logs.count(), 1)
+    
+    def test_action_is_scoped_to_user_devices(self):
+        response = self.client.post(self.url, {
+            'action': 'delete',
+            'device_ids': [self.devices[0].id, self.foreign_device.id],
+        })
+        self.assertRedirects(response, reverse('devices:device_list'), fetch_redirect_response=False)
+        self.assertFalse(Device.objects.filter(id=self.devices[0].id).exists())
+        self.assertTrue(Device.objects.filter(id=self.foreign_device.id).exists())
+    
+    def test_select_all_uses_filters_and_single_update(self):
+        group = DeviceGroup.objects.create(name='Saha Ekibi')
+        # Satır kilidi + sayaç dağılımı + dashboard için sahipler + sayım + tek UPDATE
+        # + yeni grubun sayaçları (savepoint'ler dahil)
+        with self.assertNumQueries(8):
+            affected = apply_bulk_action(
+                filter_devices(scope_devices(self.user), {'device_type': 'tablet'})[0],
+                'regroup', group=group
+            )
+        self.assertEqual(affected, 3)
+        group.refresh_from_db()
+        self.assertEqual((group.device_count, group.active_count), (3, 3))
+        
+        response = self.client.post(self.url, {
+            'action': 'activate', 'select_all': 'on', 'device_type': 'phone'
+        })
+        self.assertRedirects(response, reverse('devices:device_list') + '?device_type=phone', fetch_redirect_response=False)
+        self.assertEqual(
+            set(Device.objects.filter(device_group='Saha Ekibi').values_list('device_type', flat=True)),
+            {'tablet'}
+        )
+    
+    def test_bulk_delete_removes_search_rows(self):
+        # Satır kilidi + dağılımlar + kullanıcı sayacı + indeks + günlük özet
+        # (dağılım + 2 cins) + genel sayaçlar (dağılım + 2 sayaç) + dashboard için
+        # sahipler + collector okuması + küme üyelikleri + tek DELETE (savepoint'ler dahil)
+        with self.assertNumQueries(17 if search.is_available() else 16):
+            affected = apply_bulk_action(Device.objects.filter(user=self.user), 'delete')
+        self.assertEqual(affected, 6)
+        self.assertEqual(list(search_devices(Device.objects.all(), '5555')), [self.foreign_device])
+    
+    def test_requires_selection(self):
+        response = self.client.post(
+            self.url, {'action': 'activate'}, HTTP_X_REQUESTED_WITH='XMLHttpRequest'
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(UserLog.objects.filter(log_type='bulk_action').exists())
+
+
+
+class DeviceToggleStatusTest(TestCase):
+    def setUp(self):
+        self.client = Client()
+        self.user = User.objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpass123',
+            tc_kimlik='12345678901'
+        )
+        other_user = User.objects.create_user(
+            username='otheruser',
+            email='other@example.com',
+            password='testpass123',
+            tc_kimlik='12345678902'
+        )
+        self.group = DeviceGroup.objects.create(name='Merkez')
+        self.devices = [
+            Device.objects.create(
+                user=self.user, gsm_number=f'+90555100{i:04d}', device_email=f'6666 {i:04d}',
+                group=self.group, is_active=bool(i % 2)
+            )
+            for i in range(4)
+        ]
+        self.foreign_device = Device.objects.create(
+            user=other_user, gsm_number='+905559999999', device_email='6666 9999'
+        )
+        self.client.login(username='testuser', password='testpass123')
+        self.url = reverse('devices:device_toggle_status_batch')
+    
+    def test_single_toggle_writes_only_status_columns(self):
+        device = self.devices[0]
+        Device.objects.filter(pk=device.pk).update(notes='başka istekte yazıldı')
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(reverse('devices:device_toggle_status', args=[device.id]))
+        self.assertTrue(response.json()['is_active'])
+        updates = [query['sql'] for query in queries if query['sql'].startswith('UPDATE "cihazlar"')]
+        self.assertEqual(len(updates), 1)
+        self.assertIn('NOT', updates[0])
+        self.assertIn('RETURNING', updates[0])
+        self.assertNotIn('"notes"', updates[0])
+        # Durum, sahip ve grup UPDATE'ten döner; cihaz tablosu ayrıca okunmaz
+        self.assertFalse([query['sql'] for query in queries if query['sql'].startswith('SELECT') and 'cihazlar' in query['sql']])
+        device.refresh_from_db()
+        self.assertTrue(device.is_active)
+        self.assertEqual(device.notes, 'başka istekte yazıldı')
+    
+    def test_single_toggle_permissions(self):
+        url = reverse('devices:device_toggle_status', args=[self.foreign_device.id])
+        self.assertEqual(self.client.post(url).status_code, 403)
+        self.assertTrue(Device.objects.get(pk=self.foreign_device.pk).is_active)
+        self.assertEqual(self.client.post(reverse('devices:device_toggle_status', args=[999999])).status_code, 404)
+    
+    def test_batch_toggle_returns_new_states_and_updates_counters(self):
+        ids = [device.id for device in self.devices[:3]]
+        response = self.client.post(self.url, {'device_ids': ids + [self.foreign_device.id]})
+        data = response.json()
+        self.assertEqual(data['devices'], [
+            {'id': ids[0], 'is_active': True},
+            {'id': ids[1], 'is_active': False},
+            {'id': ids[2], 'is_active': True},
+        ])
+        self.assertEqual(data['skipped'], [self.foreign_device.id])
+        self.assertTrue(Device.objects.get(pk=self.foreign_device.pk).is_active)
+        
+        self.group.refresh_from_db()
+        self.user.refresh_from_db()
+        self.assertEqual((self.group.device_count, self.group.active_count), (4, 3))
+        self.assertEqual(self.user.active_device_count, 3)
+        self.assertEqual(UserLog.objects.filter(log_type='device_status_change').count(), 1)
+    
+    def test_batch_toggle_accepts_json(self):
+        response = self.client.post(
+            self.url, json.dumps({'device_ids': [self.devices[1].id]}), content_type='application/json'
+        )
+        self.assertEqual(response.json()['devices'], [{'id': self.devices[1].id, 'is_active': False}])
+    
+    def test_batch_toggle_rejects_invalid_input(self):
+        self.assertEqual(self.client.post(self.url, {}).status_code, 400)
+        self.assertEqual(self.client.post(self.url, {'device_ids': ['x']}).status_code, 400)
+        response = self.client.post(self.url, 'not json', content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+
+
+
+class DeviceIdentifierLookupTest(TestCase):
+    def setUp(self):
+        self.client = Client()
+        self.user = User.objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpass123',
+            tc_kimlik='12345678901'
+        )
+        other_user = User.objects.create_user(
+            username='otheruser',
+            email='other@example.com',
+            password='testpass123',
+            tc_kimlik='12345678902'
+        )
+        self.device = Device.objects.create(
+            user=self.user, gsm_number='05551234567', device_email='7777 0001',
+            imei='35-209900-176148-1', email_number='123456789012345'
+        )
+        self.foreign_device = Device.objects.create(
+            user=other_user, gsm_number='+905559876543', device_email='7777 0002'
+        )
+        self.client.login(username='testuser', password='testpass123')
+        self.url = reverse('devices:device_lookup')
+    
+    def test_normalize_gsm_formats(self):
+        for value in ('05551234567', '5551234567', '+90 555 123 45 67', '905551234567', '0090 555 123 4567'):
+            self.assertEqual(normalize_gsm(value), '+905551234567', value)
+        self.assertEqual(normalize_gsm('+1 555 123 4567'), '+15551234567')
+        self.assertIsNone(normalize_gsm('12345'))
+    
+    def test_save_fills_normalized_columns(self):
+        self.assertEqual(self.device.gsm_normalized, '+905551234567')
+        self.assertEqual(self.device.imei_normalized, '352099001761481')
+        self.device.gsm_number = '0555 765 43 21'
+        self.device.save(update_fields=['gsm_number'])
+        self.device.refresh_from_db()
+        self.assertEqual(self.device.gsm_normalized, '+905557654321')
+    
+    def test_lookup_uses_exact_index_seek(self):
+        for value in ('0 555 123 45 67', '352099001761481', '123 456 789 012 345'):
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(self.url, {'q': value})
+            self.assertEqual([device['id'] for device in response.json()['devices']], [self.device.id], value)
+            self.assertNotIn('LIKE', queries[-1]['sql'])
+        self.assertEqual(response.json()['devices'][0]['owner']['tc_kimlik'], '12345678901')
+    
+    def test_lookup_is_scoped_to_user_devices(self):
+        response = self.client.get(self.url, {'q': '05559876543'})
+        self.assertEqual(response.json()['devices'], [])
+        self.assertEqual(self.client.get(self.url).status_code, 400)
+    
+    def test_backfill_command(self):
+        Device.objects.update(gsm_normalized=None, imei_normalized=None, email_number_normalized=None)
+        out = StringIO()
+        call_command('backfill_device_identifiers', '--batch-size', '1', stdout=out)
+        self.assertIn('2 devices updated', out.getvalue())
+        self.assertEqual(
+            Device.objects.get(pk=self.foreign_device.pk).gsm_normalized, '+905559876543'
+        )
+
+
+class DuplicateDetectionTest(TestCase):
+    def setUp(self):
+        self.users = [
+            User.objects.create_user(
+                username=f'user{i}', email=f'user{i}@example.com', password='testpass123',
+                tc_kimlik=f'1234567890{i}'
+            )
+            for i in range(3)
+        ]
+        # Aynı IMEI ve GSM farklı yazımlarla iki kullanıcıda
+        self.first = Device.objects.create(
+            user=self.users[0], gsm_number='05551112233', device_email='8888 0001',
+            imei='35-209900-176148-1', brand='Apple', model='iPhone 13', device_name='Saha telefonu 1'
+        )
+        self.second = Device.objects.create(
+            user=self.users[1], gsm_number='+90 555 111 22 33', device_email='8888 0002',
+            imei='352099001761481', brand='apple', model='iphone 13', device_name='Saha Telefonu 2'
+        )
+        # Yalnızca marka/model/ad öneki benzer
+        self.third = Device.objects.create(
+            user=self.users[2], gsm_number='05554445566', device_email='8888 0003',
+            brand='Apple', model='iPhone 13', device_name='Saha telefonu 3'
+        )
+        self.unrelated = Device.objects.create(
+            user=self.users[2], gsm_number='05559998877', device_email='8888 0004', imei='490154203237518'
+        )
+    
+    def _clusters(self):
+        return {
+            (cluster.key_type, cluster.key): set(cluster.devices.values_list('id', flat=True))
+            for cluster in DuplicateCluster.objects.all()
+        }
+    
+    def test_full_scan_groups_by_blocking_keys(self):
+        scan = find_duplicates()
+        self.assertFalse(scan.incremental)
+        pair = {self.first.id, self.second.id}
+        self.assertEqual(self._clusters(), {
+            ('imei', '352099001761481'): pair,
+            ('gsm', '+905551112233'): pair,
+            ('name', 'apple|iphone 13|saha telefon'): pair | {self.third.id},
+        })
+        imei_cluster = DuplicateCluster.objects.get(key_type='imei')
+        name_cluster = DuplicateCluster.objects.get(key_type='name')
+        self.assertEqual((imei_cluster.user_count, name_cluster.user_count), (2, 3))
+        # Kümedeki IMEI ve GSM tekrarları skoru yükseltir
+        self.assertEqual(imei_cluster.score, 0.85)
+    
+    def test_score_cluster(self):
+        member = {'user_id': 1, 'imei': '1', 'gsm': '+90', 'name': 'n'}
+        self.assertEqual(score_cluster([member, dict(member, user_id=2)]), 0.85)
+        self.assertEqual(score_cluster([member, dict(member, imei=None, gsm=None)]), 0.2)
+    
+    def test_incremental_scan_only_rechecks_changed_keys(self):
+        find_duplicates()
+        DuplicateCluster.objects.filter(key_type='gsm').update(is_dismissed=True)
+        Device.objects.filter(pk=self.unrelated.pk).update(
+            imei_normalized='352099001761481', updated_at=timezone.now()
+        )
+        
+        scan = find_duplicates(incremental=True)
+        self.assertTrue(scan.incremental)
+        self.assertEqual(scan.scanned_devices, 1)
+        clusters = self._clusters()
+        self.assertEqual(clusters[('imei', '352099001761481')], {self.first.id, self.second.id, self.unrelated.id})
+        self.assertTrue(DuplicateCluster.objects.get(key_type='gsm').is_dismissed)
+        
+        self.second.gsm_number = '05550000000'
+        self.second.save()
+        find_duplicates(incremental=True)
+        self.assertNotIn(('gsm', '+905551112233'), self._clusters())
+    
+    def test_deleted_devices_leave_clusters(self):
+        find_duplicates()
+        apply_bulk_action(Device.objects.filter(pk=self.second.pk), 'delete')
+        find_duplicates(incremental=True)
+        self.assertEqual(set(self._clusters()), {('name', 'apple|iphone 13|saha telefon')})
+    
+    def test_command(self):
+        out = StringIO()
+        call_command('find_duplicate_devices', stdout=out)
+        call_command('find_duplicate_devices', '--incremental', stdout=out)
+        self.assertIn('(full)', out.getvalue())
+        self.assertIn('(incremental)', out.getvalue())
+        self.assertEqual(DuplicateScan.objects.count(), 2)
+
+class DeviceApiTest(TestCase):
+    def setUp(self):
+        self.client = Client()
+        self.user = User.objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpass123',
+            tc_kimlik='12345678901'
+        )
+        other_user = User.objects.create_user(
+            username='otheruser',
+            email='other@example.com',
+            password='testpass123',
+            tc_kimlik='12345678902'
+        )
+        for i in range(7):
+            Device.objects.create(
+                user=self.user, gsm_number=f'+90555100{i:04d}', device_email=f'api{i}@example.com',
+                device_name=f'API Cihaz {i}', device_type='tablet' if i < 3 else 'phone'
+            )
+        Device.objects.create(user=other_user, gsm_number='+905551009999', device_email='other@example.com')
+        self.client.login(username='testuser', password='testpass123')
+        self.url = reverse('devices_api:device-list')
+    
+    def test_requires_authentication(self):
+        self.client.logout()
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 403)
+    
+    def test_cursor_pagination_walks_scoped_devices(self):
+        seen = []
+        url = self.url + '?page_size=3'
+        while url:
+            data = self.client.get(url).json()
+            self.assertNotIn('count', data)
+            seen.extend(item['device_email'] for item in data['results'])
+            url = data['next']
+        self.assertEqual(len(seen), 7)
+        self.assertEqual(len(set(seen)), 7)
+        self.assertNotIn('other@example.com', seen)
+    
+    def test_filters_match_device_list(self):
+        data = self.client.get(self.url, {'device_type': 'tablet'}).json()
+        self.assertEqual(len(data['results']), 3)
+        data = self.client.get(self.url, {'search': 'API Cihaz 5'}).json()
+        self.assertEqual([item['device_name'] for item in data['results']], ['API Cihaz 5'])
+    
+    def test_sparse_fields_limit_columns(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url, {'fields': 'id,gsm_number,device_type_display'})
+        item = response.json()['results'][0]
+        self.assertEqual(set(item), {'id', 'gsm_number', 'device_type_display'})
+        select_sql = next(query['sql'] for query in queries if 'FROM "cihazlar"' in query['sql'])
+        self.assertIn('"gsm_number"', select_sql)
+        self.assertNotIn('"notes"', select_sql)
+    
+    def test_unknown_field_is_rejected(self):
+        response = self.client.get(self.url, {'fields': 'id,password'})
+        self.assertEqual(response.status_code, 400)
+
+
+class DeviceConditionalGetTest(TestCase):
+    def setUp(self):
+        self.client = Client()
+        self.user = User.objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpass123',
+            tc_kimlik='12345678901'
+        )
+        self.device = Device.objects.create(
+            user=self.user, gsm_number='+905551234567', device_email='device@example.com'
+        )
+        self.client.login(username='testuser', password='testpass123')
+    
+    def test_list_returns_304_when_unchanged(self):
+        url = reverse('devices:device_list')
+        response = self.client.get(url)
+        etag = response['ETag']
+        self.assertNotIn('Last-Modified', response)
+        
+        # Yalnızca oturum/kullanıcı ve doğrulayıcı sorguları; liste ve şablon çalışmaz
+        with self.assertNumQueries(3):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        
+        response = self.client.get(url, {'status': 'active'}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+    
+    def test_changes_invalidate_validators(self):
+        url = reverse('devices:device_detail', args=[self.device.id])
+        etag = self.client.get(url)['ETag']
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        
+        self.device.updated_at = self.device.updated_at + datetime.timedelta(seconds=5)
+        Device.objects.filter(id=self.device.id).update(updated_at=self.device.updated_at)
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+        
+        list_url = reverse('devices:device_list')
+        etag = self.client.get(list_url)['ETag']
+        device = Device.objects.create(user=self.user, gsm_number='+905551234568', device_email='device2@example.com')
+        self.assertEqual(self.client.get(list_url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+        
+        # Silme MAX(updated_at)'i geri alabilir; tarihe dayalı doğrulama yapılmaz
+        response = self.client.get(list_url)
+        etag = response['ETag']
+        device.delete()
+        response = self.client.get(
+            list_url, HTTP_IF_NONE_MATCH=etag, HTTP_IF_MODIFIED_SINCE='Fri, 31 Dec 9999 23:59:59 GMT'
+        )
+        self.assertEqual(response.status_code, 200)
+    
+    def test_related_renames_and_new_session_invalidate_validators(self):
+        url = reverse('devices:device_list')
+        etag = self.client.get(url)['ETag']
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        
+        # Sahibin adı listede gösterilir
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.first_name = 'Yeni'
+            self.user.save(update_fields=['first_name'])
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+        
+        etag = self.client.get(url)['ETag']
+        with self.captureOnCommitCallbacks(execute=True):
+            DeviceGroup.objects.create(name='Yeni Grup')
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+        
+        # Yeniden giriş oturumu (ve CSRF token'ını) yeniler; eski sayfa sunulmaz
+        etag = self.client.get(url)['ETag']
+        self.client.logout()
+        self.client.login(username='testuser', password='testpass123')
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+    
+    def test_no_validators_without_access(self):
+        other_user = User.objects.create_user(
+            username='otheruser',
+            email='other@example.com',
+            password='testpass123',
+            tc_kimlik='12345678902'
+        )
+        self.client.login(username='otheruser', password='testpass123')
+        response = self.client.get(reverse('devices:device_detail', args=[self.device.id]))
+        self.assertNotIn('ETag', response)
+
+
+class DeviceGroupTest(TestCase):
+    def setUp(self):
+        self.client = Client()
+        self.user = User.objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpass123',
+            tc_kimlik='12345678901'
+        )
+        self.root = DeviceGroup.objects.create(name='Genel Merkez')
+        self.region = DeviceGroup.objects.create(name='Ankara', parent=self.root)
+        self.unit = DeviceGroup.objects.create(name='Çankaya', parent=self.region)
+        self.other = DeviceGroup.objects.create(name='İzmir', parent=self.root)
+    
+    def _device(self, number, group, is_active=True):
+        return Device.objects.create(
+            user=self.user, gsm_number=f'+90555200{number:04d}', device_email=f'group{number}@example.com',
+            group=group, is_active=is_active
+        )
+    
+    def _counts(self, group):
+        group.refresh_from_db()
+        return group.device_count, group.active_count
+    
+    def test_closure_rows(self):
+        depths = dict(
+            DeviceGroupClosure.objects.filter(descendant=self.unit).values_list('ancestor__name', 'depth')
+        )
+        self.assertEqual(depths, {'Çankaya': 0, 'Ankara': 1, 'Genel Merkez': 2})
+    
+    def test_counters_follow_device_changes(self):
+        device = self._device(1, self.unit)
+        self._device(2, self.other, is_active=False)
+        self.assertEqual(self._counts(self.root), (2, 1))
+        self.assertEqual(self._counts(self.region), (1, 1))
+        self.assertEqual(device.device_group, 'Çankaya')
+        
+        device = Device.objects.get(pk=device.pk)
+        device.is_active = False
+        device.save()
+        self.assertEqual(self._counts(self.unit), (1, 0))
+        
+        device.group = self.other
+        device.save()
+        self.assertEqual(self._counts(self.region), (0, 0))
+        self.assertEqual(self._counts(self.other), (2, 0))
+        
+        device.delete()
+        self.assertEqual(self._counts(self.root), (1, 0))
+    
+    def test_subtree_filter_and_moves(self):
+        self._device(1, self.unit)
+        self._device(2, self.region)
+        self._device(3, self.other)
+        self.assertEqual(filter_by_group(Device.objects.all(), self.region.pk).count(), 2)
+        
+        self.region.parent = self.other
+        self.region.save()
+        self.assertEqual(self._counts(self.other), (3, 3))
+        self.assertEqual(self._counts(self.root), (3, 3))
+        self.assertTrue(
+            DeviceGroupClosure.objects.filter(ancestor=self.other, descendant=self.unit, depth=2).exists()
+        )
+        self.assertEqual(filter_by_group(Device.objects.all(), self.other.pk).count(), 3)
+        
+        self.root.parent = self.unit
+        with self.assertRaises(ValidationError):
+            self.root.save()
+    
+    def test_counter_drift_below_zero_reconciled(self):
+        # Eşzamanlı düşüşler sayacı geçici olarak eksiye düşürebilir; UPDATE hata vermez
+        groups.adjust_counters(self.unit.pk, devices=-1, active=-1)
+        self.assertEqual(self._counts(self.unit), (-1, -1))
+        call_command('rebuild_device_groups', '--counters-only', stdout=StringIO())
+        self.assertEqual(self._counts(self.unit), (0, 0))
+    
+    def test_list_filter_shows_root_and_selected_groups(self):
+        self.client.login(username='testuser', password='testpass123')
+        url = reverse('devices:device_list')
+        names = [group.name for group in self.client.get(url).context['device_groups']]
+        self.assertEqual(names, ['Genel Merkez'])
+        response = self.client.get(url, {'group': self.unit.pk})
+        self.assertEqual([group.name for group in response.context['device_groups']], ['Genel Merkez', 'Çankaya'])
+    
+    def test_group_delete_and_rebuild_command(self):
+        self._device(1, self.unit)
+        self._device(2, self.region)
+        self.region.delete()
+        self.assertEqual(self._counts(self.root), (0, 0))
+        self.assertEqual(Device.objects.filter(group=None).count(), 2)
+        
+        DeviceGroup.objects.filter(pk=self.root.pk).update(device_count=99)
+        out = StringIO()
+        call_command('rebuild_device_groups', stdout=out)
+        self.assertEqual(self._counts(self.root), (0, 0))
+        self.assertIn('1 groups updated', out.getvalue())
+    
+    def test_group_delete_clears_group_name_and_publishes_change(self):
+        device = self._device(1, self.unit)
+        self.assertEqual(device.device_group, self.unit.name)
+        with self.settings(DEVICE_BITMAP_INDEX=True), self.captureOnCommitCallbacks(execute=True):
+            generation = bitmaps._current_generation()
+            self.unit.delete()
+        device.refresh_from_db()
+        self.assertEqual((device.group, device.device_group), (None, None))
+        self.assertGreater(bitmaps._current_generation(), generation)
+    
+    def test_import_resolves_group_names(self):
+        buffer = StringIO()
+        csv.writer(buffer).writerows([
+            ['gsm_number', 'device_email', 'device_group'],
+            ['05552000001', '6666 0001', 'genel  merkez'],
+            ['05552000002', '6666 0002', 'Yeni Birim'],
+        ])
+        import_devices(SimpleUploadedFile('gruplar.csv', buffer.getvalue().encode('utf-8')), owner=self.user)
+        self.assertEqual(Device.objects.get(device_email='6666 0001').group, self.root)
+        self.assertEqual(Device.objects.get(device_email='6666 0001').device_group, 'Genel Merkez')
+        self.assertEqual(self._counts(self.root), (1, 1))
+        self.assertEqual(self._counts(DeviceGroup.objects.get(name='Yeni Birim')), (1, 1))
+    
+    def test_device_list_group_filter(self):
+        self._device(1, self.unit)
+        self._device(2, self.other)
+        self.client.login(username='testuser', password='testpass123')
+        response = self.client.get(reverse('devices:device_list'), {'group': self.region.pk})
+        self.assertEqual([device.group for device in response.context['devices']], [self.unit])
+
+
+class UserDeviceCounterTest(TestCase):
+    def setUp(self):
+        self.client = Client()
+        self.user = User.objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpass123',
+            tc_kimlik='12345678901'
+        )
+        self.admin = User.objects.create_user(
+            username='adminuser',
+            email='admin@example.com',
+            password='testpass123',
+            tc_kimlik='12345678902',
+            role='admin'
+        )
+    
+    def _device(self, number, user=None, is_active=True):
+        return Device.objects.create(
+            user=user or self.user, gsm_number=f'+90555300{number:04d}',
+            device_email=f'counter{number}@example.com', is_active=is_active
+        )
+    
+    def _counts(self, user):
+        user.refresh_from_db()
+        return user.device_count, user.active_device_count
+    
+    def test_counters_follow_save_toggle_and_delete(self):
+        device = self._device(1)
+        self._device(2, is_active=False)
+        self.assertEqual(self._counts(self.user), (2, 1))
+        self.assertEqual(self.user.last_device_added_at, Device.objects.latest('created_at').created_at)
+        
+        self.client.login(username='testuser', password='testpass123')
+        self.client.post(reverse('devices:device_toggle_status', args=[device.id]))
+        self.assertEqual(self._counts(self.user), (2, 0))
+        
+        device.refresh_from_db()
+        device.user = self.admin
+        device.save()
+        self.assertEqual(self._counts(self.user), (1, 0))
+        self.assertEqual(self._counts(self.admin), (1, 0))
+        
+        device.delete()
+        self.assertEqual(self._counts(self.admin), (0, 0))
+    
+    def test_deleting_latest_device_recomputes_last_added(self):
+        created = [self._device(i) for i in range(4)]
+        for offset, device in enumerate(created):
+            Device.objects.filter(pk=device.pk).update(created_at=timezone.now() - datetime.timedelta(days=10 - offset))
+            device.refresh_from_db()
+        call_command('reconcile_user_device_counters', stdout=StringIO())
+        
+        # Daha eski bir cihazın silinmesi son ekleme zamanını değiştirmez
+        created[0].delete()
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.last_device_added_at, created[3].created_at)
+        
+        created[3].delete()
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.last_device_added_at, created[2].created_at)
+        
+        apply_bulk_action(Device.objects.filter(pk__in=[created[1].pk, created[2].pk]), 'delete')
+        self.user.refresh_from_db()
+        self.assertIsNone(self.user.last_device_added_at)
+    
+    def test_user_save_does_not_overwrite_counters(self):
+        stale_user = User.objects.get(pk=self.user.pk)
+        self._device(1)
+        stale_user.first_name = 'Yeni'
+        stale_user.save()
+        self.assertEqual(self._counts(self.user), (1, 1))
+    
+    def test_bulk_paths_update_counters(self):
+        for i in range(3):
+            self._device(i)
+        apply_bulk_action(Device.objects.filter(user=self.user), 'deactivate')
+        self.assertEqual(self._counts(self.user), (3, 0))
+        apply_bulk_action(Device.objects.filter(user=self.user, gsm_number='+905553000000'), 'delete')
+        self.assertEqual(self._counts(self.user), (2, 0))
+        
+        buffer = StringIO()
+        csv.writer(buffer).writerows([['gsm_number', 'device_email'], ['05553009999', '7777 0001']])
+        import_devices(SimpleUploadedFile('c.csv', buffer.getvalue().encode('utf-8')), owner=self.user)
+        self.assertEqual(self._counts(self.user), (3, 1))
+    
+    def test_template_filters_read_counters(self):
+        self._device(1)
+        self._device(2, is_active=False)
+        self.user.refresh_from_db()
+        with self.assertNumQueries(0):
+            self.assertEqual(total_devices_count(self.user), 2)
+            self.assertEqual(active_devices_count(self.user), 1)
+            self.assertEqual(inactive_devices_count(self.user), 1)
+    
+    def test_reconcile_command(self):
+        self._device(1)
+        User.objects.filter(pk=self.user.pk).update(device_count=50, active_device_count=0)
+        out = StringIO()
+        call_command('reconcile_user_device_counters', stdout=out)
+        self.assertEqual(self._counts(self.user), (1, 1))
+        self.assertIn('1 users updated', out.getvalue())
+    
+    def test_decrement_below_zero_does_not_fail(self):
+        device = self._device(1)
+        # Sayaç senkron değilken silme; UPDATE kısıt hatası vermez, komut düzeltir
+        User.objects.filter(pk=self.user.pk).update(device_count=0, active_device_count=0)
+        device.delete()
+        self.assertEqual(self._counts(self.user), (-1, -1))
+        call_command('reconcile_user_device_counters', stdout=StringIO())
+        self.assertEqual(self._counts(self.user), (0, 0))
+
+
+class DeviceCatalogTest(TestCase):
+    def setUp(self):
+        self.client = Client()
+        self.user = User.objects.create_user(
+            username='testuser', email='test@example.com', password='testpass123', tc_kimlik='12345678901'
+        )
+        self.client.login(username='testuser', password='testpass123')
+    
+    def _device(self, i, brand, model, **kwargs):
+        # Katalog, formların clean() adımındaki gibi kayıttan önce çözülür
+        device = Device(
+            user=self.user, gsm_number=f'+90555400{i:04d}', device_email=f'catalog{i}@example.com',
+            brand=brand, model=model, **kwargs
+        )
+        catalog.assign_catalog(device)
+        device.save()
+        return device
+    
+    def test_spellings_share_catalog_entries(self):
+        first = self._device(1, 'Samsung', 'Galaxy S21')
+        second = self._device(2, '  samsung ', 'galaxy  s21')
+        other = self._device(3, 'Samsung', 'Galaxy A52')
+        self.assertEqual(DeviceBrand.objects.count(), 1)
+        self.assertEqual(DeviceModel.objects.count(), 2)
+        self.assertEqual(first.catalog_model_id, second.catalog_model_id)
+        self.assertNotEqual(first.catalog_model_id, other.catalog_model_id)
+        # Metin katalogdaki yazımla kaydedilir
+        second.refresh_from_db()
+        self.assertEqual((second.brand, second.model), ('Samsung', 'Galaxy S21'))
+    
+    def _edit(self, device, **changes):
+        form_class = modelform_factory(Device, form=DeviceAdminForm, fields=['brand', 'model'])
+        form = form_class(data={'brand': device.brand, 'model': device.model, **changes}, instance=device)
+        self.assertTrue(form.is_valid(), form.errors)
+        form.save()
+        device.refresh_from_db()
+        return form
+    
+    def test_form_clean_resolves_catalog(self):
+        self._device(2, 'Apple', 'iPhone 13')
+        device = self._device(1, 'Samsung', 'Galaxy S21')
+        form = self._edit(device, brand='  APPLE ', model='')
+        self.assertEqual(form.cleaned_data['brand'], 'Apple')
+        self.assertEqual((device.brand, device.catalog_brand.name), ('Apple', 'Apple'))
+        self.assertIsNone(device.catalog_model)
+        
+        self._edit(device, brand='')
+        self.assertIsNone(device.catalog_brand)
+    
+    def test_save_does_not_resolve_catalog(self):
+        device = self._device(1, 'Samsung', 'Galaxy S21')
+        device.brand = 'Xiaomi'
+        device.save(update_fields=['brand'])
+        self.assertFalse(DeviceBrand.objects.filter(key='xiaomi').exists())
+    
+    def test_merge_spellings_picks_most_common(self):
+        brands, models = catalog.merge_spellings([
+            ('Samsung', 'Galaxy S21', 5), ('SAMSUNG', 'GALAXY S21', 2), ('', 'Tek başına model', 3),
+        ])
+        self.assertEqual(brands, {'samsung': 'Samsung'})
+        self.assertEqual(models, {('samsung', 'galaxy s21'): 'Galaxy S21'})
+    
+    def test_import_assigns_catalog(self):
+        self._device(1, 'Samsung', 'Galaxy S21')
+        buffer = StringIO()
+        csv.writer(buffer).writerows([
+            ['gsm_number', 'device_email', 'marka', 'model'],
+            ['05554009998', '7777 0001', 'SAMSUNG', 'galaxy s21'],
+            ['05554009999', '7777 0002', 'Xiaomi', 'Redmi Note 12'],
+        ])
+        import_devices(SimpleUploadedFile('c.csv', buffer.getvalue().encode('utf-8')), owner=self.user)
+        self.assertEqual(DeviceBrand.objects.count(), 2)
+        imported = Device.objects.get(gsm_number='+905554009998')
+        self.assertEqual(imported.catalog_brand.name, 'Samsung')
+        self.assertEqual(imported.catalog_model.name, 'Galaxy S21')
+    
+    def test_facets_endpoint(self):
+        self._device(1, 'Samsung', 'Galaxy S21')
+        self._device(2, 'samsung', 'Galaxy A52', is_active=False)
+        self._device(3, 'Apple', 'iPhone 13')
+        self._device(4, '', '')
+        url = reverse('devices_api:device-facets')
+        
+        data = self.client.get(url).json()
+        self.assertEqual(
+            [(row['name'], row['count'], row['active']) for row in data['results']],
+            [('Samsung', 2, 1), ('Apple', 1, 1)]
+        )
+        
+        samsung = DeviceBrand.objects.get(key='samsung')
+        data = self.client.get(url, {'facet': 'model', 'brand': samsung.pk, 'status': 'active'}).json()
+        self.assertEqual([row['name'] for row in data['results']], ['Galaxy S21'])
+        self.assertEqual(data['results'][0]['brand'], samsung.pk)
+        
+        self.assertEqual(self.client.get(url, {'facet': 'color'}).status_code, 400)
+    
+    def test_facet_counts_use_catalog_index(self):
+        with connection.cursor() as cursor:
+            sql, params = (
+                Device.objects.order_by().values_list('catalog_brand_id')
+                .annotate(n=Count('id')).query.sql_with_params()
+            )
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+            plan = ' '.join(str(row) for row in cursor.fetchall())
+        self.assertIn('cihaz_marka_aktif_idx', plan)
+
+
+class TacLookupTest(TestCase):
+    def setUp(self):
+        self.client = Client()
+        self.user = User.objects.create_user(
+            username='testuser', email='test@example.com', password='testpass123', tc_kimlik='12345678901'
+        )
+        self.client.login(username='testuser', password='testpass123')
+        
+        # TAC tablosu geçici dizinde derlenir
+        data_dir = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, data_dir, ignore_errors=True)
+        self.path = data_dir / 'tac.bin'
+        settings_override = self.settings(DEVICE_TAC_DATABASE=self.path)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        
+        source = data_dir / 'tac.csv'
+        source.write_text(
+            'TAC;Marka;Model\n'
+            '35209900;Apple;iPhone 13\n'
+            '86012345;Xiaomi;Redmi Note 12\n'
+            '35332811;Samsung;Galaxy  S21\n'
+            '1234;Hatalı;Satır\n',
+            encoding='utf-8'
+        )
+        out = StringIO()
+        call_command('compile_tac_database', str(source), stdout=out)
+        self.assertIn('3 entries', out.getvalue())
+        self.assertIn('1 rows skipped', out.getvalue())
+    
+    def test_lookup_binary_search(self):
+        database = tac.get_database()
+        self.assertEqual(len(database), 3)
+        self.assertEqual(database.lookup(35209900), ('Apple', 'iPhone 13'))
+        self.assertEqual(database.lookup(35332811), ('Samsung', 'Galaxy S21'))
+        self.assertEqual(database.lookup(86012345), ('Xiaomi', 'Redmi Note 12'))
+        for missing in (1, 35300000, 99999999):
+            self.assertIsNone(database.lookup(missing))
+        self.assertEqual(tac.resolve('35-209900-176148-1')['brand'], 'Apple')
+    
+    def test_recompiled_file_is_reopened(self):
+        self.assertIsNotNone(tac.resolve('352099001761481'))
+        tac.compile_database([('35209900', 'Apple', 'iPhone 13 Pro')], self.path)
+        self.assertEqual(tac.resolve('352099001761481')['model'], 'iPhone 13 Pro')
+        self.assertIsNone(tac.resolve('860123450000000'))
+    
+    def test_autofill_endpoint(self):
+        url = reverse('devices:device_tac_lookup')
+        response = self.client.get(url, {'imei': '352099001761481'})
+        self.assertEqual(response.json(), {'tac': '35209900', 'brand': 'Apple', 'model': 'iPhone 13'})
+        self.assertEqual(self.client.get(url, {'imei': '49015420'}).status_code, 404)
+        self.assertEqual(self.client.get(url, {'imei': '3520'}).status_code, 400)
+        
+        self.path.unlink()
+        self.assertEqual(self.client.get(url, {'imei': '352099001761481'}).status_code, 503)
+    
+    def test_corrupt_file_treated_as_missing(self):
+        url = reverse('devices:device_tac_lookup')
+        self.path.write_bytes(b'TAC1 bozuk')
+        with self.assertLogs('devices.tac', 'WARNING'):
+            self.assertEqual(self.client.get(url, {'imei': '352099001761481'}).status_code, 503)
+        
+        device = Device(user=self.user, imei='352099001761481')
+        with self.assertLogs('devices.tac', 'WARNING'):
+            self.assertEqual(tac.autofill([device]), 0)
+        self.assertIsNone(device.brand)
+    
+    def test_autofill_truncates_to_field_length(self):
+        # Tablo 64 bayt tutar; Device alanları 50 karakter
+        tac.compile_database([('35209900', 'B' * 60, 'M' * 60)], self.path)
+        device = Device(user=self.user, imei='352099001761481')
+        self.assertEqual(tac.autofill([device]), 1)
+        self.assertEqual((device.brand, device.model), ('B' * 50, 'M' * 50))
+        device.full_clean(exclude=['gsm_number', 'device_email'])
+    
+    def test_import_fills_brand_from_imei(self):
+        buffer = StringIO()
+        csv.writer(buffer).writerows([
+            ['gsm_number', 'device_email', 'imei', 'marka', 'model'],
+            ['05554009998', '7777 0001', '860123450000001', '', ''],
+            ['05554009999', '7777 0002', '352099001761481', 'Apple', 'iPhone 12'],
+        ])
+        import_devices(SimpleUploadedFile('c.csv', buffer.getvalue().encode('utf-8')), owner=self.user)
+        filled = Device.objects.get(imei='860123450000001')
+        self.assertEqual((filled.brand, filled.model), ('Xiaomi', 'Redmi Note 12'))
+        self.assertEqual(filled.catalog_brand.name, 'Xiaomi')
+        # Elle girilen marka/model korunur
+        kept = Device.objects.get(imei='352099001761481')
+        self.assertEqual(kept.model, 'iPhone 12')
+
+
+class DeviceBitmapIndexTest(TestCase):
+    def setUp(self):
+        self.client = Client()
+        self.admin = User.objects.create_user(
+            username='adminuser', email='admin@example.com', password='testpass123',
+            tc_kimlik='12345678901', role='admin'
+        )
+        self.user = User.objects.create_user(
+            username='testuser', email='test@example.com', password='testpass123', tc_kimlik='12345678902'
+        )
+        
+        # İndeks etkin, anlık görüntü geçici dizinde
+        data_dir = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, data_dir, ignore_errors=True)
+        settings_override = self.settings(
+            DEVICE_BITMAP_INDEX=True, DEVICE_BITMAP_SNAPSHOT=data_dir / 'bitmaps.bin'
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        bitmaps._index = None
+        self.addCleanup(setattr, bitmaps, '_index', None)
+        cache.clear()
+        self.addCleanup(cache.clear)
+        
+        self.root = DeviceGroup.objects.create(name='Genel Merkez')
+        self.unit = DeviceGroup.objects.create(name='Çankaya', parent=self.root)
+        now = timezone.now()
+        for i in range(12):
+            device = Device.objects.create(
+                user=self.admin if i % 3 else self.user,
+                gsm_number=f'+90555500{i:04d}', device_email=f'bitmap{i}@example.com',
+                device_type=('phone', 'tablet', 'other')[i % 3], is_active=i % 4 != 0,
+                group=(None, self.root, self.unit)[i % 3 if i < 9 else 2],
+            )
+            created = now - datetime.timedelta(days=i)
+            Device.objects.filter(pk=device.pk).update(created_at=created, updated_at=created)
+    
+    def _compare(self, params):
+        params = QueryDict(params)
+        devices, filters = filter_devices(Device.objects.all(), params)
+        self.assertEqual(bitmaps.device_stats(self.admin, filters), get_device_stats(devices), params)
+    
+    def test_filter_combinations_match_sql(self):
+        start = (timezone.localdate() - datetime.timedelta(days=5)).isoformat()
+        end = (timezone.localdate() - datetime.timedelta(days=1)).isoformat()
+        for params in (
+            '', 'device_type=tablet', 'status=active', 'status=inactive&device_type=phone',
+            f'group={self.root.pk}', f'group={self.unit.pk}&status=active',
+            f'start_date={start}', f'end_date={end}', f'start_date={start}&end_date={end}&device_type=other',
+            'start_date=hatali', 'group=999999',
+        ):
+            self._compare(params)
+    
+    def test_not_answerable_falls_back(self):
+        _, filters = filter_devices(Device.objects.all(), QueryDict('search=bitmap'))
+        self.assertIsNone(bitmaps.device_stats(self.admin, filters))
+        _, filters = filter_devices(Device.objects.all(), QueryDict(''))
+        self.assertIsNone(bitmaps.device_stats(self.user, filters))
+        with self.settings(DEVICE_BITMAP_INDEX=False):
+            self.assertIsNone(bitmaps.device_stats(self.admin, filters))
+    
+    def test_signals_keep_index_current(self):
+        index = bitmaps.get_index()
+        with self.captureOnCommitCallbacks(execute=True):
+            device = Device.objects.get(gsm_number='+905555000001')
+            device.is_active = False
+            device.device_type = 'phone'
+            device.save()
+            Device.objects.get(gsm_number='+905555000002').delete()
+            Device.objects.create(
+                user=self.admin, gsm_number='+905555009999', device_email='bitmapnew@example.com',
+                device_type='tablet', group=self.unit
+            )
+        # Değişiklikler nesil olarak uygulanır; yeniden oluşturma ve SQL yok
+        with self.assertNumQueries(0):
+            self.assertIs(bitmaps.get_index(), index)
+        self._compare('')
+        self._compare(f'group={self.unit.pk}')
+        self._compare(f'start_date={timezone.localdate().isoformat()}')
+    
+    def test_bulk_actions_published_as_changes(self):
+        index = bitmaps.get_index()
+        with self.captureOnCommitCallbacks(execute=True):
+            apply_bulk_action(Device.objects.filter(device_type='tablet'), 'deactivate')
+        with self.captureOnCommitCallbacks(execute=True):
+            apply_bulk_action(Device.objects.filter(device_type='phone', is_active=True, user=self.user), 'delete')
+        self.assertIs(bitmaps.get_index(), index)
+        self._compare('status=active')
+        self._compare('device_type=phone')
+        
+        # Başka alan değişen toplu işlem tam yeniden oluşturma ister
+        with self.captureOnCommitCallbacks(execute=True):
+            apply_bulk_action(Device.objects.filter(device_type='other'), 'regroup', group=self.root)
+        self.assertIsNot(bitmaps.get_index(), index)
+        self._compare(f'group={self.root.pk}')
+    
+    def test_missing_changes_rebuilt_by_single_request(self):
+        index = bitmaps.get_index()
+        # Uygulama dışı yazma: değişiklik listesi olmadan nesil ilerler
+        Device.objects.filter(device_type='tablet').update(is_active=False)
+        with self.captureOnCommitCallbacks(execute=True):
+            bitmaps.invalidate()
+        
+        # Başka bir istek yeniden oluşturuyorsa SQL'e düşülür
+        cache.add(bitmaps.REBUILD_LOCK_KEY, 1)
+        self.assertIsNone(bitmaps.get_index())
+        _, filters = filter_devices(Device.objects.all(), QueryDict(''))
+        self.assertIsNone(bitmaps.device_stats(self.admin, filters))
+        
+        cache.delete(bitmaps.REBUILD_LOCK_KEY)
+        self.assertIsNot(bitmaps.get_index(), index)
+        self._compare('status=active')
+        self.assertIsNone(cache.get(bitmaps.REBUILD_LOCK_KEY))
+    
+    def test_snapshot_used_at_startup(self):
+        bitmaps.rebuild()
+        bitmaps._index = None
+        # Anlık görüntü güncel nesilde; tablo okunmaz
+        with self.assertNumQueries(0):
+            index = bitmaps.get_index()
+        self.assertEqual(index.all.bit_count(), 12)
+        self._compare('device_type=phone')
+
+    def test_snapshot_round_trip_without_pickle(self):
+        index = bitmaps.rebuild()
+        loaded = bitmaps.BitmapIndex.loads(index.dumps())
+        self.assertEqual(loaded.generation, index.generation)
+        self.assertEqual(loaded.all, index.all)
+        self.assertEqual(loaded.facets, index.facets)
+        self.assertEqual(loaded.days, index.days)
+        # pickle veya bozuk dosya kod çalıştırmadan reddedilir
+        path = bitmaps.get_snapshot_path()
+        for data in (pickle.dumps({'format': bitmaps.SNAPSHOT_FORMAT}), index.dumps()[:-5], b'garbage'):
+            Path(path).write_bytes(data)
+            self.assertIsNone(bitmaps.load_snapshot())
+    
+    def test_list_view_counts(self):
+        self.client.login(username='adminuser', password='testpass123')
+        response = self.client.get(reverse('devices:device_list'), {'status': 'active', 'pagination': 'numbered'})
+        self.assertEqual(response.context['total_devices'], Device.objects.filter(is_active=True).count())
+        self.assertEqual(response.context['page_obj'].paginator.count, response.context['total_devices'])
+
@@ -7,6 +7,7 @@ urlpatterns = [
     # Cihaz listeleme ve yönetimi
     path('', views.device_list_view, name='device_list'),
     path('add/', views.device_add_view, name='device_add'),
+    path('import/', views.device_import_view, name='device_import'),
     path('edit/<int:device_id>/', views.device_edit_view, name='device_edit'),
     path('delete/<int:device_id>/', views.device_delete_view, name='device_delete'),
     path('detail/<int:device_id>/', views.device_detail_view, name='device_detail'),
@@ -19,5 +20,9 @@ urlpatterns = [
     path('export/json/', views.device_export_json, name='device_export_json'),
     
     # AJAX işlemleri
+    path('toggle-status/', views.device_toggle_status_batch, name='device_toggle_status_batch'),
     path('toggle-status/<int:device_id>/', views.device_toggle_status, name='device_toggle_status'),
+    path('bulk-action/', views.device_bulk_action, name='device_bulk_action'),
+    path('lookup/', views.device_lookup, name='device_lookup'),
+    path('tac-lookup/', views.device_tac_lookup, name='device_tac_lookup'),
 ]
@@ -1,19 +1,30 @@
 from django.shortcuts import render, redirect, get_object_or_404
+from django.urls import reverse
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from django.http import HttpResponse, JsonResponse
+from django.http import HttpResponse, JsonResponse, QueryDict
 from django.core.paginator import Paginator
 from django.db.models import Q, Count
 from django.utils import timezone
+from django.utils.cache import patch_vary_headers
 from django.db import transaction
 from django.views.decorators.http import require_http_methods
 from django.views.decorators.csrf import csrf_exempt
 from django.contrib.auth import get_user_model
 from datetime import datetime, timedelta
-import csv
 import json
 from .models import Device
-from .forms import DeviceForm, DeviceFilterForm
+from .forms import DeviceBulkActionForm, DeviceForm, DeviceFilterForm, DeviceImportForm
+from .bulk_actions import TOGGLE_BATCH_LIMIT, apply_bulk_action, toggle_device, toggle_status
+from .conditional import device_condition
+from .identifiers import LOOKUP_LIMIT, lookup_devices, normalize_gsm
+from .importers import DeviceImportError, import_devices
+from .pagination import CursorPaginator
+from .export_cache import cached_export_response
+from .exports import gzip_stream, stream_csv, stream_json_array, stream_ndjson
+from .filters import filter_devices, scope_devices
+from .stats import daily_registrations, get_device_stats, type_stats_by_count
+from . import bitmaps, groups, tac
 from users.models import UserLog
 
 User = get_user_model()
@@ -31,90 +42,64 @@ def get_user_agent(request):
     """Kullanıcının tarayıcı bilgisini alır"""
     return request.META.get('HTTP_USER_AGENT', '')
 
+def _list_devices(request):
+    return filter_devices(scope_devices(request.user), request.GET)[0]
+
+def _detail_devices(request, device_id):
+    return scope_devices(request.user).filter(id=device_id)
+
+def _statistics_devices(request):
+    return Device.objects.all() if request.user.can_view_all_devices else None
+
+@device_condition('device_list', _list_devices)
 def device_list_view(request):
     """Cihaz listesi view'ı"""
-    # Kullanıcının yetkilerine göre cihazları getir
-    if hasattr(request, 'user') and request.user.is_authenticated:
-        if request.user.can_view_all_devices:
-            devices = Device.objects.all()
-        else:
-            devices = Device.objects.filter(user=request.user)
-    else:
-        # Anonymous user için tüm cihazları göster
-        devices = Device.objects.all()
-    
-    # Filtreleme
-    device_type_filter = request.GET.get('device_type')
-    status_filter = request.GET.get('status')
-    start_date = request.GET.get('start_date')
-    end_date = request.GET.get('end_date')
-    search_query = request.GET.get('search')
-    
-    if device_type_filter:
-        devices = devices.filter(device_type=device_type_filter)
-    
-    if status_filter == 'active':
-        devices = devices.filter(is_active=True)
-    elif status_filter == 'inactive':
-        devices = devices.filter(is_active=False)
-    
-    if start_date:
-        try:
-            start_date = datetime.strptime(start_date, '%Y-%m-%d').date()
-            devices = devices.filter(created_at__date__gte=start_date)
-        except ValueError:
-            pass
-    
-    if end_date:
-        try:
-            end_date = datetime.strptime(end_date, '%Y-%m-%d').date()
-            devices = devices.filter(created_at__date__lte=end_date)
-        except ValueError:
-            pass
-    
-    if search_query:
-        devices = devices.filter(
-            Q(device_name__icontains=search_query) |
-            Q(gsm_number__icontains=search_query) |
-            Q(device_email__icontains=search_query) |
-            Q(brand__icontains=search_query) |
-            Q(model__icontains=search_query)
-        )
+    # Kullanıcının yetkilerine göre cihazları getir ve filtrele
+    devices, current_filters = filter_devices(scope_devices(request.user), request.GET)
+    search_query = current_filters['search']
     
     # Sıralama
     sort_by = request.GET.get('sort', '-created_at')
-    if sort_by in ['device_name', '-device_name', 'created_at', '-created_at', 'device_type', '-device_type']:
-        devices = devices.order_by(sort_by)
-    
-    # Sayfalama
-    paginator = Paginator(devices, 20)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
-    
-    # İstatistikler
-    total_devices = devices.count()
-    active_devices = devices.filter(is_active=True).count()
-    inactive_devices = devices.filter(is_active=False).count()
+    if sort_by not in ['device_name', '-device_name', 'created_at', '-created_at', 'device_type', '-device_type']:
+        sort_by = '-created_at'
+    # Arama yapılıyorsa ve sıralama seçilmemişse alaka düzeyine göre sırala
+    if search_query and 'sort' not in request.GET:
+        sort_by = 'search_rank'
+    devices = devices.order_by(sort_by, '-id' if sort_by.startswith('-') else 'id')
+    
+    # İstatistikler: bitmap indeksi filtreleri kapsıyorsa bellekten, değilse tek sorgu
+    stats = bitmaps.device_stats(request.user, current_filters) or get_device_stats(devices)
+    
+    # Sayfalama: varsayılan cursor (keyset), küçük sonuç kümeleri için ?pagination=numbered
+    pagination_mode = 'numbered' if request.GET.get('pagination') == 'numbered' else 'cursor'
+    if pagination_mode == 'numbered':
+        paginator = Paginator(devices, 20)
+        # Toplam zaten biliniyor; ayrıca COUNT sorgusu çalıştırılmaz
+        paginator.count = stats['total']
+        page_obj = paginator.get_page(request.GET.get('page'))
+    else:
+        paginator = CursorPaginator(devices, sort_by, per_page=20)
+        page_obj = paginator.get_page(request.GET.get('cursor'))
     
-    # Cihaz türü dağılımı
-    device_type_stats = devices.values('device_type').annotate(count=Count('id')).order_by('-count')
+    # Sayfa linklerinde filtreleri korumak için sorgu dizesi
+    filter_params = request.GET.copy()
+    filter_params.pop('cursor', None)
+    filter_params.pop('page', None)
     
     context = {
         'page_obj': page_obj,
         'devices': page_obj,  # Template'de kullanım için
+        'is_paginated': page_obj.has_other_pages(),
+        'pagination_mode': pagination_mode,
+        'filter_query': filter_params.urlencode(),
         'device_types': Device.DEVICE_TYPE_CHOICES,
-        'total_devices': total_devices,
-        'active_devices': active_devices,
-        'inactive_devices': inactive_devices,
-        'device_type_stats': device_type_stats,
-        'current_filters': {
-            'device_type': device_type_filter,
-            'status': status_filter,
-            'start_date': start_date,
-            'end_date': end_date,
-            'search': search_query,
-            'sort': sort_by
-        }
+        'device_groups': groups.filter_choices(current_filters['group']),
+        'total_devices': stats['total'],
+        'active_devices': stats['active'],
+        'inactive_devices': stats['inactive'],
+        'device_type_stats': type_stats_by_count(stats),
+        'current_filters': {**current_filters, 'sort': sort_by},
+        'bulk_action_form': DeviceBulkActionForm()
     }
     
     return render(request, 'devices/device_list.html', context)
@@ -154,6 +139,49 @@ def device_add_view(request):
     
     return render(request, 'devices/device_form.html', context)
 
+@login_required
+def device_import_view(request):
+    """CSV/XLSX dosyasından toplu cihaz ekleme view'ı"""
+    if not request.user.can_manage_devices:
+        messages.error(request, 'Cihaz ekleme yetkiniz yok.')
+        return redirect('devices:device_list')
+    
+    result = None
+    if request.method == 'POST':
+        form = DeviceImportForm(request.POST, request.FILES)
+        if form.is_valid():
+            uploaded_file = form.cleaned_data['file']
+            try:
+                result = import_devices(uploaded_file, owner=request.user)
+            except DeviceImportError as e:
+                form.add_error('file', str(e))
+            else:
+                # Satır başına değil, import başına tek log kaydı
+                UserLog.log_activity(
+                    user=request.user,
+                    log_type='bulk_action',
+                    description=(
+                        f'Toplu cihaz importu ({uploaded_file.name}): '
+                        f'{result.created} eklendi, {result.skipped} atlandı'
+                    ),
+                    ip_address=get_client_ip(request),
+                    user_agent=get_user_agent(request)
+                )
+                
+                if result.created:
+                    messages.success(request, f'{result.created} cihaz başarıyla eklendi.')
+                if result.skipped:
+                    messages.warning(request, f'{result.skipped} satır hatalı olduğu için atlandı.')
+    else:
+        form = DeviceImportForm()
+    
+    context = {
+        'form': form,
+        'result': result
+    }
+    
+    return render(request, 'devices/device_import.html', context)
+
 @login_required
 def device_edit_view(request, device_id):
     """Cihaz düzenleme view'ı"""
@@ -225,6 +253,7 @@ def device_delete_view(request, device_id):
     return render(request, 'devices/device_delete.html', context)
 
 @login_required
+@device_condition('device_detail', _detail_devices)
 def device_detail_view(request, device_id):
     """Cihaz detay view'ı"""
     device = get_object_or_404(Device, id=device_id)
@@ -244,63 +273,56 @@ def device_detail_view(request, device_id):
 
 @login_required
 def device_export_csv(request):
-    """Cihaz verilerini CSV formatında dışa aktar"""
+    """Cihaz verilerini CSV formatında dışa aktar (streaming)"""
     if not request.user.can_view_all_devices:
         messages.error(request, 'Bu işlem için yetkiniz yok.')
         return redirect('devices:device_list')
     
-    # Kullanıcının yetkisine göre cihazları getir
-    if request.user.can_view_all_devices:
-        devices = Device.objects.all()
-    else:
-        devices = Device.objects.filter(user=request.user)
-    
-    response = HttpResponse(content_type='text/csv')
-    response['Content-Disposition'] = 'attachment; filename="cihazlar.csv"'
-    
-    writer = csv.writer(response)
-    writer.writerow(['Cihaz Adı', 'Tür', 'GSM Numarası', 'E-posta', 'Kullanıcı', 'Durum', 'Kayıt Tarihi'])
-    
-    for device in devices:
-        writer.writerow([
-            device.device_name or 'İsimsiz',
-            device.get_device_type_display(),
-            device.gsm_number or '',
-            device.device_email or '',
-            device.user.get_full_name(),
-            'Aktif' if device.is_active else 'Pasif',
-            device.created_at.strftime('%d.%m.%Y %H:%M')
-        ])
+    # Liste ile aynı yetki kapsamı ve filtreler
+    devices, _ = filter_devices(scope_devices(request.user), request.GET)
     
-    return response
+    # Veri değişmediyse aynı filtrelerle üretilmiş dosya diskten sunulur
+    return cached_export_response(
+        request, devices, 'csv', lambda: stream_csv(devices),
+        content_type='text/csv', filename='cihazlar.csv', suffix='.csv', as_attachment=True
+    )
 
 @login_required
 def device_export_json(request):
-    """Cihaz verilerini JSON formatında dışa aktar"""
+    """Cihaz verilerini JSON veya NDJSON formatında dışa aktar (streaming)"""
     if not request.user.can_view_all_devices:
         messages.error(request, 'Bu işlem için yetkiniz yok.')
         return redirect('devices:device_list')
     
-    # Kullanıcının yetkisine göre cihazları getir
-    if request.user.can_view_all_devices:
-        devices = Device.objects.all()
-    else:
-        devices = Device.objects.filter(user=request.user)
-    
-    data = []
-    for device in devices:
-        data.append({
-            'id': device.id,
-            'device_name': device.device_name or 'İsimsiz',
-            'device_type': device.get_device_type_display(),
-            'gsm_number': device.gsm_number or '',
-            'device_email': device.device_email or '',
-            'user': device.user.get_full_name(),
-            'is_active': device.is_active,
-            'created_at': device.created_at.strftime('%d.%m.%Y %H:%M')
-        })
+    # Liste ile aynı yetki kapsamı ve filtreler
+    devices, _ = filter_devices(scope_devices(request.user), request.GET)
     
-    return JsonResponse(data, safe=False)
+    # ?format=ndjson veya Accept: application/x-ndjson ile satır bazlı JSON
+    if request.GET.get('format') == 'ndjson' or 'application/x-ndjson' in request.headers.get('Accept', ''):
+        variant, stream, content_type = 'ndjson', stream_ndjson, 'application/x-ndjson'
+    else:
+        variant, stream, content_type = 'json', stream_json_array, 'application/json'
+    
+    # ?gzip=1 ile, istemci destekliyorsa anında gzip sıkıştırma
+    use_gzip = (
+        request.GET.get('gzip') in ('1', 'true') and
+        'gzip' in request.headers.get('Accept-Encoding', '')
+    )
+    if use_gzip:
+        build_stream = lambda: gzip_stream(stream(devices))
+    else:
+        build_stream = lambda: stream(devices)
+    
+    # Veri değişmediyse aynı filtrelerle üretilmiş dosya diskten sunulur
+    response = cached_export_response(
+        request, devices, variant + ('+gzip' if use_gzip else ''), build_stream,
+        content_type=content_type, filename=f'cihazlar.{variant}',
+        suffix=f'.{variant}' + ('.gz' if use_gzip else '')
+    )
+    if use_gzip:
+        response['Content-Encoding'] = 'gzip'
+    patch_vary_headers(response, ('Accept', 'Accept-Encoding'))
+    return response
 
 @csrf_exempt
 @require_http_methods(["POST"])
@@ -310,18 +332,19 @@ def device_toggle_status(request, device_id):
     if request.method != 'POST':
         return JsonResponse({'error': 'Sadece POST metodu desteklenir'}, status=405)
     
-    device = get_object_or_404(Device, id=device_id)
-    
-    # Yetki kontrolü
-    if not request.user.can_view_all_devices and device.user != request.user:
-        return JsonResponse({'error': 'Bu işlem için yetkiniz yok'}, status=403)
-    
     try:
-        device.is_active = not device.is_active
-        device.save()
+        # Yetki kontrolü UPDATE'in koşulunda; okuyup yeniden yazmak yerine tek
+        # UPDATE ... RETURNING, eşzamanlı tıklamalar birbirini ezmez
+        owner_id = None if request.user.can_view_all_devices else request.user.pk
+        device = toggle_device(device_id, owner_id=owner_id)
+        if device is None:
+            if Device.objects.filter(pk=device_id).exists():
+                return JsonResponse({'error': 'Bu işlem için yetkiniz yok'}, status=403)
+            return JsonResponse({'error': 'Cihaz bulunamadı'}, status=404)
+        is_active = device.is_active
         
         # Log kaydı
-        status_text = 'aktif' if device.is_active else 'pasif'
+        status_text = 'aktif' if is_active else 'pasif'
         UserLog.log_activity(
             user=request.user,
             log_type='device_status_change',
@@ -332,13 +355,150 @@ def device_toggle_status(request, device_id):
         
         return JsonResponse({
             'success': True,
-            'is_active': device.is_active,
+            'is_active': is_active,
             'message': f'Cihaz {status_text} yapıldı'
         })
     except Exception as e:
         return JsonResponse({'error': str(e)}, status=500)
 
+@require_http_methods(["POST"])
 @login_required
+def device_toggle_status_batch(request):
+    """Birden fazla cihazın durumunu tek istekte değiştir (AJAX).
+    
+    device_ids form alanı veya {"device_ids": [...]} JSON gövdesi kabul edilir.
+    Yetki dışındaki veya bulunamayan id'ler `skipped` listesinde döner.
+    """
+    if request.content_type == 'application/json':
+        try:
+            raw_ids = json.loads(request.body or b'{}').get('device_ids', [])
+        except (ValueError, AttributeError):
+            return JsonResponse({'error': 'Geçersiz JSON'}, status=400)
+    else:
+        raw_ids = request.POST.getlist('device_ids')
+    try:
+        device_ids = {int(device_id) for device_id in raw_ids}
+    except (TypeError, ValueError):
+        return JsonResponse({'error': 'Geçersiz cihaz id'}, status=400)
+    if not device_ids:
+        return JsonResponse({'error': 'Cihaz seçilmedi'}, status=400)
+    if len(device_ids) > TOGGLE_BATCH_LIMIT:
+        return JsonResponse({'error': f'En fazla {TOGGLE_BATCH_LIMIT} cihaz gönderilebilir'}, status=400)
+    
+    states = toggle_status(scope_devices(request.user).filter(pk__in=device_ids))
+    if states:
+        activated = sum(states.values())
+        UserLog.log_activity(
+            user=request.user,
+            log_type='device_status_change',
+            description=f'{len(states)} cihazın durumu değiştirildi ({activated} aktif, {len(states) - activated} pasif)',
+            ip_address=get_client_ip(request),
+            user_agent=get_user_agent(request)
+        )
+    
+    return JsonResponse({
+        'success': True,
+        'devices': [{'id': device_id, 'is_active': is_active} for device_id, is_active in sorted(states.items())],
+        'skipped': sorted(device_ids - set(states)),
+        'message': f'{len(states)} cihazın durumu değiştirildi'
+    })
+
+@require_http_methods(["POST"])
+@login_required
+def device_bulk_action(request):
+    """Seçili (veya filtreye uyan) cihazlara toplu işlem uygular"""
+    wants_json = request.headers.get('x-requested-with') == 'XMLHttpRequest'
+    
+    # Listeye dönerken filtreler korunur
+    filter_query = QueryDict(mutable=True)
+    for key in ('device_type', 'status', 'group', 'start_date', 'end_date', 'search'):
+        if request.POST.get(key):
+            filter_query[key] = request.POST[key]
+    list_url = reverse('devices:device_list')
+    if filter_query:
+        list_url += '?' + filter_query.urlencode()
+    
+    form = DeviceBulkActionForm(request.POST)
+    if not form.is_valid():
+        error = ' '.join(' '.join(errors) for errors in form.errors.values())
+        if wants_json:
+            return JsonResponse({'error': error}, status=400)
+        messages.error(request, error)
+        return redirect(list_url)
+    
+    # Yetki kapsamı: admin'ler tüm cihazlar, diğerleri yalnızca kendi cihazları
+    devices = scope_devices(request.user)
+    if form.cleaned_data['select_all']:
+        devices, _ = filter_devices(devices, request.POST)
+    else:
+        devices = devices.filter(id__in=form.cleaned_data['device_ids'])
+    
+    action = form.cleaned_data['action']
+    affected = apply_bulk_action(devices, action, group=form.cleaned_data['group'])
+    
+    # Tek özet log kaydı
+    action_label = dict(form.fields['action'].choices)[action]
+    UserLog.log_activity(
+        user=request.user,
+        log_type='bulk_action',
+        description=f'Toplu cihaz işlemi ({action_label}): {affected} cihaz',
+        ip_address=get_client_ip(request),
+        user_agent=get_user_agent(request)
+    )
+    
+    message = f'{affected} cihaz için "{action_label}" işlemi uygulandı.'
+    if wants_json:
+        return JsonResponse({
+            'success': True,
+            'action': action,
+            'affected': affected,
+            'message': message
+        })
+    messages.success(request, message)
+    return redirect(list_url)
+
+@require_http_methods(["GET"])
+@login_required
+def device_lookup(request):
+    """GSM, IMEI veya cihaz e-mail no ile cihaz ve sahibini bul (AJAX).
+    
+    Numara hangi biçimde yazılırsa yazılsın (0555..., +90 555..., boşluklu IMEI)
+    normalize kolonlarda indeksli tam eşleşme ile aranır.
+    """
+    query = request.GET.get('q', '').strip()
+    if not query:
+        return JsonResponse({'error': 'Aranacak numara girilmedi'}, status=400)
+    
+    devices = lookup_devices(scope_devices(request.user), query).select_related('user').only(
+        'id', 'device_name', 'device_type', 'gsm_number', 'imei', 'email_number', 'is_active',
+        'user__id', 'user__first_name', 'user__last_name', 'user__tc_kimlik'
+    )[:LOOKUP_LIMIT]
+    
+    return JsonResponse({
+        'query': query,
+        'gsm': normalize_gsm(query),
+        'devices': [
+            {
+                'id': device.id,
+                'device_name': device.device_name,
+                'device_type': device.get_device_type_display(),
+                'gsm_number': device.gsm_number,
+                'imei': device.imei,
+                'email_number': device.email_number,
+                'is_active': device.is_active,
+                'owner': {
+                    'id': device.user.id,
+                    'name': device.user.get_full_name(),
+                    'tc_kimlik': device.user.tc_kimlik,
+                },
+                'url': reverse('devices:device_detail', args=[device.id]),
+            }
+            for device in devices
+        ],
+    })
+
+@login_required
+@device_condition('device_statistics', _statistics_devices)
 def device_statistics_view(request):
     """Cihaz istatistikleri view'ı"""
     if not request.user.can_view_all_devices:
@@ -348,40 +508,53 @@ def device_statistics_view(request):
     # Tüm cihazları getir
     devices = Device.objects.all()
     
-    # Genel istatistikler
-    total_devices = devices.count()
-    active_devices = devices.filter(is_active=True).count()
-    inactive_devices = devices.filter(is_active=False).count()
-    
-    # Cihaz türüne göre dağılım
-    device_type_stats = devices.values('device_type').annotate(
-        count=Count('id')
-    ).order_by('-count')
+    # Genel istatistikler ve cihaz türüne göre dağılım (tek sorgu)
+    stats = get_device_stats(devices)
     
-    # Kullanıcıya göre cihaz dağılımı
-    user_device_stats = devices.values('user__first_name', 'user__last_name').annotate(
-        count=Count('id')
-    ).order_by('-count')[:10]
+    # Kullanıcıya göre cihaz dağılımı (kullanıcı sayaçlarından)
+    user_device_stats = [
+        {
+            'user_name': user.get_full_name(),
+            'tc_kimlik': user.tc_kimlik,
+            'total_devices': user.device_count,
+        }
+        for user in User.objects.filter(device_count__gt=0).order_by('-device_count').only(
+            'first_name', 'last_name', 'tc_kimlik', 'device_count'
+        )[:10]
+    ]
     
-    # Son 30 günlük cihaz kayıtları
+    # Son 30 günlük cihaz kayıtları (günlük özet tablosundan tek aralık okuması)
     thirty_days_ago = timezone.now().date() - timedelta(days=30)
-    daily_registrations = []
-    
-    for i in range(30):
-        date = thirty_days_ago + timedelta(days=i)
-        count = devices.filter(created_at__date=date).count()
-        daily_registrations.append({
-            'date': date.strftime('%d.%m'),
-            'count': count
-        })
+    registrations = [
+        {'date': item['date'].strftime('%d.%m'), 'count': item['count']}
+        for item in daily_registrations(thirty_days_ago, thirty_days_ago + timedelta(days=29)) or []
+    ]
     
     context = {
-        'total_devices': total_devices,
-        'active_devices': active_devices,
-        'inactive_devices': inactive_devices,
-        'device_type_stats': device_type_stats,
+        'total_devices': stats['total'],
+        'active_devices': stats['active'],
+        'inactive_devices': stats['inactive'],
+        'device_type_stats': type_stats_by_count(stats),
         'user_device_stats': user_device_stats,
-        'daily_registrations': daily_registrations
+        'daily_registrations': registrations
     }
     
     return render(request, 'devices/device_statistics.html', context)
+
+
+@require_http_methods(["GET"])
+@login_required
+def device_tac_lookup(request):
+    """IMEI'nin TAC'ından marka/model önerisi (cihaz formunda otomatik doldurma için AJAX)"""
+    tac_code = tac.tac_of(request.GET.get('imei', ''))
+    if tac_code is None:
+        return JsonResponse({'error': 'IMEI numarasının en az ilk 8 hanesi girilmelidir'}, status=400)
+    database = tac.get_database()
+    if database is None:
+        return JsonResponse({'error': 'TAC veritabanı yüklenmemiş'}, status=503)
+    
+    found = tac.resolve(request.GET['imei'], database)
+    if found is None:
+        return JsonResponse({'error': 'Bu TAC için kayıt bulunamadı'}, status=404)
+    return JsonResponse(found)
+
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.5 on 2026-10-17 02:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('users', '0005_quickaction'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='customuser',
+            name='active_device_count',
+            field=models.PositiveIntegerField(default=0, verbose_name='Aktif Cihaz Sayısı'),
+        ),
+        migrations.AddField(
+            model_name='customuser',
+            name='device_count',
+            field=models.PositiveIntegerField(default=0, verbose_name='Cihaz Sayısı'),
+        ),
+        migrations.AddField(
+            model_name='customuser',
+            name='last_device_added_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Son Cihaz Ekleme Tarihi'),
+        ),
+        migrations.AddIndex(
+            model_name='customuser',
+            index=models.Index(fields=['-device_count'], name='kullanici_device_count_idx'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+from django.db import migrations
+from django.db.models import Count, Max, Q
+
+
+def backfill_device_counters(apps, schema_editor):
+    CustomUser = apps.get_model('users', 'CustomUser')
+    Device = apps.get_model('devices', 'Device')
+
+    rows = Device.objects.order_by().values_list('user_id').annotate(
+        total=Count('id'),
+        active=Count('id', filter=Q(is_active=True)),
+        last_added=Max('created_at'),
+    )
+    for user_id, total, active, last_added in rows:
+        CustomUser.objects.filter(pk=user_id).update(
+            device_count=total, active_device_count=active, last_device_added_at=last_added
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0006_user_device_counters'),
+        ('devices', '0012_backfill_device_groups'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_device_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.5 on 2026-10-17 04:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0007_backfill_user_device_counters'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='userlog',
+            index=models.Index(fields=['-created_at', '-id'], name='kullanici_log_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='userlog',
+            index=models.Index(fields=['user', '-created_at', '-id'], name='kullanici_log_user_idx'),
+        ),
+    ]
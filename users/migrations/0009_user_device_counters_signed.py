@@ -0,0 +1,23 @@
+# Generated by Django 5.2.5 on 2026-10-17 05:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0008_userlog_created_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='customuser',
+            name='active_device_count',
+            field=models.IntegerField(default=0, verbose_name='Aktif Cihaz Sayısı'),
+        ),
+        migrations.AlterField(
+            model_name='customuser',
+            name='device_count',
+            field=models.IntegerField(default=0, verbose_name='Cihaz Sayısı'),
+        ),
+    ]
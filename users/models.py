@@ -102,15 +102,53 @@ class CustomUser(AbstractUser):
         verbose_name='Profil Resmi'
     )
     
+    # Cihaz sayaçları (denormalize; devices.counters tarafından F() ile güncellenir).
+    # Eşzamanlı düşüşlerde geçici olarak eksiye düşebilir; reconcile_user_device_counters düzeltir.
+    device_count = models.IntegerField(
+        default=0,
+        verbose_name='Cihaz Sayısı'
+    )
+    
+    active_device_count = models.IntegerField(
+        default=0,
+        verbose_name='Aktif Cihaz Sayısı'
+    )
+    
+    last_device_added_at = models.DateTimeField(
+        blank=True,
+        null=True,
+        verbose_name='Son Cihaz Ekleme Tarihi'
+    )
+    
+    # save() ile yazılmayan, yalnızca F() ile güncellenen alanlar
+    COUNTER_FIELDS = ('device_count', 'active_device_count', 'last_device_added_at')
+    
     class Meta:
         verbose_name = 'Kullanıcı'
         verbose_name_plural = 'Kullanıcılar'
         ordering = ['-date_joined']
         db_table = 'kullanicilar'
+        indexes = [
+            # En çok cihaza sahip kullanıcılar sıralaması için
+            models.Index(fields=['-device_count'], name='kullanici_device_count_idx'),
+        ]
     
     def __str__(self):
         return f"{self.first_name} {self.last_name} ({self.tc_kimlik})"
     
+    def save(self, *args, **kwargs):
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            # Bellekteki eski sayaç değerleri F() güncellemelerinin üzerine yazılmasın
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.COUNTER_FIELDS
+            ]
+        super().save(*args, **kwargs)
+    
+    @property
+    def inactive_device_count(self):
+        return self.device_count - self.active_device_count
+    
     def get_full_name(self):
         return f"{self.first_name} {self.last_name}"
     
@@ -204,6 +242,11 @@ class UserLog(models.Model):
         verbose_name_plural = 'Kullanıcı Logları'
         ordering = ['-created_at']
         db_table = 'kullanici_loglari'
+        indexes = [
+            # Aktivite logu cursor sayfalaması ve dönem toplamları için
+            models.Index(fields=['-created_at', '-id'], name='kullanici_log_created_idx'),
+            models.Index(fields=['user', '-created_at', '-id'], name='kullanici_log_user_idx'),
+        ]
     
     def __str__(self):
         return f"{self.user.username} - {self.get_log_type_display()} - {self.created_at}"
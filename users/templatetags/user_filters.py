@@ -1,19 +1,18 @@
 from django import template
-from django.db.models import Q
 
 register = template.Library()
 
 @register.filter
 def active_devices_count(user):
-    """Kullanıcının aktif cihaz sayısını döndürür"""
-    return user.devices.filter(is_active=True).count()
+    """Kullanıcının aktif cihaz sayısını döndürür (sayaç alanından, sorgusuz)"""
+    return user.active_device_count
 
 @register.filter
 def total_devices_count(user):
-    """Kullanıcının toplam cihaz sayısını döndürür"""
-    return user.devices.count()
+    """Kullanıcının toplam cihaz sayısını döndürür (sayaç alanından, sorgusuz)"""
+    return user.device_count
 
 @register.filter
 def inactive_devices_count(user):
-    """Kullanıcının pasif cihaz sayısını döndürür"""
-    return user.devices.filter(is_active=False).count()
+    """Kullanıcının pasif cihaz sayısını döndürür (sayaç alanından, sorgusuz)"""
+    return user.inactive_device_count